@@ -0,0 +1,197 @@
+"""
+Suíte de benchmarks do ETL e dos caminhos de dados da UI sobre dados sintéticos
+(BENCH/synthetic.py), com baseline gravado e gate de regressão.
+
+    python -m BENCH.suite --rows 1000 100000                  # mede e mostra
+    python -m BENCH.suite --rows 1000 100000 --save           # grava/atualiza BENCH/baselines.json
+    python -m BENCH.suite --rows 1000 100000 --check 0.25     # exit 1 se algum caso ficar >25% mais lento
+    python -m BENCH.suite --rows 1000000 --only filter roi    # só os casos cujo nome contém "filter" ou "roi"
+
+Cada caso mede o melhor tempo por chamada entre `--repeat` rodadas (chamadas rápidas são
+repetidas até somar ~50 ms por rodada). Os casos da UI rodam sem o runtime do Streamlit:
+os frames sintéticos não têm versão de dataset, então nada vem dos caches (mede o custo frio),
+salvo nos casos marcados "warm", que reaproveitam o índice já montado.
+Baselines dependem da máquina: grave na mesma máquina em que o gate vai rodar.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from BENCH.synthetic import GENRE_MAP, TMDB_CONFIG, synthetic_raw_financials, synthetic_raw_movies
+from ETL import transform as tf
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINES_FILE = Path(__file__).with_name("baselines.json")
+MIN_ROUND_S = 0.05
+
+# os componentes da UI são importados como no app (streamlit run UI/Main.py)
+sys.path.insert(0, str(ROOT / "UI"))
+
+
+def _ui():
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")  # "No runtime found" etc. fora do app
+
+    from components import charts, filter_engine, filters, formatters, genre_index, quality, roi_index, topk
+    return charts, filter_engine, filters, formatters, genre_index, quality, roi_index, topk
+
+
+def build_data(n: int, seed: int = 0) -> dict:
+    """Frames de entrada dos casos: bruto, curated, financeiro e a visão filme + financeiro."""
+    _, _, _, _, genre_index, _, _, _ = _ui()
+    raw = synthetic_raw_movies(n, seed)
+    fin_raw = synthetic_raw_financials(raw["id"], seed)
+    enriched = tf.transform_enrich(raw, GENRE_MAP, TMDB_CONFIG)
+    curated = tf.transform_clean(enriched, drop_cols=True, copy=True)
+    joined = tf.transform_add_roi(curated, fin_raw)
+    genre_index.add_genre_index(curated)
+    genre_index.add_genre_index(joined)
+    return {"raw": raw, "fin_raw": fin_raw, "enriched": enriched, "curated": curated, "joined": joined}
+
+
+def cases(data: dict) -> dict[str, Callable[[], object]]:
+    """nome -> chamada a medir (o preparo fica fora da medição)."""
+    charts, filter_engine, filters, formatters, genre_index, quality, roi_index, topk = _ui()
+    raw, fin_raw, enriched = data["raw"], data["fin_raw"], data["enriched"]
+    curated, joined = data["curated"], data["joined"]
+    filt = ((1990, 2020), 2500, "drama")
+
+    engine = filter_engine.FilterEngine(curated)
+    engine.search_index  # monta o índice de texto fora da medição
+
+    def engine_select(**text) -> Callable[[], object]:
+        def run():
+            engine._lru.clear()
+            return engine.select(*filt, **text)
+        return run
+
+    idx = roi_index.RoiIndex(joined)
+    page = joined.iloc[:50]
+
+    return {
+        # ETL
+        "etl.transform_enrich": lambda: tf.transform_enrich(raw, GENRE_MAP, TMDB_CONFIG),
+        "etl.transform_clean": lambda: tf.transform_clean(enriched, drop_cols=True, copy=True),
+        "etl.transform_add_roi": lambda: tf.transform_add_roi(curated, fin_raw),
+        "etl.transform_cube": lambda: tf.transform_cube(curated),
+        # filtros
+        "ui.apply_common_filters": lambda: filters.apply_common_filters(curated, *filt),
+        "ui.filter_engine.select (warm)": engine_select(),
+        "ui.filter_engine.search (warm)": engine_select(search_q="amor"),
+        # agregados / ROI
+        "ui.genre_aggregate": lambda: genre_index.genre_aggregate(
+            curated,
+            {"avg_wr": "weighted_rating", "avg_votes": "vote_count", "avg_popularity": "popularity"},
+            required="weighted_rating",
+        ),
+        "ui.roi_ready_coverage": lambda: quality.roi_ready_coverage(joined, min_budget=1e6, min_revenue=1e6),
+        "ui.roi_index.count (warm)": lambda: idx.count(1e6, 1e6),
+        "ui.top_k": lambda: topk.top_k(curated, ["weighted_rating", "vote_count"], 100),
+        # preparo dos gráficos (spec completa, com os dados)
+        "ui.chart.titles_per_year": lambda: charts.titles_per_year(curated).to_dict(),
+        "ui.chart.hist_weighted_rating": lambda: charts.hist_weighted_rating(curated).to_dict(),
+        "ui.chart.demand_scatter": lambda: charts.demand_scatter(curated).to_dict(),
+        "ui.chart.roi_budget_vs_revenue": lambda: charts.roi_budget_vs_revenue(joined).to_dict(),
+        "ui.format.money_short_col": lambda: formatters.money_short_col(joined["budget"]),
+        # tamanho de uma página de tabela da UI (paged_table.PAGE_SIZE)
+        "ui.format.money_short_col (50 rows)": lambda: formatters.money_short_col(page["budget"]),
+        "ui.format.pct2_col (50 rows)": lambda: formatters.pct2_col(page["roi"]),
+        "ui.format.fmt2_col (50 rows)": lambda: formatters.fmt2_col(page["weighted_rating"]),
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    """Melhor tempo por chamada (s) entre `repeat` rodadas de ~MIN_ROUND_S."""
+    t0 = time.perf_counter()
+    fn()
+    first = time.perf_counter() - t0
+    loops = max(1, int(MIN_ROUND_S / first)) if first > 0 else 1000
+    best = first
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / loops)
+    return best
+
+
+def machine() -> dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baselines(path: Path = BASELINES_FILE) -> dict:
+    if not path.exists():
+        return {"machine": {}, "results": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baselines(results: dict[str, float], path: Path = BASELINES_FILE) -> None:
+    data = load_baselines(path)
+    data["machine"] = machine()
+    data["results"] = {**data.get("results", {}), **{k: round(v, 6) for k, v in results.items()}}
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def compare(results: dict[str, float], baselines: dict[str, float], threshold: float) -> list[str]:
+    """Casos mais lentos que baseline * (1 + threshold)."""
+    return [k for k, v in results.items() if k in baselines and v > baselines[k] * (1 + threshold)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", nargs="+", default=None, help="roda só os casos cujo nome contém um destes textos")
+    ap.add_argument("--save", action="store_true", help="grava os tempos em BENCH/baselines.json")
+    ap.add_argument("--check", type=float, default=None, metavar="THRESHOLD",
+                    help="compara com o baseline e sai com erro se algum caso passar de (1 + THRESHOLD)x")
+    args = ap.parse_args()
+
+    baselines = load_baselines()["results"]
+    results: dict[str, float] = {}
+
+    print(f"{'case':<36} {'rows':>10} {'time_ms':>10} {'base_ms':>10} {'ratio':>7}")
+    for n in args.rows:
+        data = build_data(n)
+        for name, fn in cases(data).items():
+            if args.only and not any(s in name for s in args.only):
+                continue
+            key = f"{name}@{n}"
+            results[key] = t = measure(fn, args.repeat)
+            base = baselines.get(key)
+            ratio = f"{t / base:>6.2f}x" if base else "    new"
+            base_ms = f"{base * 1e3:>10.3f}" if base else f"{'-':>10}"
+            print(f"{name:<36} {n:>10,} {t * 1e3:>10.3f} {base_ms} {ratio}")
+        del data
+
+    if args.save:
+        save_baselines(results)
+        print(f"Saved: {BASELINES_FILE}")
+
+    if args.check is not None:
+        slower = compare(results, baselines, args.check)
+        if slower:
+            print(f"\nRegressions (> {1 + args.check:.2f}x baseline):")
+            for k in slower:
+                print(f"  {k}: {results[k] * 1e3:.3f} ms vs {baselines[k] * 1e3:.3f} ms")
+            sys.exit(1)
+        print(f"\nNo regressions (threshold {1 + args.check:.2f}x).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# ids/pesos de gênero e idiomas aproximados do top 1000 real (DATA/ORIGINAL/RAW)
+GENRE_WEIGHTS = {
+    18: 556, 35: 248, 12: 238, 28: 231, 53: 231, 80: 160, 10749: 149, 878: 149, 14: 143,
+    10751: 136, 16: 129, 9648: 79, 36: 76, 27: 70, 10752: 58, 10402: 31, 37: 18, 10770: 2, 99: 1,
+}
+GENRES_PER_MOVIE = {1: 102, 2: 299, 3: 443, 4: 110, 5: 40, 6: 6}
+LANGUAGES = {"en": 873, "ja": 34, "fr": 19, "it": 18, "es": 14, "de": 12, "ko": 6, "cn": 6, "pt": 5, "hi": 5, "sv": 4}
+
+GENRE_MAP = {
+    28: "Ação", 12: "Aventura", 16: "Animação", 35: "Comédia", 80: "Crime", 99: "Documentário",
+    18: "Drama", 10751: "Família", 14: "Fantasia", 36: "História", 27: "Terror", 10402: "Música",
+    9648: "Mistério", 10749: "Romance", 878: "Ficção científica", 10770: "Cinema TV", 53: "Thriller",
+    10752: "Guerra", 37: "Faroeste",
+}
+TMDB_CONFIG = {
+    "images": {
+        "secure_base_url": "https://image.tmdb.org/t/p/",
+        "poster_sizes": ["w92", "w154", "w185", "w342", "w500", "w780", "original"],
+        "backdrop_sizes": ["w300", "w780", "w1280", "original"],
+    }
+}
+
+_WORDS = (
+    "amor guerra cidade noite última vingança coração segredo viagem família sombra "
+    "estrela caminho memória herói império rio ilha fogo silêncio destino "
+    "love war city night last revenge heart secret journey family shadow star road"
+).split()
+
+
+def _weighted_choice(rng: np.random.Generator, weights: dict, n: int) -> np.ndarray:
+    keys = np.array(list(weights))
+    p = np.array(list(weights.values()), dtype=float)
+    return keys[rng.choice(len(keys), size=n, p=p / p.sum())]
+
+
+def _text_pool(rng: np.random.Generator, size: int, words: tuple[int, int]) -> np.ndarray:
+    lens = rng.integers(words[0], words[1] + 1, size=size)
+    return np.array([" ".join(rng.choice(_WORDS, size=k)).capitalize() for k in lens], dtype=object)
+
+
+def synthetic_raw_movies(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    `n` linhas no formato do /discover/movie (mesmas colunas do JSONL bruto), com
+    distribuições próximas do catálogo real: vote_count e popularity log-normais,
+    vote_average ~ N(7.6, 0.34), 1-6 gêneros por filme, ~95% com datas/imagens.
+    """
+    rng = np.random.default_rng(seed)
+
+    n_genres = _weighted_choice(rng, GENRES_PER_MOVIE, n)
+    flat = _weighted_choice(rng, GENRE_WEIGHTS, int(n_genres.sum())).tolist()
+    bounds = np.concatenate([[0], np.cumsum(n_genres)]).tolist()
+    genre_ids = [sorted(set(flat[a:b])) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    years = np.clip(np.round(rng.normal(2003, 18, n)), 1900, 2026).astype(int)
+    months = rng.integers(1, 13, n)
+    days = rng.integers(1, 29, n)
+    dates = pd.Series([f"{y:04d}-{m:02d}-{d:02d}" for y, m, d in zip(years, months, days)], dtype=object)
+    dates[rng.random(n) < 0.01] = ""
+
+    titles_pool = _text_pool(rng, 5000, (1, 4))
+    overview_pool = _text_pool(rng, 2000, (20, 90))
+    title_idx = rng.integers(0, len(titles_pool), n)
+    titles = pd.Series(titles_pool[title_idx], dtype=object) + " " + pd.Series(np.arange(n)).astype(str)
+
+    def _paths(missing: float) -> pd.Series:
+        s = pd.Series(["/" + format(x, "x") + ".jpg" for x in rng.integers(0, 2**48, n)], dtype=object)
+        s[rng.random(n) < missing] = None
+        return s
+
+    return pd.DataFrame({
+        "adult": False,
+        "backdrop_path": _paths(0.03),
+        "genre_ids": genre_ids,
+        "id": np.arange(1, n + 1) * 7 + 11,
+        "original_language": _weighted_choice(rng, LANGUAGES, n),
+        "original_title": titles,
+        "overview": overview_pool[rng.integers(0, len(overview_pool), n)],
+        "popularity": np.round(np.exp(rng.normal(1.96, 0.69, n)), 3),
+        "poster_path": _paths(0.01),
+        "release_date": dates,
+        "title": titles,
+        "video": False,
+        "vote_average": np.round(np.clip(rng.normal(7.63, 0.34, n), 0, 10), 3),
+        "vote_count": np.round(np.exp(rng.normal(8.68, 0.72, n))).astype(int) + 2000,
+    })
+
+
+def synthetic_raw_financials(ids, seed: int = 0) -> pd.DataFrame:
+    """
+    Detalhes financeiros brutos (id, budget, revenue, runtime) para `ids`, como os do
+    extract: log(budget) ~ N(16.9, 1.5), log(revenue) ~ N(18.3, 1.8) com correlação ~0.66,
+    ~4.5% de zeros em cada, runtime log-normal em torno de 120 min.
+    """
+    rng = np.random.default_rng(seed + 1)
+    n = len(ids)
+    z1 = rng.standard_normal(n)
+    z2 = 0.66 * z1 + np.sqrt(1 - 0.66 ** 2) * rng.standard_normal(n)
+    budget = np.round(np.exp(16.93 + 1.52 * z1), -3)
+    revenue = np.round(np.exp(18.29 + 1.80 * z2))
+    budget[rng.random(n) < 0.047] = 0
+    revenue[rng.random(n) < 0.044] = 0
+    return pd.DataFrame({
+        "id": np.asarray(ids, dtype=np.int64),
+        "budget": budget.astype(np.int64),
+        "revenue": revenue.astype(np.int64),
+        "runtime": np.round(np.exp(rng.normal(4.78, 0.20, n))).astype(np.int64),
+    })
+
+
+def synthetic_curated(n: int, seed: int = 0) -> pd.DataFrame:
+    """Curated (saída de transform_enrich + transform_clean) a partir de synthetic_raw_movies."""
+    from ETL.transform import transform_clean, transform_enrich
+
+    raw = synthetic_raw_movies(n, seed)
+    return transform_clean(transform_enrich(raw, GENRE_MAP, TMDB_CONFIG), drop_cols=True, copy=False)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from pathlib import Path
+import json
+import sqlite3
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DB = PROJECT_ROOT / "DATA" / "CACHE" / "tmdb_cache.sqlite"
+
+# cache antigo: um JSON por filme (DATA/CACHE/tmdb_movie_financials/<id>.json)
+LEGACY_CACHE_DIR = PROJECT_ROOT / "DATA" / "CACHE" / "tmdb_movie_financials"
+
+
+class FinancialsCache:
+    """
+    Cache chave-valor em um único arquivo SQLite, chave (movie_id, language).
+    Cada entrada guarda o payload JSON e o instante da busca (fetched_at, epoch s),
+    o que permite tratar entradas antigas como expiradas via `max_age_s`.
+    """
+
+    def __init__(self, path: Path | str = CACHE_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS movie_financials (
+                movie_id   INTEGER NOT NULL,
+                language   TEXT    NOT NULL,
+                payload    TEXT    NOT NULL,
+                fetched_at REAL    NOT NULL,
+                PRIMARY KEY (movie_id, language)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> FinancialsCache:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get_many(self, movie_ids: list[int], language: str, max_age_s: float | None = None) -> dict[int, dict]:
+        """Busca todos os ids em uma única query. Ids ausentes (ou expirados) não aparecem no retorno."""
+        if not movie_ids:
+            return {}
+        min_ts = time.time() - max_age_s if max_age_s is not None else float("-inf")
+        cur = self.conn.execute(
+            """
+            SELECT movie_id, payload FROM movie_financials
+            WHERE language = ?
+              AND fetched_at >= ?
+              AND movie_id IN (SELECT value FROM json_each(?))
+            """,
+            (language, min_ts, json.dumps([int(i) for i in movie_ids])),
+        )
+        return {int(mid): json.loads(payload) for mid, payload in cur}
+
+    def put_many(self, rows: list[dict], language: str, fetched_at: float | None = None) -> None:
+        ts = time.time() if fetched_at is None else fetched_at
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO movie_financials (movie_id, language, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                [(int(r["id"]), language, json.dumps(r, ensure_ascii=False), ts) for r in rows],
+            )
+
+    def migrate_from_dir(self, cache_dir: Path | str = LEGACY_CACHE_DIR, language: str = "pt-BR") -> int:
+        """
+        Importa (uma única vez) o cache antigo de um-arquivo-por-filme.
+        O cache antigo não guardava idioma; assume-se `language` (o refresh sempre usou pt-BR).
+        fetched_at = mtime do arquivo. Retorna o nº de entradas importadas.
+        """
+        cache_dir = Path(cache_dir)
+        done = self.conn.execute("SELECT value FROM meta WHERE key = 'legacy_dir_migrated'").fetchone()
+        if done or not cache_dir.is_dir():
+            return 0
+
+        with self.conn:
+            n = 0
+            batch: list[tuple] = []
+            for p in cache_dir.glob("*.json"):
+                try:
+                    data = json.loads(p.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+                batch.append((int(data.get("id", p.stem)), language, json.dumps(data, ensure_ascii=False), p.stat().st_mtime))
+                if len(batch) >= 1000:
+                    n += len(batch)
+                    self._insert_missing(batch)
+                    batch = []
+            n += len(batch)
+            self._insert_missing(batch)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_dir_migrated', ?)",
+                (str(cache_dir),),
+            )
+        return n
+
+    def _insert_missing(self, batch: list[tuple]) -> None:
+        # não sobrescreve entradas mais novas já gravadas no SQLite
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO movie_financials (movie_id, language, payload, fetched_at) VALUES (?, ?, ?, ?)",
+            batch,
+        )
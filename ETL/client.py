@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+from ETL import metrics
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def _retry_after_s(resp: requests.Response) -> float | None:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TMDBClient:
+    """
+    Sessão HTTP compartilhada (keep-alive) para todas as chamadas do extract.
+    - pool de conexões de tamanho `pool_size` (>= nº de workers concorrentes);
+    - retry com backoff exponencial + jitter em 429/5xx/erros de rede, respeitando Retry-After;
+    - circuit breaker: após `breaker_threshold` falhas consecutivas (já esgotados os retries),
+      novas chamadas falham na hora por `breaker_cooldown_s`; depois uma única chamada de teste
+      é liberada e as demais continuam falhando até o resultado dela fechar ou reabrir o circuito.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 16,
+        timeout: float = 30,
+        max_retries: int = 5,
+        backoff_base_s: float = 0.5,
+        backoff_max_s: float = 30.0,
+        breaker_threshold: int = 5,
+        breaker_cooldown_s: float = 30.0,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown_s = breaker_cooldown_s
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    def _backoff_s(self, attempt: int) -> float:
+        delay = min(self.backoff_max_s, self.backoff_base_s * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def _check_breaker(self) -> bool:
+        """Levanta CircuitOpenError se o circuito está aberto; True se esta chamada é a de teste."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if self._probe_in_flight or time.monotonic() - self._opened_at < self.breaker_cooldown_s:
+                raise CircuitOpenError(
+                    f"TMDB circuit aberto após {self._failures} falhas consecutivas"
+                )
+            # half-open: só esta chamada passa; uma falha reabre o circuito
+            self._probe_in_flight = True
+            self._failures = self.breaker_threshold - 1
+            return True
+
+    def _end_probe(self) -> None:
+        with self._lock:
+            self._probe_in_flight = False
+            # saiu sem _record (exceção inesperada) e ninguém fechou o circuito: reabre
+            if self._opened_at is not None and self._failures < self.breaker_threshold:
+                self._failures = self.breaker_threshold
+                self._opened_at = time.monotonic()
+
+    def _record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._failures >= self.breaker_threshold:
+                self._opened_at = time.monotonic()
+
+    def _sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+        metrics.current().add_sleep("retry_backoff", seconds)
+
+    def get(self, url: str, params: dict | None = None) -> requests.Response:
+        probe = self._check_breaker()
+        try:
+            return self._get(url, params)
+        finally:
+            if probe:
+                self._end_probe()
+
+    def _get(self, url: str, params: dict | None) -> requests.Response:
+        m = metrics.current()
+
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            t0 = time.perf_counter()
+            try:
+                resp = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                m.record_http(url, latency_s=time.perf_counter() - t0, retry=attempt > 0)
+                if last:
+                    self._record(ok=False)
+                    raise
+                self._sleep(self._backoff_s(attempt))
+                continue
+            m.record_http(
+                url, latency_s=time.perf_counter() - t0, status=resp.status_code,
+                nbytes=len(resp.content), retry=attempt > 0,
+            )
+
+            if resp.status_code in RETRY_STATUS and not last:
+                delay = _retry_after_s(resp)
+                self._sleep(self._backoff_s(attempt) if delay is None else min(delay, self.backoff_max_s))
+                continue
+
+            try:
+                resp.raise_for_status()
+            except requests.HTTPError:
+                # 4xx "de verdade" (404, 401...) não contam como falha do serviço
+                self._record(ok=resp.status_code not in RETRY_STATUS)
+                raise
+            self._record(ok=True)
+            return resp
+
+        raise AssertionError("unreachable")
+
+    def get_json(self, url: str, params: dict | None = None) -> dict:
+        return self.get(url, params=params).json()
+
+
+_client: TMDBClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> TMDBClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TMDBClient()
+        return _client
+
+
+def configure_client(**kwargs) -> TMDBClient:
+    """Recria o client compartilhado com outros parâmetros (ex.: pool_size=workers)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.session.close()
+        _client = TMDBClient(**kwargs)
+        return _client
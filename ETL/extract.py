@@ -4,10 +4,20 @@ from pathlib import Path
 import os
 import json
 import time
-import requests
+import threading
+import heapq
+import itertools
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 import pandas as pd
 from dotenv import load_dotenv
 
+from ETL.cache import CACHE_DB, LEGACY_CACHE_DIR, FinancialsCache
+from ETL import metrics
+from ETL.client import get_client, configure_client
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 load_dotenv(PROJECT_ROOT / ".env")
 
@@ -15,42 +25,172 @@ API_KEY = os.getenv("API_KEY")
 if not API_KEY:
     raise ValueError("API_KEY não encontrada no .env")
 
-DISCOVER_URL = "https://api.themoviedb.org/3/discover/movie"
-CONFIG_URL = "https://api.themoviedb.org/3/configuration"
-GENRE_URL = "https://api.themoviedb.org/3/genre/movie/list"
-MOVIE_DETAIL_URL = "https://api.themoviedb.org/3/movie/{}"
+# TMDB_API_BASE_URL permite apontar o extract para um servidor local (stub) em testes
+API_BASE_URL = os.getenv("TMDB_API_BASE_URL", "https://api.themoviedb.org/3").rstrip("/")
+
+DISCOVER_URL = f"{API_BASE_URL}/discover/movie"
+CONFIG_URL = f"{API_BASE_URL}/configuration"
+GENRE_URL = f"{API_BASE_URL}/genre/movie/list"
+MOVIE_DETAIL_URL = API_BASE_URL + "/movie/{}"
+CHANGES_URL = f"{API_BASE_URL}/movie/changes"
+
+# /movie/changes aceita janelas de no máximo 14 dias
+CHANGES_MAX_DAYS = 14
+
+# CACHE_DIR = cache antigo (um JSON por filme), migrado automaticamente para CACHE_DB
+# (lidos na chamada: testes podem apontar os dois para um diretório temporário)
+CACHE_DIR = LEGACY_CACHE_DIR
+CACHE_FLUSH_EVERY = 200
+
+
+# /discover/movie não devolve páginas além da 500 (20 resultados por página)
+DISCOVER_PAGE_CAP = 500
+DISCOVER_PAGE_SIZE = 20
+DISCOVER_MIN_YEAR = 1870
+
+DISCOVER_PARAMS = {
+    "sort_by": "vote_average.desc",
+    "vote_count.gte": 2000,
+    "language": "pt-BR",
+}
+
+
+def _fetch_discover_page(params: dict, page: int, bucket: TokenBucket | None = None) -> dict:
+    if bucket is not None:
+        bucket.acquire()
+    return get_client().get_json(DISCOVER_URL, params={**params, "page": page})
+
+
+def _year_shard(params: dict, y0: int, y1: int) -> dict:
+    return {
+        **params,
+        "primary_release_date.gte": f"{y0}-01-01",
+        "primary_release_date.lte": f"{y1}-12-31",
+    }
+
+
+def plan_discover_shards(
+    params: dict,
+    pages_needed: int,
+    first_page: dict | None = None,
+    min_year: int = DISCOVER_MIN_YEAR,
+    max_year: int | None = None,
+    bucket: TokenBucket | None = None,
+) -> list[tuple[dict, dict]]:
+    """
+    Divide a consulta em faixas de primary_release_date até que cada faixa precise de
+    no máximo DISCOVER_PAGE_CAP páginas. Retorna [(params_da_faixa, primeira_página)].
+    Uma faixa de um único ano que ainda passa do limite é aceita truncada.
+    """
+    max_year = max_year or time.localtime().tm_year + 1
+    first_page = first_page or _fetch_discover_page(params, 1, bucket)
+
+    if min(first_page.get("total_pages", 0), pages_needed) <= DISCOVER_PAGE_CAP:
+        return [(params, first_page)]
+
+    out: list[tuple[dict, dict]] = []
+    stack = [(min_year, max_year)]
+    while stack:
+        y0, y1 = stack.pop()
+        shard = _year_shard(params, y0, y1)
+        page1 = _fetch_discover_page(shard, 1, bucket)
+        total = page1.get("total_pages", 0)
+        if total == 0:
+            continue
+        if min(total, pages_needed) <= DISCOVER_PAGE_CAP or y0 == y1:
+            out.append((shard, page1))
+            continue
+        mid = (y0 + y1) // 2
+        stack.extend([(mid + 1, y1), (y0, mid)])
 
-CACHE_DIR = PROJECT_ROOT / "DATA" / "CACHE" / "tmdb_movie_financials"
+    out.sort(key=lambda sp: sp[0]["primary_release_date.gte"])
+    return out
+
+
+def _sort_key(sort_by: str):
+    field, _, direction = sort_by.partition(".")
+    reverse = direction == "desc"
+
+    def key(m: dict):
+        v = m.get(field)
+        missing = v is None
+        if isinstance(v, str):
+            return (missing, v)
+        v = v or 0
+        return (missing, -v if reverse else v)
+
+    return key
+
+
+def _plan_discover(
+    limit: int,
+    start_page: int,
+    bucket: TokenBucket | None,
+) -> tuple[list[dict], dict[tuple[int, int], list[dict]], list[tuple[int, int]], bool]:
+    """
+    Retorna (params por faixa, resultados já buscados por (faixa, página),
+    páginas que faltam buscar em ordem, se houve divisão por ano).
+    """
+    params = {"api_key": API_KEY, **DISCOVER_PARAMS}
+    pages_needed = -(-limit // DISCOVER_PAGE_SIZE)
+
+    first = _fetch_discover_page(params, start_page, bucket)
+    if start_page == 1:
+        shards = plan_discover_shards(params, pages_needed, first_page=first, bucket=bucket)
+    else:
+        shards = [(params, first)]
+    if not shards:
+        # nenhuma faixa de ano tem resultado: plano vazio, o extract devolve um frame vazio
+        return [], {}, [], True
+    sharded = len(shards) > 1 or shards[0][0] is not params
+
+    fetched: dict[tuple[int, int], list[dict]] = {}
+    jobs: list[tuple[int, int]] = []
+    for si, (sp, page1) in enumerate(shards):
+        p0 = start_page if not sharded else 1
+        fetched[(si, p0)] = page1.get("results", [])
+        last = min(page1.get("total_pages", 0), p0 + pages_needed - 1, DISCOVER_PAGE_CAP)
+        jobs.extend((si, p) for p in range(p0 + 1, last + 1))
+
+    return [sp for sp, _ in shards], fetched, jobs, sharded
 
 
 def extract_tmdb_top_movies(
     limit: int = 1000,
     out_path: Path | str = PROJECT_ROOT / "DATA" / "ORIGINAL" / "RAW" / "top10k_tmdb.jsonl",
     start_page: int = 1,
+    max_workers: int = 4,
+    rate_per_s: float | None = None,
 ) -> pd.DataFrame:
+    """
+    Lê `total_pages` da primeira página e busca as demais em paralelo (`max_workers`).
+    Se a consulta precisar de mais que DISCOVER_PAGE_CAP páginas, ela é dividida em
+    faixas de ano (plan_discover_shards); cada faixa traz no máximo os seus `limit`
+    melhores, e o resultado é unido, deduplicado por id e reordenado por `sort_by`.
+    `start_page` só vale para a consulta sem divisão.
+    """
     out_path = Path(out_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    params = {
-        "api_key": API_KEY,
-        "sort_by": "vote_average.desc",
-        "vote_count.gte": 2000,
-        "language": "pt-BR",
-        "page": start_page,
-    }
-
-    movies: list[dict] = []
-    while len(movies) < limit:
-        resp = requests.get(DISCOVER_URL, params=params, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
+    bucket = TokenBucket(rate_per_s, burst=max_workers) if rate_per_s else None
+    shard_params, pages, jobs, sharded = _plan_discover(limit, start_page, bucket)
 
-        movies.extend(data.get("results", []))
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = pool.map(lambda j: _fetch_discover_page(shard_params[j[0]], j[1], bucket), jobs)
+        for job, data in zip(jobs, results):
+            pages[job] = data.get("results", [])
 
-        if params["page"] >= data.get("total_pages", 0):
-            break
-        params["page"] += 1
+    movies: list[dict] = []
+    seen: set[int] = set()
+    for job in sorted(pages):
+        for m in pages[job]:
+            if m.get("id") in seen:
+                continue
+            seen.add(m.get("id"))
+            movies.append(m)
 
+    if sharded:
+        movies.sort(key=_sort_key(DISCOVER_PARAMS["sort_by"]))
     movies = movies[:limit]
 
     with out_path.open("w", encoding="utf-8") as f:
@@ -60,24 +200,158 @@ def extract_tmdb_top_movies(
     return pd.DataFrame.from_records(movies)
 
 
+def _read_jsonl(path: Path) -> Iterator[dict]:
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _spill_shards(pages: Iterator[tuple[tuple[int, int], list[dict]]], tmp: Path, seen: set[int], key) -> list[Path]:
+    """
+    Grava os filmes de cada faixa (sem ids já vistos) num JSONL próprio, na ordem das páginas.
+    O TMDB devolve cada faixa já ordenada por sort_by; uma faixa que não vier ordenada
+    é reordenada no próprio arquivo (sort estável, como o do extract em lote).
+    """
+    paths: list[Path] = []
+    unsorted: list[Path] = []
+    f = None
+    current = prev = None
+    try:
+        for (si, _), results in pages:
+            if si != current:
+                if f is not None:
+                    f.close()
+                current, prev = si, None
+                paths.append(tmp / f"shard_{si:05d}.jsonl")
+                f = paths[-1].open("w", encoding="utf-8")
+            for m in results:
+                if m.get("id") in seen:
+                    continue
+                seen.add(m.get("id"))
+                k = key(m)
+                if prev is not None and k < prev and paths[-1] not in unsorted:
+                    unsorted.append(paths[-1])
+                prev = k
+                f.write(json.dumps(m, ensure_ascii=False) + "\n")
+    finally:
+        if f is not None:
+            f.close()
+
+    for path in unsorted:
+        movies = sorted(_read_jsonl(path), key=key)
+        with path.open("w", encoding="utf-8") as f:
+            for m in movies:
+                f.write(json.dumps(m, ensure_ascii=False) + "\n")
+    return paths
+
+
+def _iter_discover_pages(
+    shard_params: list[dict],
+    fetched: dict[tuple[int, int], list[dict]],
+    jobs: list[tuple[int, int]],
+    bucket: TokenBucket | None,
+    max_workers: int,
+) -> Iterator[list[dict]]:
+    """((faixa, página), resultados) na ordem, com até 2*max_workers requisições em voo."""
+    window = max(1, max_workers) * 2
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        order = sorted([*fetched, *jobs])
+        inflight: deque = deque()
+        next_job = 0
+        try:
+            for job in order:
+                # mantém a janela de requisições em voo sempre cheia, respeitando a ordem
+                while next_job < len(order) and len(inflight) < window:
+                    j = order[next_job]
+                    if j not in fetched:
+                        inflight.append((j, pool.submit(_fetch_discover_page, shard_params[j[0]], j[1], bucket)))
+                    next_job += 1
+
+                if job in fetched:
+                    yield job, fetched.pop(job)
+                else:
+                    _, fut = inflight.popleft()
+                    yield job, fut.result().get("results", [])
+        finally:
+            for _, fut in inflight:
+                fut.cancel()
+
+
+def iter_tmdb_top_movies(
+    limit: int = 1000,
+    out_path: Path | str = PROJECT_ROOT / "DATA" / "ORIGINAL" / "RAW" / "top10k_tmdb.jsonl",
+    start_page: int = 1,
+    max_workers: int = 4,
+    rate_per_s: float | None = None,
+) -> Iterator[list[dict]]:
+    """
+    Versão streaming do extract: devolve lotes de filmes e grava cada lote no JSONL bruto.
+    Sem divisão por ano, cada página sai assim que chega (no máximo ~2*max_workers páginas
+    em memória). Com divisão, o resultado tem que ser o mesmo de extract_tmdb_top_movies
+    (top `limit` global por `sort_by`): as páginas de cada faixa vão para um arquivo
+    temporário (ao lado de `out_path`) e os lotes saem, depois da última página, de um
+    heapq.merge dos arquivos até `limit` filmes — a memória não cresce com `limit`.
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    bucket = TokenBucket(rate_per_s, burst=max_workers) if rate_per_s else None
+    shard_params, fetched, jobs, sharded = _plan_discover(limit, start_page, bucket)
+    pages = _iter_discover_pages(shard_params, fetched, jobs, bucket, max_workers)
+
+    seen: set[int] = set()
+    with out_path.open("w", encoding="utf-8") as f:
+        if not sharded:
+            for _, results in pages:
+                batch = []
+                for m in results:
+                    if len(seen) >= limit:
+                        break
+                    if m.get("id") in seen:
+                        continue
+                    seen.add(m.get("id"))
+                    batch.append(m)
+
+                for m in batch:
+                    f.write(json.dumps(m, ensure_ascii=False) + "\n")
+                if batch:
+                    yield batch
+                if len(seen) >= limit:
+                    pages.close()
+                    return
+            return
+
+        # merge estável: empates saem na ordem das faixas, como no sort do extract em lote
+        key = _sort_key(DISCOVER_PARAMS["sort_by"])
+        with tempfile.TemporaryDirectory(prefix=".discover_", dir=out_path.parent) as tmp:
+            shards = [_read_jsonl(p) for p in _spill_shards(pages, Path(tmp), seen, key)]
+            try:
+                batch = []
+                for m in itertools.islice(heapq.merge(*shards, key=key), limit):
+                    f.write(json.dumps(m, ensure_ascii=False) + "\n")
+                    batch.append(m)
+                    if len(batch) == DISCOVER_PAGE_SIZE:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+            finally:
+                for r in shards:
+                    r.close()
+
+
 def fetch_tmdb_config(api_key: str) -> dict:
-    resp = requests.get(CONFIG_URL, params={"api_key": api_key}, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    return get_client().get_json(CONFIG_URL, params={"api_key": api_key})
 
 
 def fetch_genre_map(api_key: str, language: str = "pt-BR") -> dict[int, str]:
-    resp = requests.get(GENRE_URL, params={"api_key": api_key, "language": language}, timeout=30)
-    resp.raise_for_status()
-    data = resp.json()
+    data = get_client().get_json(GENRE_URL, params={"api_key": api_key, "language": language})
     return {g["id"]: g["name"] for g in data.get("genres", [])}
 
 
 def fetch_movie_financials(api_key: str, movie_id: int, language: str = "pt-BR") -> dict:
     url = MOVIE_DETAIL_URL.format(int(movie_id))
-    resp = requests.get(url, params={"api_key": api_key, "language": language}, timeout=30)
-    resp.raise_for_status()
-    d = resp.json()
+    d = get_client().get_json(url, params={"api_key": api_key, "language": language})
     return {
         "id": int(movie_id),
         "budget": d.get("budget"),
@@ -86,8 +360,49 @@ def fetch_movie_financials(api_key: str, movie_id: int, language: str = "pt-BR")
     }
 
 
-def _cache_path(movie_id: int) -> Path:
-    return CACHE_DIR / f"{int(movie_id)}.json"
+def fetch_changed_movie_ids(api_key: str, start_date: str, end_date: str | None = None) -> set[int]:
+    """Ids alterados no TMDB entre start_date e end_date (YYYY-MM-DD), via /movie/changes."""
+    params = {"api_key": api_key, "start_date": start_date, "page": 1}
+    if end_date:
+        params["end_date"] = end_date
+
+    ids: set[int] = set()
+    while True:
+        data = get_client().get_json(CHANGES_URL, params=params)
+        ids.update(int(r["id"]) for r in data.get("results", []) if r.get("id") is not None)
+        if params["page"] >= data.get("total_pages", 0):
+            break
+        params["page"] += 1
+    return ids
+
+
+class TokenBucket:
+    """Rate limiter thread-safe: no máximo `rate` requisições/s, com rajada de até `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate deve ser > 0")
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Bloqueia até haver um token disponível. Retorna o tempo dormido (s)."""
+        slept = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return slept
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+            slept += wait
+            metrics.current().add_sleep("rate_limit", wait)
 
 
 def extract_movie_financials_df(
@@ -96,22 +411,91 @@ def extract_movie_financials_df(
     language: str = "pt-BR",
     sleep_s: float = 0.15,
     use_cache: bool = True,
+    max_workers: int = 1,
+    rate_per_s: float | None = None,
+    stats: dict | None = None,
+    cache_max_age_s: float | None = None,
+    cache_path: Path | str | None = None,
 ) -> pd.DataFrame:
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    """
+    max_workers=1 mantém o modo sequencial (sleep fixo de `sleep_s` por chamada).
+    max_workers>1 busca os ids fora do cache em paralelo, limitados por um TokenBucket
+    de `rate_per_s` req/s (default: 1/sleep_s). A ordem de `movie_ids` é preservada.
+    O cache (SQLite em `cache_path`, default CACHE_DB; ver ETL/cache.py) é lido em uma única
+    query; entradas mais velhas que `cache_max_age_s` são rebuscadas. Se `stats` for passado,
+    é preenchido com contagens e throughput. Hits/misses do cache e sleeps também vão para
+    o coletor do run (ETL/metrics.py); as chamadas HTTP são registradas pelo client.
+    """
+    t0 = time.perf_counter()
+
+    ids = [int(mid) for mid in movie_ids]
+    cache = FinancialsCache(cache_path or CACHE_DB) if use_cache else None
+    pending: list[dict] = []
+    try:
+        cached: dict[int, dict] = {}
+        if cache is not None:
+            cache.migrate_from_dir(CACHE_DIR, language=language)
+            cached = cache.get_many(ids, language, max_age_s=cache_max_age_s)
+
+        rows: list[dict | None] = [cached.get(mid) for mid in ids]
+        misses = [i for i, r in enumerate(rows) if r is None]
+
+        def _store(i: int, data: dict) -> None:
+            rows[i] = data
+            if cache is None:
+                return
+            pending.append(data)
+            if len(pending) >= CACHE_FLUSH_EVERY:
+                cache.put_many(pending, language)
+                pending.clear()
+
+        slept = 0.0
+        if max_workers <= 1:
+            for i in misses:
+                _store(i, fetch_movie_financials(api_key, ids[i], language=language))
+                time.sleep(sleep_s)
+                slept += sleep_s
+                metrics.current().add_sleep("fixed", sleep_s)
+        elif misses:
+            rate = rate_per_s or (1.0 / sleep_s if sleep_s > 0 else float(max_workers))
+            bucket = TokenBucket(rate, burst=max_workers)
+            slept_lock = threading.Lock()
 
-    rows: list[dict] = []
-    for mid in movie_ids:
-        mid = int(mid)
-        p = _cache_path(mid)
+            def _limited(mid: int) -> dict:
+                nonlocal slept
+                waited = bucket.acquire()
+                with slept_lock:
+                    slept += waited
+                return fetch_movie_financials(api_key, mid, language=language)
 
-        if use_cache and p.exists():
-            data = json.loads(p.read_text(encoding="utf-8"))
-        else:
-            data = fetch_movie_financials(api_key, mid, language=language)
-            if use_cache:
-                p.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
-            time.sleep(sleep_s)
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                for i, data in zip(misses, pool.map(_limited, [ids[i] for i in misses])):
+                    _store(i, data)
+    finally:
+        if cache is not None:
+            # grava o que já foi buscado mesmo se uma chamada falhou no meio
+            try:
+                if pending:
+                    cache.put_many(pending, language)
+            finally:
+                cache.close()
 
-        rows.append(data)
+    elapsed = time.perf_counter() - t0
+    m = metrics.current()
+    m.count("financials_ids", len(ids))
+    if cache is not None:
+        m.count("financials_cache_hits", len(ids) - len(misses))
+        m.count("financials_cache_misses", len(misses))
+    if stats is not None:
+        stats.update({
+            "ids": len(ids),
+            "cache_hits": len(ids) - len(misses),
+            "fetched": len(misses),
+            "workers": max(1, max_workers),
+            "sleep_s": round(slept, 3),
+            "elapsed_s": round(elapsed, 3),
+            "fetch_rps": round(len(misses) / elapsed, 2) if elapsed > 0 else 0.0,
+        })
 
-    return pd.DataFrame(rows)
+    # sem ids (ex.: incremental sem mudanças) o frame ainda precisa das colunas
+    return pd.DataFrame(rows) if rows else pd.DataFrame(columns=["id", "budget", "revenue", "runtime"])
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from pathlib import Path
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# coluna derivada usada só para particionar (DATA/CURATED/<tabela>.parquet/release_decade=1990/...)
+PARTITION_COL = "release_decade"
+# nome de diretório que a leitura "hive" do Arrow entende como década nula
+HIVE_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+# posição da linha na ordem em que foi gravada (ordem do discover): a leitura particionada
+# devolve as linhas década a década, e os leitores reordenam por ela
+RANK_COL = "_row_rank"
+ROW_GROUP_ROWS = 128 * 1024
+
+CURATED_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("title", pa.string()),
+    ("original_title", pa.string()),
+    ("original_language", pa.dictionary(pa.int32(), pa.string())),
+    ("overview", pa.string()),
+    ("release_date", pa.timestamp("ms")),
+    ("release_year", pa.int64()),
+    ("genre_ids", pa.list_(pa.int64())),
+    ("genres_names", pa.list_(pa.string())),
+    ("genres_str", pa.string()),
+    ("popularity", pa.float64()),
+    ("vote_average", pa.float64()),
+    ("vote_count", pa.int64()),
+    ("weighted_rating", pa.float64()),
+    ("poster_path", pa.string()),
+    ("backdrop_path", pa.string()),
+    ("poster_url", pa.string()),
+    ("backdrop_url", pa.string()),
+    ("budget", pa.float64()),
+    ("revenue", pa.float64()),
+    ("runtime", pa.float64()),
+    ("profit", pa.float64()),
+    ("roi", pa.float64()),
+    ("revenue_to_budget", pa.float64()),
+    ("revenue_per_min", pa.float64()),
+    ("roi_ready", pa.bool_()),
+])
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """
+    Converte o DataFrame curated para Arrow com os tipos de CURATED_SCHEMA.
+    Colunas fora do schema são mantidas com o tipo inferido pelo Arrow.
+    """
+    arrays, fields = [], []
+    for c in df.columns:
+        arr = pa.array(df[c], from_pandas=True)
+        idx = CURATED_SCHEMA.get_field_index(c)
+        if idx >= 0:
+            field = CURATED_SCHEMA.field(idx)
+            arr = arr.cast(field.type)
+        else:
+            field = pa.field(c, arr.type)
+        arrays.append(arr)
+        fields.append(field)
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def _split_by_decade(table: pa.Table) -> list[tuple[str, pa.Table]]:
+    """[(diretório da partição, linhas daquela década)], mantendo a ordem das linhas em cada uma."""
+    decade = (table["release_year"].to_pandas() // 10 * 10).astype("Int64")
+    parts = []
+    for d in decade.drop_duplicates().sort_values():
+        mask = decade.isna() if pd.isna(d) else decade.eq(d).fillna(False)
+        name = HIVE_NULL_PARTITION if pd.isna(d) else str(int(d))
+        parts.append((f"{PARTITION_COL}={name}", table.filter(pa.array(mask.to_numpy(dtype=bool)))))
+    return parts
+
+
+def _swap_dir(tmp: Path, path: Path) -> None:
+    # troca o diretório inteiro de uma vez: quem lê durante o refresh vê a versão antiga ou a nova
+    old = path.with_name(path.name + ".old")
+    if old.exists():
+        shutil.rmtree(old)
+    if path.exists():
+        path.rename(old)
+    tmp.rename(path)
+    if old.exists():
+        shutil.rmtree(old)
+
+
+class CuratedParquetWriter:
+    """
+    Escreve um dataset Parquet (particionado por década quando há release_year) em chunks:
+    um pq.ParquetWriter aberto por partição (um arquivo por década), com as linhas acumuladas
+    até ROW_GROUP_ROWS antes de cada row group. RANK_COL guarda a ordem das linhas.
+    Os arquivos vão para um diretório temporário e só substituem `path` no close().
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+        if self.tmp.exists():
+            shutil.rmtree(self.tmp)
+        self.tmp.mkdir(parents=True)
+        self._writers: dict[str, pq.ParquetWriter] = {}
+        self._pending: dict[str, list[pa.Table]] = {}
+        self._rows = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        if len(df) == 0:
+            return
+        table = to_arrow(df)
+        rank = np.arange(self._rows, self._rows + len(df), dtype=np.int64)
+        table = table.append_column(RANK_COL, pa.array(rank))
+        self._rows += len(df)
+        # tabelas sem release_year (ex.: financeiro) não são particionadas
+        parts = _split_by_decade(table) if "release_year" in table.column_names else [("", table)]
+        for key, part in parts:
+            self._pending.setdefault(key, []).append(part)
+            self._flush(key, full_groups_only=True)
+
+    def _flush(self, key: str, full_groups_only: bool = False) -> None:
+        pending = self._pending.get(key)
+        n = sum(len(t) for t in pending) if pending else 0
+        n_write = n // ROW_GROUP_ROWS * ROW_GROUP_ROWS if full_groups_only else n
+        if n_write == 0:
+            return
+
+        writer = self._writers.get(key)
+        if writer is None:
+            out_dir = self.tmp / key
+            out_dir.mkdir(exist_ok=True)
+            writer = pq.ParquetWriter(out_dir / "part-0.parquet", pending[0].schema, compression="zstd")
+            self._writers[key] = writer
+        table = pa.concat_tables([t.cast(writer.schema) for t in pending])
+        writer.write_table(table.slice(0, n_write), row_group_size=ROW_GROUP_ROWS)
+        self._pending[key] = [table.slice(n_write)] if n_write < n else []
+
+    def _close_writers(self) -> None:
+        for w in self._writers.values():
+            w.close()
+        self._writers.clear()
+
+    def close(self) -> None:
+        for key in list(self._pending):
+            self._flush(key)
+        self._close_writers()
+        _swap_dir(self.tmp, self.path)
+
+    def __enter__(self) -> CuratedParquetWriter:
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_writers()
+            shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+def write_curated_parquet(df: pd.DataFrame, path: Path | str) -> Path:
+    with CuratedParquetWriter(path) as w:
+        w.write(df)
+    return Path(path)
+
+
+def read_curated_parquet(
+    path: Path | str,
+    columns: list[str] | None = None,
+    filters=None,
+) -> pd.DataFrame:
+    """
+    Leitura com projeção de colunas (e filtros opcionais, ex.: [("release_decade", ">=", 1990)]),
+    na ordem em que as linhas foram gravadas.
+    """
+    read_cols = columns
+    if columns is not None and RANK_COL in ds.dataset(path, partitioning="hive").schema.names:
+        read_cols = [*columns, RANK_COL]
+    table = pq.read_table(path, columns=read_cols, filters=filters, partitioning="hive")
+    if PARTITION_COL in table.column_names:
+        if columns is None or PARTITION_COL not in columns:
+            table = table.drop_columns([PARTITION_COL])
+        else:
+            # vem como dictionary (com a década nula), que o sort do Arrow não aceita
+            i = table.column_names.index(PARTITION_COL)
+            table = table.set_column(i, PARTITION_COL, table[PARTITION_COL].cast(pa.int64()))
+    if RANK_COL in table.column_names:
+        table = table.sort_by(RANK_COL).drop_columns([RANK_COL])
+    return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+
+def write_curated_jsonl(df: pd.DataFrame, path: Path | str) -> Path:
+    """Export JSONL (formato legado, legível por pd.read_json(lines=True))."""
+    path = Path(path)
+    with path.open("w", encoding="utf-8") as f:
+        df.to_json(f, orient="records", lines=True, force_ascii=False, date_format="iso")
+    return path
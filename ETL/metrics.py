@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+import json
+import threading
+import time
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+REPORTS_DIR = PROJECT_ROOT / "DATA" / "REPORTS"
+
+PERCENTILES = (50, 90, 99)
+
+
+def endpoint_of(url: str) -> str:
+    """Rota sem a versão da API e com ids trocados por {id}: ".../3/movie/550" -> "movie/{id}"."""
+    parts = [p for p in urlparse(url).path.split("/") if p]
+    if parts and parts[0].isdigit():
+        parts = parts[1:]
+    return "/".join("{id}" if p.isdigit() else p for p in parts)
+
+
+def _latency_summary(values: list[float]) -> dict:
+    if not values:
+        return {}
+    a = np.asarray(values) * 1e3
+    out = {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(a, PERCENTILES))}
+    out["mean"] = round(float(a.mean()), 2)
+    out["max"] = round(float(a.max()), 2)
+    return out
+
+
+class RunMetrics:
+    """
+    Métricas de um run do refresh, thread-safe (o extract usa vários workers):
+    - http: por rota, tentativas, status, erros de rede, bytes e latência de cada tentativa;
+    - sleep: tempo dormido por motivo (rate_limit, fixed, retry_backoff), somado entre as threads;
+    - counters: contagens livres (ex.: financials_cache_hits);
+    - stages: duração e linhas por etapa do refresh (somadas quando a etapa se repete, ex. chunks).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self.http: dict[str, dict] = defaultdict(
+            lambda: {"attempts": 0, "retries": 0, "errors": 0, "bytes": 0, "status": defaultdict(int), "latency_s": []}
+        )
+        self.sleep_s: dict[str, float] = defaultdict(float)
+        self.counters: dict[str, int] = defaultdict(int)
+        self.stages: dict[str, dict] = {}
+        self.info: dict = {}  # parâmetros do run (modo, limit, workers...), copiados no relatório
+
+    # --- coleta ---
+
+    def record_http(
+        self,
+        url: str,
+        *,
+        latency_s: float,
+        status: int | None = None,
+        nbytes: int = 0,
+        retry: bool = False,
+    ) -> None:
+        """Uma tentativa HTTP (status None = erro de rede/timeout)."""
+        with self._lock:
+            h = self.http[endpoint_of(url)]
+            h["attempts"] += 1
+            h["retries"] += int(retry)
+            h["bytes"] += nbytes
+            h["latency_s"].append(latency_s)
+            if status is None:
+                h["errors"] += 1
+            else:
+                h["status"][str(status)] += 1
+
+    def add_sleep(self, reason: str, seconds: float) -> None:
+        if seconds > 0:
+            with self._lock:
+                self.sleep_s[reason] += seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    @contextmanager
+    def stage(self, name: str, *, rows_in: int | None = None):
+        """Mede uma etapa; o dict devolvido aceita rows_out (e outros campos numéricos)."""
+        extra: dict = {}
+        t0 = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                st = self.stages.setdefault(name, {"runs": 0, "elapsed_s": 0.0})
+                st["runs"] += 1
+                st["elapsed_s"] += elapsed
+                if rows_in is not None:
+                    st["rows_in"] = st.get("rows_in", 0) + rows_in
+                for k, v in extra.items():
+                    st[k] = st.get(k, 0) + v
+
+    # --- relatório ---
+
+    def report(self) -> dict:
+        with self._lock:
+            http = {}
+            all_latency: list[float] = []
+            for ep, h in sorted(self.http.items()):
+                all_latency.extend(h["latency_s"])
+                http[ep] = {
+                    "attempts": h["attempts"],
+                    "retries": h["retries"],
+                    "errors": h["errors"],
+                    "status": dict(sorted(h["status"].items())),
+                    "bytes": h["bytes"],
+                    "latency_ms": _latency_summary(h["latency_s"]),
+                }
+            hits = self.counters.get("financials_cache_hits", 0)
+            lookups = hits + self.counters.get("financials_cache_misses", 0)
+            return {
+                "started_at": self.started_at.isoformat(),
+                "elapsed_s": round(time.perf_counter() - self._t0, 3),
+                "run": dict(self.info),
+                "http": {
+                    "attempts": sum(h["attempts"] for h in http.values()),
+                    "retries": sum(h["retries"] for h in http.values()),
+                    "errors": sum(h["errors"] for h in http.values()),
+                    "bytes": sum(h["bytes"] for h in http.values()),
+                    "latency_ms": _latency_summary(all_latency),
+                    "by_endpoint": http,
+                },
+                "cache": {
+                    "financials_hits": hits,
+                    "financials_lookups": lookups,
+                    "financials_hit_ratio": round(hits / lookups, 4) if lookups else None,
+                },
+                "sleep_s": {k: round(v, 3) for k, v in sorted(self.sleep_s.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "stages": {
+                    k: {**v, "elapsed_s": round(v["elapsed_s"], 3)} for k, v in self.stages.items()
+                },
+            }
+
+    def write(self, path: Path | str) -> dict:
+        report = self.report()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        return report
+
+
+_current = RunMetrics()
+_current_lock = threading.Lock()
+
+
+def current() -> RunMetrics:
+    """Coletor do run atual (o client HTTP e o extract registram aqui)."""
+    with _current_lock:
+        return _current
+
+
+def start_run() -> RunMetrics:
+    """Começa um coletor novo (chamado no início de refresh.main)."""
+    global _current
+    with _current_lock:
+        _current = RunMetrics()
+        return _current
+
+
+def report_path(started_at: datetime, directory: Path = REPORTS_DIR) -> Path:
+    return directory / f"refresh_{started_at.strftime('%Y%m%dT%H%M%SZ')}.json"
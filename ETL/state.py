@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import math
+from typing import Iterable
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+STATE_FILE = PROJECT_ROOT / "DATA" / "STATE" / "refresh_watermarks.json"
+
+
+def load_state(path: Path | str | None = None) -> dict | None:
+    """
+    Watermarks do último refresh (default: STATE_FILE):
+    {"last_run": ISO-8601 UTC, "movies": {"<id>": {"vote_count": int, "popularity": float}}}
+    """
+    path = Path(path or STATE_FILE)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_state(df_raw: pd.DataFrame, path: Path | str | None = None, run_at: datetime | None = None) -> dict:
+    with StateWriter(path, run_at=run_at) as w:
+        w.add(zip(df_raw["id"], df_raw["vote_count"], df_raw["popularity"]))
+        w.commit()
+    return load_state(w.path)
+
+
+class StateWriter:
+    """
+    Grava os watermarks aos poucos (ex.: lote a lote no refresh em streaming), no formato de
+    load_state: as entradas vão direto para um .tmp, que só substitui o estado no commit().
+    Saindo do `with` sem commit (erro no meio do run), o estado anterior fica intacto.
+    """
+
+    def __init__(self, path: Path | str | None = None, run_at: datetime | None = None):
+        self.path = Path(path or STATE_FILE)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp = self.path.with_suffix(".tmp")
+        self.count = 0
+        run_at = run_at or datetime.now(timezone.utc)
+        self._f = self.tmp.open("w", encoding="utf-8")
+        self._f.write(f'{{"last_run": {json.dumps(run_at.isoformat(timespec="seconds"))}, "movies": {{')
+
+    def add(self, rows: Iterable[tuple]) -> None:
+        """rows: (id, vote_count, popularity)."""
+        for mid, vc, pop in rows:
+            entry = json.dumps({"vote_count": _num(vc), "popularity": _num(pop)})
+            self._f.write(f'{", " if self.count else ""}"{int(mid)}": {entry}')
+            self.count += 1
+
+    def commit(self) -> None:
+        self._f.write("}}")
+        self._f.close()
+        self.tmp.replace(self.path)
+
+    def __enter__(self) -> StateWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self._f.closed:
+            self._f.close()
+            self.tmp.unlink(missing_ok=True)
+
+
+def diff_watermarks(df_raw: pd.DataFrame, state: dict) -> tuple[set[int], set[int]]:
+    """Compara o discover atual com os watermarks. Retorna (ids_novos, ids_com_vote_count/popularity alterados)."""
+    marks = state.get("movies", {})
+    new_ids: set[int] = set()
+    changed_ids: set[int] = set()
+    for mid, vc, pop in zip(df_raw["id"], df_raw["vote_count"], df_raw["popularity"]):
+        prev = marks.get(str(int(mid)))
+        if prev is None:
+            new_ids.add(int(mid))
+        elif not _same(prev["vote_count"], _num(vc)) or not _same(prev["popularity"], _num(pop)):
+            changed_ids.add(int(mid))
+    return new_ids, changed_ids
+
+
+def _same(a, b) -> bool:
+    # floats relidos de JSON podem diferir no último dígito (7.6286 vs 7.6286000000000005)
+    if a is None or b is None:
+        return a is b
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def _num(x):
+    if x is None or pd.isna(x):
+        return None
+    return int(x) if float(x).is_integer() else float(x)
@@ -1,98 +1,343 @@
 from __future__ import annotations
+import sys
+import time
+import tracemalloc
+import numpy as np
 import pandas as pd
 
 
-def build_image_url(config: dict, file_path: str | None, kind: str = "poster", size: str | None = None) -> str | None:
-    if not file_path:
-        return None
-
+def _image_prefix(config: dict, kind: str = "poster", size: str | None = None) -> str:
     images = config["images"]
     base = images["secure_base_url"]
 
     sizes = images["poster_sizes"] if kind == "poster" else images["backdrop_sizes"]
     chosen = size or ("w342" if "w342" in sizes else sizes[0])
-    return f"{base}{chosen}{file_path}"
+    return f"{base}{chosen}"
+
+
+def build_image_url(config: dict, file_path: str | None, kind: str = "poster", size: str | None = None) -> str | None:
+    if not file_path:
+        return None
+    return f"{_image_prefix(config, kind, size)}{file_path}"
+
+
+def _image_urls(paths: pd.Series, prefix: str) -> pd.Series:
+    # base/tamanho resolvidos uma vez por coluna; concatenação vetorizada
+    ok = paths.notna() & (paths != "")
+    return (prefix + paths.astype(str)).where(ok)
+
+
+def _genre_columns(genre_ids: pd.Series, genre_map: dict[int, str]) -> tuple[pd.Series, pd.Series]:
+    """
+    genres_names/genres_str por combinação distinta de genre_ids: o catálogo tem poucas
+    combinações (milhares) mesmo com milhões de filmes, então o trabalho por linha é só
+    um factorize + take.
+    """
+    keys = pd.Series(
+        [tuple(ids) if isinstance(ids, (list, tuple, np.ndarray)) else () for ids in genre_ids.to_numpy()],
+        dtype=object,
+    )
+    codes, uniques = pd.factorize(keys)
+
+    names = [[genre_map.get(i, f"UNKNOWN_{i}") for i in combo] for combo in uniques]
+    joined = [", ".join(xs) for xs in names]
+
+    names_arr = pd.Series(names + [[]], dtype=object).to_numpy()
+    joined_arr = pd.Series(joined + [""], dtype=object).to_numpy()
+    return (
+        pd.Series(names_arr[codes], index=genre_ids.index, dtype=object),
+        pd.Series(joined_arr[codes], index=genre_ids.index, dtype=object),
+    )
 
 
-def transform_enrich(df: pd.DataFrame, genre_map: dict[int, str], tmdb_config: dict) -> pd.DataFrame:
+def weighted_rating(v: pd.Series, R: pd.Series, C: float, m: int = 2000) -> pd.Series:
+    return ((v / (v + m)) * R + (m / (v + m)) * C).round(2)
+
+
+class RunningMean:
+    """Média incremental (para obter o C global do weighted_rating sem ter o catálogo inteiro em memória)."""
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, values) -> None:
+        v = pd.to_numeric(pd.Series(values), errors="coerce").dropna()
+        self.total += float(v.sum())
+        self.count += len(v)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float("nan")
+
+
+def transform_enrich(
+    df: pd.DataFrame,
+    genre_map: dict[int, str],
+    tmdb_config: dict,
+    C: float | None = None,
+) -> pd.DataFrame:
     df = df.copy()
 
-    df["release_date"] = pd.to_datetime(df["release_date"], errors="coerce")
+    df["release_date"] = pd.to_datetime(df["release_date"], errors="coerce", format="ISO8601")
     df["release_year"] = df["release_date"].dt.year
 
-    df["genres_names"] = df["genre_ids"].apply(
-        lambda ids: [genre_map.get(i, f"UNKNOWN_{i}") for i in (ids or [])]
-    )
-    df["genres_str"] = df["genres_names"].apply(lambda xs: ", ".join(xs))
+    df["genres_names"], df["genres_str"] = _genre_columns(df["genre_ids"], genre_map)
 
-    m = 2000
-    C = pd.to_numeric(df["vote_average"], errors="coerce").mean()
     v = pd.to_numeric(df["vote_count"], errors="coerce")
     R = pd.to_numeric(df["vote_average"], errors="coerce")
+    # C = média global; passe-o explicitamente ao transformar só parte do catálogo
+    if C is None:
+        C = R.mean()
 
-    df["weighted_rating"] = (v / (v + m)) * R + (m / (v + m)) * C
-    df["weighted_rating"] = df["weighted_rating"].round(2)
+    df["weighted_rating"] = weighted_rating(v, R, C)
 
-    df["poster_url"] = df["poster_path"].apply(lambda p: build_image_url(tmdb_config, p, "poster"))
-    df["backdrop_url"] = df["backdrop_path"].apply(lambda p: build_image_url(tmdb_config, p, "backdrop"))
+    df["poster_url"] = _image_urls(df["poster_path"], _image_prefix(tmdb_config, "poster"))
+    df["backdrop_url"] = _image_urls(df["backdrop_path"], _image_prefix(tmdb_config, "backdrop"))
 
     return df
 
 
-def transform_clean(df: pd.DataFrame, drop_cols: bool = True) -> pd.DataFrame:
-    df = df.copy()
+CLEAN_STR_COLS = [
+    "title", "original_title", "overview",
+    "poster_path", "backdrop_path", "original_language",
+    "genres_str",
+]
+CLEAN_NUM_COLS = ["popularity", "vote_average", "vote_count", "weighted_rating"]
+CLEAN_CRITICAL_COLS = ["id", "title", "vote_average", "vote_count"]
+NULL_SENTINELS = ["", "None", "null", "NaN"]
+
+
+def _normalize_strings(df: pd.DataFrame, cols: list[str]) -> dict[str, pd.Series]:
+    # bloco com todas as colunas de texto: um astype, strip por coluna e um único isin/mask
+    block = df[cols].astype("string")
+    block = block.apply(lambda s: s.str.strip())
+    block = block.mask(block.isin(NULL_SENTINELS))
+    return {c: block[c] for c in cols}
+
+
+def _peak_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def transform_clean(
+    df: pd.DataFrame,
+    drop_cols: bool = True,
+    *,
+    copy: bool = True,
+    report: dict | None = None,
+) -> pd.DataFrame:
+    """
+    copy=False: o chamador cede o DataFrame (ex.: saída de transform_enrich) e ele pode ser
+    alterado no lugar; as linhas descartadas saem num único filtro no fim, sem cópias
+    intermediárias. Se `report` for passado, recebe linhas descartadas por regra, tamanho
+    dos frames de entrada/saída e o pico de RSS do processo (mais o pico do estágio, se o
+    tracemalloc estiver ligado).
+    """
+    if report is not None:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        mem_in = int(df.memory_usage(deep=True).sum())
+
+    n_in = len(df)
+    cols: dict[str, pd.Series] = {}
 
-    if "id" in df.columns:
-        df = df.drop_duplicates(subset=["id"])
+    str_cols = [c for c in CLEAN_STR_COLS if c in df.columns]
+    if str_cols:
+        cols.update(_normalize_strings(df, str_cols))
 
-    str_cols = [c for c in [
-        "title", "original_title", "overview",
-        "poster_path", "backdrop_path", "original_language",
-        "genres_str"
-    ] if c in df.columns]
+    for c in [x for x in CLEAN_NUM_COLS if x in df.columns]:
+        s = df[c]
+        cols[c] = s if pd.api.types.is_numeric_dtype(s) else pd.to_numeric(s, errors="coerce")
 
-    for c in str_cols:
-        df[c] = df[c].astype("string").str.strip()
-        df.loc[df[c].isin(["", "None", "null", "NaN"]), c] = pd.NA
+    if "vote_average" in cols:
+        va = cols["vote_average"]
+        cols["vote_average"] = va.mask((va < 0) | (va > 10))
+    if "weighted_rating" in cols:
+        wr = cols["weighted_rating"]
+        cols["weighted_rating"] = wr.mask((wr < 0) | (wr > 10)).round(2)
 
-    for c in [x for x in ["popularity", "vote_average", "vote_count", "weighted_rating"] if x in df.columns]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
+    # regras de descarte, na ordem: id duplicado, depois cada coluna crítica nula
+    dropped: dict[str, int] = {}
+    drop = df["id"].duplicated().to_numpy(copy=True) if "id" in df.columns else np.zeros(n_in, dtype=bool)
+    dropped["duplicate_id"] = int(drop.sum())
+    for c in [x for x in CLEAN_CRITICAL_COLS if x in df.columns]:
+        missing = cols.get(c, df[c]).isna().to_numpy() & ~drop
+        dropped[f"missing_{c}"] = int(missing.sum())
+        drop |= missing
 
-    if "vote_average" in df.columns:
-        df.loc[(df["vote_average"] < 0) | (df["vote_average"] > 10), "vote_average"] = pd.NA
-    if "weighted_rating" in df.columns:
-        df.loc[(df["weighted_rating"] < 0) | (df["weighted_rating"] > 10), "weighted_rating"] = pd.NA
-        df["weighted_rating"] = df["weighted_rating"].round(2)
+    keep = ~drop
+    if drop.any():
+        out = df.take(np.flatnonzero(keep))
+        cols = {c: s[keep].set_axis(out.index) for c, s in cols.items()}
+    else:
+        out = df if not copy else df.copy(deep=False)
 
-    critical = [c for c in ["id", "title", "vote_average", "vote_count"] if c in df.columns]
-    df = df.dropna(subset=critical)
+    for c, s in cols.items():
+        out[c] = s
 
-    if "id" in df.columns:
-        df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64")
-    if "vote_count" in df.columns:
-        df["vote_count"] = df["vote_count"].astype("Int64")
-    if "release_year" in df.columns:
-        df["release_year"] = df["release_year"].astype("Int64")
+    if "id" in out.columns:
+        out["id"] = pd.to_numeric(out["id"], errors="coerce").astype("Int64")
+    if "vote_count" in out.columns:
+        out["vote_count"] = out["vote_count"].astype("Int64")
+    if "release_year" in out.columns:
+        out["release_year"] = out["release_year"].astype("Int64")
 
     if drop_cols:
-        df = df.drop(columns=["adult", "video"], errors="ignore")
+        for c in [x for x in ["adult", "video"] if x in out.columns]:
+            del out[c]
 
-    if "overview" in df.columns:
-        df["overview"] = df["overview"].fillna("")
+    if "overview" in out.columns:
+        out["overview"] = out["overview"].fillna("")
 
+    if report is not None:
+        report.update({
+            "rows_in": n_in,
+            "rows_out": len(out),
+            "dropped": dropped,
+            "elapsed_s": round(time.perf_counter() - t0, 3),
+            "mem_in_mb": round(mem_in / 1e6, 2),
+            "mem_out_mb": round(float(out.memory_usage(deep=True).sum()) / 1e6, 2),
+            "peak_rss_mb": round(_peak_rss_bytes() / 1e6, 2),
+        })
+        # pico do próprio estágio só quando o chamador já liga o tracemalloc (custa caro)
+        if tracemalloc.is_tracing():
+            report["stage_peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+
+    return out
+
+
+FINANCIAL_COLS = ["budget", "revenue", "runtime", "profit", "roi", "revenue_to_budget", "revenue_per_min", "roi_ready"]
+
+
+def add_roi_ready(df: pd.DataFrame) -> pd.DataFrame:
+    """roi_ready: ROI calculável (roi e profit não nulos; implica budget > 0 e revenue preenchido)."""
+    df["roi_ready"] = df["roi"].notna() & df["profit"].notna()
     return df
 
 
-def transform_add_roi(df_movies: pd.DataFrame, df_fin: pd.DataFrame) -> pd.DataFrame:
-    df = df_movies.copy().merge(df_fin, on="id", how="left")
+def transform_financials(df_fin: pd.DataFrame) -> pd.DataFrame:
+    """Tabela financeira normalizada: id + FINANCIAL_COLS (uma linha por filme, sem colunas do filme)."""
+    df = df_fin.drop_duplicates(subset=["id"]).reset_index(drop=True)
+    df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64")
 
     for c in ["budget", "revenue", "runtime"]:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
+        df[c] = pd.to_numeric(df[c], errors="coerce") if c in df.columns else float("nan")
 
     df["profit"] = df["revenue"] - df["budget"]
     df["roi"] = (df["profit"] / df["budget"]).where(df["budget"] > 0)
     df["revenue_to_budget"] = (df["revenue"] / df["budget"]).where(df["budget"] > 0)
     df["revenue_per_min"] = (df["revenue"] / df["runtime"]).where(df["runtime"] > 0)
+    add_roi_ready(df)
+
+    return df[["id", *FINANCIAL_COLS]]
+
+
+def transform_add_roi(df_movies: pd.DataFrame, df_fin: pd.DataFrame) -> pd.DataFrame:
+    """Visão "larga" (filme + financeiro), equivalente a join_financials(movies, transform_financials(fin))."""
+    return join_financials(df_movies, transform_financials(df_fin))
+
+
+def join_financials(df_movies: pd.DataFrame, df_financials: pd.DataFrame) -> pd.DataFrame:
+    return df_movies.merge(df_financials, on="id", how="left")
+
+
+CUBE_KEYS = ["release_year", "genre", "vote_bucket"]
+CUBE_MEASURES = ["weighted_rating", "vote_count", "popularity"]
+CUBE_VOTE_BUCKET = 500
+CUBE_ALL_GENRES = ""  # linha de rollup: todos os filmes, cada um contado uma vez
+
+
+def transform_cube(df: pd.DataFrame, vote_bucket: int = CUBE_VOTE_BUCKET) -> pd.DataFrame:
+    """
+    Cubo aditivo para os agregados da UI, por (release_year, genre, vote_bucket):
+    n (filmes) e, para cada coluna de CUBE_MEASURES, <col>_n (não nulos), <col>_sum e
+    <col>_sumsq. Cada filme entra uma vez por gênero e uma vez em genre == CUBE_ALL_GENRES.
+    vote_bucket = piso de vote_count (nulo = 0) em múltiplos de `vote_bucket`.
+    """
+    votes = pd.to_numeric(df["vote_count"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    base = {
+        "release_year": df["release_year"].astype("Int64").to_numpy(),
+        "vote_bucket": votes // vote_bucket * vote_bucket,
+        "n": np.ones(len(df), dtype=np.int64),
+    }
+    for c in CUBE_MEASURES:
+        v = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        ok = ~np.isnan(v)
+        base[f"{c}_n"] = ok.astype(np.int64)
+        base[f"{c}_sum"] = np.where(ok, v, 0.0)
+        base[f"{c}_sumsq"] = np.where(ok, v * v, 0.0)
+
+    # uma linha por (filme, gênero), sem explode: repete as posições pelo nº de gêneros
+    names = [x if isinstance(x, (list, tuple, np.ndarray)) else [] for x in df["genres_names"].to_numpy()]
+    rep = np.repeat(np.arange(len(df)), [len(x) for x in names])
+    per_genre = {k: v[rep] for k, v in base.items()}
+    per_genre["genre"] = np.array([g for x in names for g in x], dtype=object)
 
+    rows = pd.concat(
+        [pd.DataFrame(per_genre), pd.DataFrame({**base, "genre": CUBE_ALL_GENRES})],
+        ignore_index=True,
+    )
+    return combine_cubes([rows])
+
+
+def combine_cubes(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """Soma cubos parciais (ex.: um por chunk no refresh em streaming)."""
+    cube = pd.concat(parts, ignore_index=True)
+    cube["release_year"] = cube["release_year"].astype("Int64")
+    return (
+        cube.groupby(CUBE_KEYS, dropna=False, sort=True)
+            .sum()
+            .reset_index()
+    )
+
+
+class RunningCube:
+    """Cubo somado chunk a chunk (refresh em streaming): cresce com as chaves do cubo, não com as linhas."""
+
+    def __init__(self):
+        self.cube: pd.DataFrame | None = None
+
+    def update(self, df: pd.DataFrame) -> None:
+        part = transform_cube(df)
+        self.cube = part if self.cube is None else combine_cubes([self.cube, part])
+
+
+def transform_upsert(
+    df_existing: pd.DataFrame,
+    df_updates: pd.DataFrame,
+    keep_ids: list[int] | None = None,
+    key: str = "id",
+) -> pd.DataFrame:
+    """
+    Substitui/insere as linhas de `df_updates` em `df_existing` pela chave.
+    Se `keep_ids` for passado, mantém só esses ids e nessa ordem (ordem do discover).
+    """
+    base = df_existing[~df_existing[key].isin(df_updates[key])]
+    out = pd.concat([base, df_updates], ignore_index=True)
+
+    if keep_ids is not None:
+        pos = pd.Series(range(len(keep_ids)), index=pd.Index(keep_ids, dtype="Int64"))
+        out = (
+            out.assign(_pos=out[key].astype("Int64").map(pos))
+               .dropna(subset=["_pos"])
+               .sort_values("_pos", kind="stable")
+               .drop(columns="_pos")
+               .reset_index(drop=True)
+        )
+
+    return out
+
+
+def recompute_weighted_rating(df: pd.DataFrame, C: float, m: int = 2000) -> pd.DataFrame:
+    """Recalcula weighted_rating com a média global C (que muda quando o catálogo muda)."""
+    v = pd.to_numeric(df["vote_count"], errors="coerce")
+    R = pd.to_numeric(df["vote_average"], errors="coerce")
+    df["weighted_rating"] = weighted_rating(v, R, C, m)
     return df
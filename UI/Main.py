@@ -1,12 +1,16 @@
 import streamlit as st
 
 from components.data import load_curated, load_financial_curated
-from components.formatters import fmt2, fmt0, pct2, money_short
+from components.formatters import fmt2, fmt0, pct2, pct2_col, money_short_col
 from components.kpi import kpi, status_by_threshold
 from components.charts import hist_weighted_rating, titles_per_year
+from components.chart_cache import render_chart
 from components.footer import render_footer
+from components.perf import render_perf_panel
 from components.viz_theme import enable_altair_theme
-from components.quality import roi_ready_coverage
+from components.quality import roi_ready_coverage, roi_ready_rows
+from components.cube import get_cube, cube_totals, cube_titles_per_year
+from components.topk import top_k
 
 st.set_page_config(
     page_title="TMDB – BI Dashboard",
@@ -35,12 +39,21 @@ with st.sidebar:
     st.code("python refresh.py\nstreamlit run UI/app.py", language="bash")
     if st.button("Clear cache (dev)"):
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
 
+# KPIs do catálogo inteiro pelo cubo do refresh (sem filtro de ano: inclui filmes sem ano)
+cube = get_cube(df)
+tot = cube_totals(cube)
+
 min_year = int(df["release_year"].dropna().min()) if len(df) else 0
 max_year = int(df["release_year"].dropna().max()) if len(df) else 0
-avg_wr = float(df["weighted_rating"].mean()) if len(df) else 0.0
-avg_votes = float(df["vote_count"].mean()) if "vote_count" in df.columns and len(df) else 0.0
+if tot is not None:
+    avg_wr = float(tot["avg_weighted_rating"]) if tot["weighted_rating_n"] else 0.0
+    avg_votes = float(tot["avg_vote_count"]) if tot["vote_count_n"] else 0.0
+else:
+    avg_wr = float(df["weighted_rating"].mean()) if len(df) else 0.0
+    avg_votes = float(df["vote_count"].mean()) if "vote_count" in df.columns and len(df) else 0.0
 
 c1, c2, c3, c4, c5 = st.columns(5)
 with c1:
@@ -72,7 +85,10 @@ with dq1:
     )
 
 with dq2:
-    null_wr = float(df["weighted_rating"].isna().mean()) if "weighted_rating" in df.columns and len(df) else 0.0
+    if tot is not None:
+        null_wr = 1 - tot["weighted_rating_n"] / tot["n"] if tot["n"] else 0.0
+    else:
+        null_wr = float(df["weighted_rating"].isna().mean()) if "weighted_rating" in df.columns and len(df) else 0.0
     kpi(
         "Missing weighted_rating",
         pct2(null_wr),
@@ -81,7 +97,10 @@ with dq2:
     )
 
 with dq3:
-    null_pop = float(df["popularity"].isna().mean()) if "popularity" in df.columns and len(df) else 0.0
+    if tot is not None:
+        null_pop = 1 - tot["popularity_n"] / tot["n"] if tot["n"] else 0.0
+    else:
+        null_pop = float(df["popularity"].isna().mean()) if "popularity" in df.columns and len(df) else 0.0
     kpi(
         "Missing popularity",
         pct2(null_pop),
@@ -94,44 +113,31 @@ colA, colB, colC = st.columns(3)
 
 with colA:
     st.markdown("#### Curation pick")
-    pick = (
-        df.dropna(subset=["weighted_rating"])
-          .sort_values(["weighted_rating", "vote_count"], ascending=False)
-          .head(5)[["title", "release_year", "weighted_rating", "vote_count"]]
-          .copy()
-    )
+    pick = top_k(df, ["weighted_rating", "vote_count"], 5, dropna=True, base=df)[
+        ["title", "release_year", "weighted_rating", "vote_count"]
+    ].copy()
     pick["weighted_rating"] = pick["weighted_rating"].round(2)
     st.dataframe(pick, hide_index=True, use_container_width=True)
 
 with colB:
     st.markdown("#### Demand (top popularity)")
-    top_pop = (
-        df.dropna(subset=["popularity"])
-          .sort_values("popularity", ascending=False)
-          .head(5)[["title", "release_year", "popularity", "weighted_rating"]]
-          .copy()
-    )
+    top_pop = top_k(df, "popularity", 5, dropna=True, base=df)[
+        ["title", "release_year", "popularity", "weighted_rating"]
+    ].copy()
     top_pop["popularity"] = top_pop["popularity"].round(2)
     top_pop["weighted_rating"] = top_pop["weighted_rating"].round(2)
     st.dataframe(top_pop, hide_index=True, use_container_width=True)
 
 with colC:
     st.markdown("#### ROI (top)")
-    fin_for_top = df_fin.copy()
+    fin_for_top = df_fin
     if all(c in fin_for_top.columns for c in ["roi", "profit", "budget", "revenue"]):
-        fin_for_top = fin_for_top[
-            (fin_for_top["budget"].fillna(0) >= MIN_BUDGET_DEFAULT) &
-            (fin_for_top["revenue"].fillna(0) >= MIN_REVENUE_DEFAULT)
-        ].dropna(subset=["roi", "profit"])
+        fin_for_top = roi_ready_rows(df_fin, min_budget=MIN_BUDGET_DEFAULT, min_revenue=MIN_REVENUE_DEFAULT)
 
     if len(fin_for_top):
-        roi_top = (
-            fin_for_top.sort_values("roi", ascending=False)
-                       .head(5)[["title", "release_year", "roi", "profit"]]
-                       .copy()
-        )
-        roi_top["roi"] = roi_top["roi"].apply(lambda x: f"{x*100:.2f}%")
-        roi_top["profit"] = roi_top["profit"].apply(money_short)
+        roi_top = top_k(fin_for_top, "roi", 5, base=df_fin)[["title", "release_year", "roi", "profit"]].copy()
+        roi_top["roi"] = pct2_col(roi_top["roi"])
+        roi_top["profit"] = money_short_col(roi_top["profit"])
         st.dataframe(roi_top, hide_index=True, use_container_width=True)
     else:
         st.info("ROI highlights unavailable for this threshold (try reducing the minimum on the ROI page).")
@@ -141,10 +147,11 @@ ch1, ch2 = st.columns(2)
 
 with ch1:
     st.markdown("#### Titles per year")
-    st.altair_chart(titles_per_year(df), use_container_width=True)
+    render_chart(titles_per_year, df, by_year=cube_titles_per_year(cube))
 
 with ch2:
     st.markdown("#### Weighted_rating distribution")
-    st.altair_chart(hist_weighted_rating(df), use_container_width=True)
+    render_chart(hist_weighted_rating, df)
 
+render_perf_panel("Main")
 render_footer()
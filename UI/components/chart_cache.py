@@ -0,0 +1,118 @@
+import copy
+import json
+from collections import OrderedDict
+from threading import Lock
+
+import pandas as pd
+import streamlit as st
+
+from components.filter_engine import frame_key
+from components.perf import enabled, span
+
+CHART_CACHE_SIZE = 128
+DIGEST_MAX_ROWS = 10_000  # frames pequenos sem frame_key (ex.: agregados) entram na chave pelo conteúdo
+
+
+class ChartCache:
+    """LRU de specs Vega-Lite já serializadas (chart.to_dict()), compartilhado entre sessões."""
+
+    def __init__(self, size: int = CHART_CACHE_SIZE):
+        self.size = size
+        self._specs: OrderedDict[tuple, dict] = OrderedDict()
+        self._bytes: dict[tuple, int] = {}
+        self._lock = Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key: tuple) -> dict | None:
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+            return spec
+
+    def put(self, key: tuple, spec: dict) -> None:
+        with self._lock:
+            self.misses += 1
+            self._specs[key] = spec
+            self._specs.move_to_end(key)
+            while len(self._specs) > self.size:
+                old, _ = self._specs.popitem(last=False)
+                self._bytes.pop(old, None)
+
+    def nbytes(self, key: tuple, spec: dict) -> int:
+        """Tamanho da spec em JSON (o que vai ao navegador), medido uma vez por entrada."""
+        n = self._bytes.get(key)
+        if n is None:
+            n = spec_bytes(spec)
+            with self._lock:
+                if key in self._specs:
+                    self._bytes[key] = n
+        return n
+
+
+@st.cache_resource
+def get_chart_cache() -> ChartCache:
+    return ChartCache()
+
+
+def spec_bytes(spec: dict) -> int:
+    return len(json.dumps(spec, default=str).encode("utf-8"))
+
+
+def _digest(df: pd.DataFrame) -> tuple:
+    h = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return ("digest", df.shape, tuple(map(str, df.columns)), int(h.sum()), int((h * 31).sum()))
+
+
+def _data_key(df: pd.DataFrame) -> tuple | None:
+    key = frame_key(df)
+    if key is not None:
+        return ("frame", *key)
+    if len(df) <= DIGEST_MAX_ROWS:
+        return _digest(df)
+    return None
+
+
+_NO_KEY = object()
+
+
+def _arg_key(v):
+    if isinstance(v, pd.DataFrame):
+        key = _data_key(v)
+        return _NO_KEY if key is None else key
+    return v
+
+
+def chart_spec(fn, df: pd.DataFrame, *args, key_from: pd.DataFrame | None = None, key_extra: tuple = (), **kwargs) -> dict:
+    """
+    Spec de fn(df, *args, **kwargs) com memo por (função, versão do dataset + filtro, argumentos).
+    `df` derivado de um frame filtrado (ex.: df_ok na página de ROI): passe o frame de origem em
+    `key_from` e o que mais definiu o recorte em `key_extra`. Sem chave possível, só monta a spec.
+    """
+    data_key = _data_key(key_from if key_from is not None else df)
+    arg_keys = [_arg_key(a) for a in args] + [(k, _arg_key(v)) for k, v in sorted(kwargs.items())]
+    with span(f"chart_spec.{fn.__name__}", rows_in=len(df)) as s:
+        if data_key is None or any(_NO_KEY in (k if isinstance(k, tuple) else (k,)) for k in arg_keys):
+            spec = fn(df, *args, **kwargs).to_dict()
+            if enabled():
+                s.bytes = spec_bytes(spec)
+            return spec
+
+        key = (fn.__module__, fn.__qualname__, data_key, tuple(key_extra), tuple(arg_keys))
+        cache = get_chart_cache()
+        spec = cache.get(key)
+        s.cache = "hit" if spec is not None else "miss"
+        if spec is None:
+            spec = fn(df, *args, **kwargs).to_dict()
+            cache.put(key, spec)
+        if enabled():
+            s.bytes = cache.nbytes(key, spec)
+    # o streamlit ajusta a spec antes de enviar: cópia de tudo menos os dados
+    return {k: (v if k == "datasets" else copy.deepcopy(v)) for k, v in spec.items()}
+
+
+def render_chart(fn, df: pd.DataFrame, *args, key_from: pd.DataFrame | None = None, key_extra: tuple = (), **kwargs) -> None:
+    """st.altair_chart(fn(df, ...)) com a spec vinda do cache (chart_spec)."""
+    spec = chart_spec(fn, df, *args, key_from=key_from, key_extra=key_extra, **kwargs)
+    st.vega_lite_chart(spec=spec, use_container_width=True)
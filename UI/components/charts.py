@@ -1,6 +1,9 @@
 import altair as alt
 import pandas as pd
 from components.viz_theme import PALETTE
+from components.histogram import histogram, value_counts
+from components.perf import span, traced
+from components.scatter_agg import SCATTER_MAX_POINTS, SCATTER_MAX_MARKS, grid_downsample
 
 def _wr_band(s: pd.Series, bad=7.0, warn=7.5) -> pd.Series:
     s = pd.to_numeric(s, errors="coerce")
@@ -30,14 +33,36 @@ ROI_SCALE = alt.Scale(
     range=[PALETTE["bad"], PALETTE["warn"], PALETTE["ok"]],
 )
 
-def titles_per_year(df: pd.DataFrame):
-    by_year = (
-        df.dropna(subset=["release_year"])
-          .groupby("release_year")
-          .size()
-          .reset_index(name="movies")
-          .sort_values("release_year")
+def _with_density(points: alt.Chart, cells: pd.DataFrame, *, color, tooltip, opacity=0.45):
+    """
+    Camada de células agregadas (tamanho = nº de filmes) por baixo dos pontos individuais.
+    As células usam os mesmos campos x/y dos pontos, então os eixos são compartilhados.
+    """
+    density = (
+        alt.Chart(cells)
+        .mark_square(opacity=opacity)
+        .encode(
+            x=points.encoding.x,
+            y=points.encoding.y,
+            size=alt.Size("count:Q", legend=None, scale=alt.Scale(range=[20, 400])),
+            color=color,
+            tooltip=[alt.Tooltip("count:Q", title="Movies", format=",.0f"), *tooltip],
+        )
     )
+    return alt.layer(density, points).resolve_scale(size="independent")
+
+def _downsample(base: pd.DataFrame, x: str, y: str, **kwargs):
+    # grid_downsample medido como etapa própria (marcas que sobram = células + outliers)
+    with span("charts.grid_downsample", rows_in=len(base)) as s:
+        cells, points = grid_downsample(base, x, y, **kwargs)
+        s.rows_out = len(cells) + len(points)
+        return cells, points
+
+@traced()
+def titles_per_year(df: pd.DataFrame, *, by_year: pd.DataFrame | None = None):
+    # by_year (release_year, movies) pode vir pronto do cubo (components/cube.py)
+    if by_year is None:
+        by_year = value_counts(df, "release_year", name="movies")
     return (
         alt.Chart(by_year)
         .mark_bar()
@@ -53,31 +78,56 @@ def titles_per_year(df: pd.DataFrame):
         .properties(height=260)
     )
 
+@traced()
 def hist_weighted_rating(df: pd.DataFrame, *, bad=7.0, warn=7.5):
-    base = df[["weighted_rating"]].dropna().copy()
-    base["wr_band"] = _wr_band(base["weighted_rating"], bad=bad, warn=warn)
+    # faixas e contagens calculadas no servidor (components/histogram.py): só os bins vão ao navegador
+    bins = histogram(
+        df, "weighted_rating", maxbins=24,
+        thresholds=(bad, warn), labels=tuple(WR_SCALE.domain),
+    )
     return (
-        alt.Chart(base)
+        alt.Chart(bins)
         .mark_bar()
         .encode(
-            x=alt.X("weighted_rating:Q", bin=alt.Bin(maxbins=24), title="Weighted rating"),
-            y=alt.Y("count()", title="Movies"),
-            color=alt.Color("wr_band:N", scale=WR_SCALE, title="Quality band"),
-            tooltip=[alt.Tooltip("count()", title="Movies", format=",.0f")],
+            x=alt.X("bin_start:Q", bin="binned", title="Weighted rating"),
+            x2="bin_end:Q",
+            y=alt.Y("sum(count):Q", title="Movies"),
+            color=alt.Color("band:N", scale=WR_SCALE, title="Quality band"),
+            tooltip=[
+                alt.Tooltip("bin_start:Q", title="From", format=".2f"),
+                alt.Tooltip("bin_end:Q", title="To", format=".2f"),
+                alt.Tooltip("sum(count):Q", title="Movies", format=",.0f"),
+            ],
         )
         .properties(height=260)
     )
 
-def demand_scatter(df: pd.DataFrame, *, rating_alarm: float = 7.0):
+@traced()
+def demand_scatter(
+    df: pd.DataFrame,
+    *,
+    rating_alarm: float = 7.0,
+    max_points: int = SCATTER_MAX_POINTS,
+    max_marks: int = SCATTER_MAX_MARKS,
+):
     # rating_alarm = limiar do “vermelho”
     warn = min(9.9, rating_alarm + 0.5)
 
     cols = ["title", "genres_str", "popularity", "weighted_rating", "vote_count", "release_year"]
-    base = df[cols].dropna().copy()
+    base = df[cols].dropna()
+    # acima de max_points: grade em log(popularity) x weighted_rating + outliers como pontos
+    cells = None
+    if len(base) > max_points:
+        cells, base = _downsample(
+            base, "popularity", "weighted_rating", log_x=True,
+            mean_cols=["vote_count"], max_marks=max_marks,
+        )
+        cells["wr_band"] = _wr_band(cells["weighted_rating"], bad=rating_alarm, warn=warn)
+    base = base.copy()
     base["wr_band"] = _wr_band(base["weighted_rating"], bad=rating_alarm, warn=warn)
 
     # Cor por faixas é simples, legível e “BI” [web:543]
-    return (
+    points = (
         alt.Chart(base)
         .mark_circle(opacity=0.70)
         .encode(
@@ -94,9 +144,20 @@ def demand_scatter(df: pd.DataFrame, *, rating_alarm: float = 7.0):
                 alt.Tooltip("weighted_rating:Q", title="Weighted", format=".2f"),
             ],
         )
-        .properties(height=380)
     )
+    if cells is not None:
+        points = _with_density(
+            points, cells,
+            color=alt.Color("wr_band:N", scale=WR_SCALE, title="Quality band"),
+            tooltip=[
+                alt.Tooltip("popularity:Q", title="Popularity (cell)", format=".2f"),
+                alt.Tooltip("weighted_rating:Q", title="Weighted (avg)", format=".2f"),
+                alt.Tooltip("vote_count:Q", title="Votes (avg)", format=",.0f"),
+            ],
+        )
+    return points.properties(height=380)
 
+@traced()
 def genre_tradeoff_scatter(agg: pd.DataFrame, *, bad=7.0, warn=7.5):
     base = agg.copy()
     base["wr_band"] = _wr_band(base["avg_wr"], bad=bad, warn=warn)
@@ -120,12 +181,29 @@ def genre_tradeoff_scatter(agg: pd.DataFrame, *, bad=7.0, warn=7.5):
         .properties(height=380)
     )
 
-def roi_budget_vs_revenue(df: pd.DataFrame, *, roi_bad=0.0, roi_warn=0.2):
+@traced()
+def roi_budget_vs_revenue(
+    df: pd.DataFrame,
+    *,
+    roi_bad=0.0,
+    roi_warn=0.2,
+    max_points: int = SCATTER_MAX_POINTS,
+    max_marks: int = SCATTER_MAX_MARKS,
+):
     cols = ["title", "genres_str", "budget", "revenue", "profit", "roi", "weighted_rating"]
-    base = df[cols].dropna().copy()
+    base = df[cols].dropna()
+    # acima de max_points: grade em log(budget) x log(revenue) + outliers como pontos
+    cells = None
+    if len(base) > max_points:
+        cells, base = _downsample(
+            base, "budget", "revenue", log_x=True, log_y=True,
+            mean_cols=["roi", "profit"], max_marks=max_marks,
+        )
+        cells["roi_band"] = _roi_band(cells["roi"], bad=roi_bad, warn=roi_warn)
+    base = base.copy()
     base["roi_band"] = _roi_band(base["roi"], bad=roi_bad, warn=roi_warn)
 
-    return (
+    points = (
         alt.Chart(base)
         .mark_circle(opacity=0.65)
         .encode(
@@ -143,14 +221,38 @@ def roi_budget_vs_revenue(df: pd.DataFrame, *, roi_bad=0.0, roi_warn=0.2):
                 alt.Tooltip("weighted_rating:Q", title="Weighted", format=".2f"),
             ],
         )
-        .properties(height=380)
     )
+    if cells is not None:
+        points = _with_density(
+            points, cells,
+            color=alt.Color("roi_band:N", scale=ROI_SCALE, title="ROI band"),
+            tooltip=[
+                alt.Tooltip("budget:Q", title="Budget (cell)", format=",.0f"),
+                alt.Tooltip("revenue:Q", title="Revenue (cell)", format=",.0f"),
+                alt.Tooltip("roi:Q", title="ROI (avg)", format=".2f"),
+                alt.Tooltip("profit:Q", title="Profit (avg)", format=",.0f"),
+            ],
+        )
+    return points.properties(height=380)
 
-def quality_vs_roi(df: pd.DataFrame, *, wr_bad=7.0, wr_warn=7.5):
-    base = df[["weighted_rating", "roi", "title"]].dropna().copy()
+@traced()
+def quality_vs_roi(
+    df: pd.DataFrame,
+    *,
+    wr_bad=7.0,
+    wr_warn=7.5,
+    max_points: int = SCATTER_MAX_POINTS,
+    max_marks: int = SCATTER_MAX_MARKS,
+):
+    base = df[["weighted_rating", "roi", "title"]].dropna()
+    cells = None
+    if len(base) > max_points:
+        cells, base = _downsample(base, "weighted_rating", "roi", max_marks=max_marks)
+        cells["wr_band"] = _wr_band(cells["weighted_rating"], bad=wr_bad, warn=wr_warn)
+    base = base.copy()
     base["wr_band"] = _wr_band(base["weighted_rating"], bad=wr_bad, warn=wr_warn)
 
-    return (
+    points = (
         alt.Chart(base)
         .mark_circle(opacity=0.65)
         .encode(
@@ -163,5 +265,51 @@ def quality_vs_roi(df: pd.DataFrame, *, wr_bad=7.0, wr_warn=7.5):
                 alt.Tooltip("roi:Q", title="ROI", format=".2f"),
             ],
         )
-        .properties(height=340)
     )
+    if cells is not None:
+        points = _with_density(
+            points, cells,
+            color=alt.Color("wr_band:N", scale=WR_SCALE, title="Quality band"),
+            tooltip=[
+                alt.Tooltip("weighted_rating:Q", title="Weighted (avg)", format=".2f"),
+                alt.Tooltip("roi:Q", title="ROI (avg)", format=".2f"),
+            ],
+        )
+    return points.properties(height=340)
+
+@traced()
+def roi_coverage_curve_chart(curve: pd.DataFrame, *, min_budget: float = 0, min_revenue: float = 0):
+    # curve = quality.roi_coverage_curve: coverage ao subir cada limiar com o outro fixo
+    lines = (
+        alt.Chart(curve)
+        .mark_line()
+        .encode(
+            x=alt.X("threshold:Q", scale=alt.Scale(type="log"), title="Minimum (USD, log)"),
+            y=alt.Y("coverage:Q", title="Coverage (ROI-ready)", axis=alt.Axis(format="%")),
+            color=alt.Color(
+                "axis:N",
+                scale=alt.Scale(domain=["Budget", "Revenue"], range=[PALETTE["info"], PALETTE["warn"]]),
+                title="Threshold on",
+            ),
+            tooltip=[
+                alt.Tooltip("axis:N", title="Threshold on"),
+                alt.Tooltip("threshold:Q", title="Minimum", format=",.0f"),
+                alt.Tooltip("movies:Q", title="Movies", format=",.0f"),
+                alt.Tooltip("coverage:Q", title="Coverage", format=".1%"),
+            ],
+        )
+    )
+    # limiares atuais (0 não aparece em escala log)
+    current = pd.DataFrame({"axis": ["Budget", "Revenue"], "threshold": [min_budget, min_revenue]})
+    current = current[current["threshold"] > 0]
+    if len(current) == 0:
+        return lines.properties(height=300)
+    rules = (
+        alt.Chart(current)
+        .mark_rule(strokeDash=[4, 4])
+        .encode(
+            x="threshold:Q",
+            color=alt.Color("axis:N", legend=None),
+        )
+    )
+    return alt.layer(lines, rules).properties(height=300)
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from components.data import load_cube
+
+# mesmo layout de ETL/transform.py (transform_cube)
+CUBE_MEASURES = ["weighted_rating", "vote_count", "popularity"]
+CUBE_VOTE_BUCKET = 500
+CUBE_ALL_GENRES = ""
+
+
+def get_cube(df: pd.DataFrame) -> pd.DataFrame | None:
+    """Cubo do refresh, se existir e corresponder ao curated carregado (mesmo nº de filmes)."""
+    cube = load_cube()
+    if cube is None or len(cube) == 0:
+        return None
+    if int(cube.loc[cube["genre"] == CUBE_ALL_GENRES, "n"].sum()) != len(df):
+        return None
+    return cube
+
+
+def _slice(
+    cube: pd.DataFrame | None,
+    year_range=None,
+    min_votes: int = 0,
+    genre_q: str = "",
+    title_q: str = "",
+    search_q: str = "",
+    *,
+    per_genre: bool = False,
+) -> pd.DataFrame | None:
+    """
+    Linhas do cubo que respondem ao filtro, ou None quando o cubo não expressa o filtro:
+    busca por texto, mínimo de votos fora dos limites das faixas, ou gênero que casa com
+    mais de um nome (um filme com dois gêneros seria contado duas vezes).
+    year_range=None: sem filtro de ano (inclui filmes sem ano).
+    """
+    if cube is None or title_q.strip() or search_q.strip() or int(min_votes) % CUBE_VOTE_BUCKET:
+        return None
+
+    genres = cube["genre"]
+    if per_genre:
+        mask = genres != CUBE_ALL_GENRES
+    elif genre_q.strip():
+        q = genre_q.strip().lower()
+        names = [g for g in genres.unique() if g != CUBE_ALL_GENRES and q in g.lower()]
+        if len(names) > 1:
+            return None
+        mask = genres.isin(names)
+    else:
+        mask = genres == CUBE_ALL_GENRES
+
+    if year_range is not None:
+        y0, y1 = year_range
+        mask &= pd.to_numeric(cube["release_year"], errors="coerce").between(y0, y1)
+    mask &= cube["vote_bucket"] >= int(min_votes)
+    return cube[mask]
+
+
+def _stats(sums: pd.DataFrame) -> pd.DataFrame:
+    """Médias e desvios (populacionais) a partir de n/sum/sumsq."""
+    out = sums[[c for c in sums.columns if c == "n" or c.endswith("_n")]].copy()
+    for c in CUBE_MEASURES:
+        n = sums[f"{c}_n"].to_numpy(dtype=np.float64)
+        s = sums[f"{c}_sum"].to_numpy(dtype=np.float64)
+        sq = sums[f"{c}_sumsq"].to_numpy(dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, s / n, np.nan)
+            var = np.where(n > 0, sq / n - mean * mean, np.nan)
+        out[f"avg_{c}"] = mean
+        out[f"std_{c}"] = np.sqrt(np.clip(var, 0, None))
+    return out
+
+
+def cube_totals(cube: pd.DataFrame | None, year_range=None, min_votes: int = 0, genre_q: str = "",
+                title_q: str = "", search_q: str = "") -> dict | None:
+    """n, <col>_n, avg_<col> e std_<col> do recorte (None -> calcule sobre as linhas)."""
+    rows = _slice(cube, year_range, min_votes, genre_q, title_q, search_q)
+    if rows is None:
+        return None
+    sums = rows.drop(columns=["release_year", "genre", "vote_bucket"]).sum().to_frame().T
+    return _stats(sums).iloc[0].to_dict()
+
+
+def cube_titles_per_year(cube: pd.DataFrame | None, year_range=None, min_votes: int = 0, genre_q: str = "",
+                         title_q: str = "", search_q: str = "") -> pd.DataFrame | None:
+    """Filmes por ano (release_year, movies), no formato de charts.titles_per_year."""
+    rows = _slice(cube, year_range, min_votes, genre_q, title_q, search_q)
+    if rows is None:
+        return None
+    return (
+        rows.dropna(subset=["release_year"])
+            .groupby("release_year")["n"].sum()
+            .reset_index(name="movies")
+            .sort_values("release_year")
+    )
+
+
+def cube_genre_mix(cube: pd.DataFrame | None, year_range=None, min_votes: int = 0) -> pd.DataFrame | None:
+    """
+    Agregado da página Genre Mix (genre, movies, avg_wr, avg_votes, avg_popularity), como
+    genre_index.genre_aggregate(..., required="weighted_rating"). Se o recorte tiver filmes
+    sem weighted_rating, as médias de votos/popularidade divergiriam: devolve None.
+    """
+    rows = _slice(cube, year_range, min_votes, per_genre=True)
+    if rows is None or (rows["weighted_rating_n"] != rows["n"]).any():
+        return None
+    sums = rows.drop(columns=["release_year", "vote_bucket"]).groupby("genre").sum()
+    stats = _stats(sums)
+    agg = pd.DataFrame({
+        "genre": sums.index.to_numpy(),
+        "movies": stats["weighted_rating_n"].to_numpy(),
+        "avg_wr": stats["avg_weighted_rating"].to_numpy(),
+        "avg_votes": stats["avg_vote_count"].to_numpy(),
+        "avg_popularity": stats["avg_popularity"].to_numpy(),
+    })
+    return agg[agg["movies"] > 0].sort_values("genre").reset_index(drop=True)
@@ -1,24 +1,152 @@
 from pathlib import Path
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import streamlit as st
 
+from components.genre_index import GENRE_BITS_COL, add_genre_index
+from components.perf import span, traced
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 CURATED_DIR = PROJECT_ROOT / "DATA" / "CURATED"
 
+# curated normalizado: uma tabela de filmes e uma financeira (id + métricas), unidas por id
 CURATED_FILE = CURATED_DIR / "top10k_tmdb_clean_enriched.jsonl"
-CURATED_FIN_FILE = CURATED_DIR / "top10k_tmdb_financial_enriched.jsonl"
+CURATED_FINANCIALS_FILE = CURATED_DIR / "top10k_tmdb_financials.jsonl"
+CURATED_CUBE_FILE = CURATED_DIR / "top10k_tmdb_cube.jsonl"
+
+# store colunar escrito por ETL/load.py (preferido quando existe)
+CURATED_PARQUET = CURATED_DIR / "top10k_tmdb_clean_enriched.parquet"
+CURATED_FINANCIALS_PARQUET = CURATED_DIR / "top10k_tmdb_financials.parquet"
+CURATED_CUBE_PARQUET = CURATED_DIR / "top10k_tmdb_cube.parquet"
+PARTITION_COL = "release_decade"
+RANK_COL = "_row_rank"  # ordem em que o refresh gravou as linhas (ETL/load.py)
+
+# arquivo "largo" antigo (filme + financeiro); só lido se o refresh ainda não foi rodado
+LEGACY_FIN_FILE = CURATED_DIR / "top10k_tmdb_financial_enriched.jsonl"
+
+# identifica o conteúdo carregado (arquivo + mtime/tamanho + colunas); chave dos caches da UI
+DATASET_VERSION_ATTR = "dataset_version"
+
+# versões guardadas por loader (a atual + a anterior, enquanto sessões antigas terminam o rerun)
+CACHE_VERSIONS = 4
+
+FIN_COLS = ["budget", "revenue", "runtime", "profit", "roi", "revenue_to_budget", "revenue_per_min", "roi_ready"]
+
+def _version(path: Path, columns: tuple[str, ...] | None = None) -> str:
+    stat = path.stat()
+    return f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}:{','.join(columns) if columns else '*'}"
+
+def _shared(df: pd.DataFrame) -> pd.DataFrame:
+    # cada chamada recebe um frame raso sobre os mesmos dados (copy-on-write):
+    # nada é copiado, e uma sessão que altere o seu frame não afeta as outras
+    return df.copy(deep=False)
+
+# Os loaders usam cache_resource: um objeto por processo, compartilhado por todas as sessões
+# (cache_data serializaria uma cópia por acesso). A chave inclui a versão do arquivo, então
+# um refresh aparece no próximo rerun, sem TTL.
+
+@st.cache_resource(max_entries=CACHE_VERSIONS)
+def _read_jsonl(path: Path, version: str) -> pd.DataFrame:
+    with span(f"data.read_jsonl:{path.name}") as s:
+        df = pd.read_json(path, lines=True)
+        if "release_date" in df.columns:
+            df["release_date"] = pd.to_datetime(df["release_date"], errors="coerce")
+        df.attrs[DATASET_VERSION_ATTR] = version
+        s.rows_out = len(df)
+        return add_genre_index(df)
+
+@st.cache_resource(max_entries=CACHE_VERSIONS * 4)
+def _read_parquet(path: Path, columns: tuple[str, ...] | None, version: str) -> pd.DataFrame:
+    with span(f"data.read_parquet:{path.name}") as s:
+        df = _parquet_frame(path, columns, version)
+        s.rows_out = len(df)
+        return df
+
+def _parquet_frame(path: Path, columns: tuple[str, ...] | None, version: str) -> pd.DataFrame:
+    read_cols = list(columns) if columns else None
+    if read_cols and RANK_COL in ds.dataset(path, partitioning="hive").schema.names:
+        read_cols.append(RANK_COL)
+    table = pq.read_table(path, columns=read_cols, partitioning="hive", memory_map=True)
+    if PARTITION_COL in table.column_names:
+        table = table.drop_columns([PARTITION_COL])
+    # a leitura particionada vem década a década: volta à ordem do discover
+    if RANK_COL in table.column_names:
+        table = table.sort_by(RANK_COL).drop_columns([RANK_COL])
+    # split_blocks/self_destruct: sem o pico de memória de consolidar blocos na conversão
+    df = table.to_pandas(
+        types_mapper={pa.int64(): pd.Int64Dtype()}.get,
+        split_blocks=True,
+        self_destruct=True,
+    )
+    del table
+    df.attrs[DATASET_VERSION_ATTR] = version
+    return add_genre_index(df)
 
-@st.cache_data(ttl=3600)
 def _load_jsonl(path: Path) -> pd.DataFrame:
-    df = pd.read_json(path, lines=True)
-    if "release_date" in df.columns:
-        df["release_date"] = pd.to_datetime(df["release_date"], errors="coerce")
-    return df
-
-def load_curated() -> pd.DataFrame:
-    return _load_jsonl(CURATED_FILE)
-
-def load_financial_curated() -> pd.DataFrame:
-    if CURATED_FIN_FILE.exists():
-        return _load_jsonl(CURATED_FIN_FILE)
-    return _load_jsonl(CURATED_FILE)
+    return _shared(_read_jsonl(path, _version(path)))
+
+def _load_parquet(path: Path, columns: tuple[str, ...] | None = None) -> pd.DataFrame:
+    return _shared(_read_parquet(path, columns, _version(path, columns)))
+
+def _load(parquet_path: Path, jsonl_path: Path, columns: list[str] | None) -> pd.DataFrame:
+    if parquet_path.exists():
+        return _load_parquet(parquet_path, tuple(columns) if columns else None)
+    df = _load_jsonl(jsonl_path)
+    if not columns:
+        return df
+    out = df[[c for c in [*columns, GENRE_BITS_COL] if c in df.columns]]
+    out.attrs[DATASET_VERSION_ATTR] = f"{df.attrs[DATASET_VERSION_ATTR]}:{','.join(columns)}"
+    return out
+
+@traced(cached=True)
+def load_curated(columns: list[str] | None = None) -> pd.DataFrame:
+    return _load(CURATED_PARQUET, CURATED_FILE, columns)
+
+@traced(cached=True)
+def load_financials(columns: list[str] | None = None) -> pd.DataFrame:
+    """Tabela financeira (id + FIN_COLS)."""
+    if columns is not None and "id" not in columns:
+        columns = ["id", *columns]
+    return _load(CURATED_FINANCIALS_PARQUET, CURATED_FINANCIALS_FILE, columns)
+
+def _fin_path() -> Path:
+    return CURATED_FINANCIALS_PARQUET if CURATED_FINANCIALS_PARQUET.exists() else CURATED_FINANCIALS_FILE
+
+def _movies_path() -> Path:
+    return CURATED_PARQUET if CURATED_PARQUET.exists() else CURATED_FILE
+
+@st.cache_resource(max_entries=CACHE_VERSIONS * 4)
+def _join_financials(columns: tuple[str, ...] | None, movies_version: str, fin_version: str) -> pd.DataFrame:
+    movie_cols = fin_cols = None
+    if columns is not None:
+        movie_cols = ["id", *[c for c in columns if c not in FIN_COLS and c != "id"]]
+        fin_cols = [c for c in columns if c in FIN_COLS]
+    movies = load_curated(movie_cols)
+    fin = load_financials(fin_cols)
+    with span("data.join_financials", rows_in=len(movies)) as s:
+        df = movies.merge(fin, on="id", how="left")
+        s.rows_out = len(df)
+    df.attrs = dict(movies.attrs)  # merge não propaga attrs (vocabulário de gêneros)
+    df.attrs[DATASET_VERSION_ATTR] = f"{movies_version}+{fin_version}:{','.join(columns) if columns else '*'}"
+    return df[[c for c in [*columns, GENRE_BITS_COL] if c in df.columns]] if columns is not None else df
+
+@traced(cached=True)
+def load_financial_curated(columns: list[str] | None = None) -> pd.DataFrame:
+    """Visão filme ⨝ financeiro (left join por id), montada na leitura."""
+    if CURATED_FINANCIALS_PARQUET.exists() or CURATED_FINANCIALS_FILE.exists():
+        return _shared(_join_financials(
+            tuple(columns) if columns else None, _version(_movies_path()), _version(_fin_path())
+        ))
+    if LEGACY_FIN_FILE.exists():
+        df = _load_jsonl(LEGACY_FIN_FILE)
+        return df[[c for c in columns if c in df.columns]] if columns else df
+    return load_curated(columns)
+
+@traced(cached=True)
+def load_cube() -> pd.DataFrame | None:
+    """Cubo ano x gênero x faixa de votos gerado no refresh (None se ainda não existe)."""
+    if not (CURATED_CUBE_PARQUET.exists() or CURATED_CUBE_FILE.exists()):
+        return None
+    return _load(CURATED_CUBE_PARQUET, CURATED_CUBE_FILE, None)
@@ -0,0 +1,242 @@
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from components.data import DATASET_VERSION_ATTR
+from components.genre_index import get_genre_index, query_bits
+from components.perf import note, span
+from components.search_index import SearchIndex, normalize_text
+
+LRU_SIZE = 64
+FILTER_KEY_ATTR = "filter_key"  # (chave do filtro, nº de linhas) carimbado no frame devolvido por filter()
+
+
+def _sorted_index(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(valores ordenados, posições) — nulos ficam de fora."""
+    ok = np.flatnonzero(~np.isnan(values))
+    order = ok[np.argsort(values[ok], kind="stable")]
+    return values[order], order
+
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+
+class FilterEngine:
+    """
+    Seleções por posição de linha sobre um DataFrame fixo (o frame carregado):
+    - índices ordenados de release_year e vote_count (faixa por busca binária);
+    - gênero por teste de bits (genre_index); título e busca livre (título, título original,
+      sinopse) pelo índice de trigramas (search_index), sem acento e sem diferenciar maiúsculas;
+    - LRU de filtros recentes; um filtro mais estreito que um já calculado
+      (faixa contida, mínimo de votos maior, texto que contém o anterior) parte daquela seleção.
+    As seleções devolvidas são arrays somente leitura, em ordem crescente de posição.
+    """
+
+    def __init__(self, df: pd.DataFrame, lru_size: int = LRU_SIZE):
+        self.df = df
+        self.n = len(df)
+        self.year = (
+            pd.to_numeric(df["release_year"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            if "release_year" in df.columns else None
+        )
+        # vote_count nulo conta como 0 (mesma regra do filtro antigo)
+        self.votes = (
+            pd.to_numeric(df["vote_count"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+            if "vote_count" in df.columns else None
+        )
+        self.year_sorted = _sorted_index(self.year) if self.year is not None else None
+        self.votes_sorted = _sorted_index(self.votes) if self.votes is not None else None
+        self.genres = get_genre_index(df)
+        self.genres_str = df["genres_str"] if "genres_str" in df.columns else None
+        self._search: SearchIndex | None = None
+
+        self.lru_size = lru_size
+        self._lru: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._lock = Lock()
+        self.hits = self.refined = self.misses = 0
+
+    @property
+    def search_index(self) -> SearchIndex:
+        # construído no primeiro uso (ou pelo get_filter_engine com with_search) e reaproveitado por todas as sessões
+        with self._lock:
+            if self._search is None:
+                with span("search_index.build", rows_in=self.n):
+                    self._search = SearchIndex(self.df)
+            return self._search
+
+    @staticmethod
+    def key(year_range, min_votes: int, genre_q: str = "", title_q: str = "", search_q: str = "") -> tuple:
+        y0, y1 = year_range
+        return (
+            int(y0), int(y1), int(min_votes),
+            genre_q.strip().lower(), normalize_text(title_q).strip(), normalize_text(search_q).strip(),
+        )
+
+    def select(
+        self,
+        year_range,
+        min_votes: int,
+        genre_q: str = "",
+        title_q: str = "",
+        search_q: str = "",
+    ) -> np.ndarray:
+        key = self.key(year_range, min_votes, genre_q, title_q, search_q)
+        with self._lock:
+            pos = self._lru.get(key)
+            if pos is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                note(cache="hit")
+                return pos
+            base = self._narrowest_superset(key)
+            if base is None:
+                self.misses += 1
+            else:
+                self.refined += 1
+
+        if base is None:
+            pos = self._select_ranges(key)
+            pos = self._select_text(pos, *key[3:])
+            note(cache="miss")
+        else:
+            pos = self._refine(base, key)
+            note(cache="refined")
+
+        pos = _readonly(pos)
+        with self._lock:
+            self._lru[key] = pos
+            if len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+        return pos
+
+    def filter(
+        self,
+        year_range,
+        min_votes: int,
+        genre_q: str = "",
+        title_q: str = "",
+        search_q: str = "",
+    ) -> pd.DataFrame:
+        pos = self.select(year_range, min_votes, genre_q, title_q, search_q)
+        out = self.df.iloc[pos]
+        out.attrs[FILTER_KEY_ATTR] = (self.key(year_range, min_votes, genre_q, title_q, search_q), len(pos))
+        return out
+
+    # --- internos ---
+
+    @staticmethod
+    def _contains(outer: tuple, inner: tuple) -> bool:
+        """True se a seleção de `inner` está contida na de `outer`."""
+        oy0, oy1, ov, og, ot, osq = outer
+        iy0, iy1, iv, ig, it, isq = inner
+        return oy0 <= iy0 and iy1 <= oy1 and ov <= iv and og in ig and ot in it and osq in isq
+
+    def _narrowest_superset(self, key: tuple) -> tuple[tuple, np.ndarray] | None:
+        best = None
+        for k, pos in self._lru.items():
+            if self._contains(k, key) and (best is None or len(pos) < len(best[1])):
+                best = (k, pos)
+        return best
+
+    def _range(self, index, lo: float, hi: float) -> np.ndarray:
+        values, order = index
+        return order[np.searchsorted(values, lo, "left"):np.searchsorted(values, hi, "right")]
+
+    def _select_ranges(self, key: tuple) -> np.ndarray:
+        y0, y1, min_votes = key[:3]
+        cands = []
+        if self.year_sorted is not None:
+            cands.append(self._range(self.year_sorted, y0, y1))
+        if self.votes_sorted is not None:
+            cands.append(self._range(self.votes_sorted, min_votes, np.inf))
+        if not cands:
+            return np.arange(self.n)
+
+        # parte da faixa menor e confere o outro predicado direto na coluna
+        pos = np.sort(min(cands, key=len))
+        if len(cands) == 2:
+            pos = pos[self._range_mask(pos, key)]
+        return pos
+
+    def _range_mask(self, pos: np.ndarray, key: tuple) -> np.ndarray:
+        y0, y1, min_votes = key[:3]
+        ok = np.ones(len(pos), dtype=bool)
+        if self.year is not None:
+            y = self.year[pos]
+            ok &= (y >= y0) & (y <= y1)
+        if self.votes is not None:
+            ok &= self.votes[pos] >= min_votes
+        return ok
+
+    def _select_text(self, pos: np.ndarray, genre_q: str, title_q: str, search_q: str) -> np.ndarray:
+        if len(pos) == 0:
+            return pos
+        if genre_q:
+            if self.genres is not None:
+                bits, vocab = self.genres
+                pos = pos[(bits[pos] & query_bits(vocab, genre_q)) != 0]
+            elif self.genres_str is not None:
+                pos = pos[self.genres_str.iloc[pos].str.contains(genre_q, case=False, na=False, regex=False).to_numpy()]
+        if title_q and "title" in self.df.columns and len(pos):
+            pos = self.search_index.search(title_q, cols=["title"], within=pos)
+        if search_q and len(pos):
+            pos = self.search_index.search(search_q, within=pos)
+        return pos
+
+    def _refine(self, base: tuple[tuple, np.ndarray], key: tuple) -> np.ndarray:
+        base_key, pos = base
+        if base_key[:3] != key[:3]:
+            pos = pos[self._range_mask(pos, key)]
+        genre_q = key[3] if key[3] != base_key[3] else ""
+        title_q = key[4] if key[4] != base_key[4] else ""
+        search_q = key[5] if key[5] != base_key[5] else ""
+        return self._select_text(pos, genre_q, title_q, search_q)
+
+
+@st.cache_resource(max_entries=8)
+def _cached_engine(version: str, n: int, _df: pd.DataFrame) -> FilterEngine:
+    with span("filter_engine.build", rows_in=n):
+        return FilterEngine(_df)
+
+
+def get_filter_engine(df: pd.DataFrame, with_search: bool = False) -> FilterEngine:
+    """
+    Engine compartilhado entre reruns e sessões, por versão do dataset (definida no load).
+    Frames derivados (filtrados/ordenados) não têm RangeIndex 0..n-1 e ganham um engine próprio.
+    with_search: já monta o índice de texto do engine compartilhado (páginas com busca livre),
+    para a primeira busca não pagar a construção; nas demais ele só sai se houver busca.
+    """
+    version = df.attrs.get(DATASET_VERSION_ATTR)
+    idx = df.index
+    if version is None or not (isinstance(idx, pd.RangeIndex) and idx.start == 0 and idx.step == 1):
+        return FilterEngine(df)
+    engine = _cached_engine(version, len(df), df)
+    if with_search:
+        engine.search_index
+    return engine
+
+
+def frame_key(df: pd.DataFrame) -> tuple | None:
+    """
+    Identifica as linhas de um frame para caches de agregados/gráficos: (versão do dataset,
+    chave do filtro). Vale para a saída de filter() — ou um recorte dela com as mesmas linhas —
+    e para o frame carregado ou um head dele (chave = nº de linhas). Qualquer outro frame
+    derivado devolve None.
+    """
+    version = df.attrs.get(DATASET_VERSION_ATTR)
+    if version is None:
+        return None
+    stamp = df.attrs.get(FILTER_KEY_ATTR)
+    if stamp is not None:
+        key, n = stamp
+        return (version, key) if n == len(df) else None
+    idx = df.index
+    if isinstance(idx, pd.RangeIndex) and idx.start == 0 and idx.step == 1:
+        # df.iloc[:k] mantém attrs e RangeIndex: o nº de linhas separa do frame inteiro
+        return (version, len(df))
+    return None
@@ -1,6 +1,9 @@
 import pandas as pd
 import streamlit as st
 
+from components.filter_engine import get_filter_engine
+from components.perf import traced
+
 def sidebar_common_filters(df: pd.DataFrame, *, show_genre: bool = True, show_title: bool = False):
     with st.sidebar:
         st.header("Filters")
@@ -23,20 +26,28 @@ def sidebar_common_filters(df: pd.DataFrame, *, show_genre: bool = True, show_ti
 
     return year_range, int(min_votes), genre_q, title_q
 
-def apply_common_filters(df: pd.DataFrame, year_range, min_votes: int, genre_q: str = "", title_q: str = "") -> pd.DataFrame:
-    y0, y1 = year_range
-    out = df.copy()
-
-    if "release_year" in out.columns:
-        out = out[out["release_year"].between(y0, y1)]
-
-    if "vote_count" in out.columns:
-        out = out[out["vote_count"].fillna(0) >= min_votes]
-
-    if genre_q.strip() and "genres_str" in out.columns:
-        out = out[out["genres_str"].str.contains(genre_q, case=False, na=False)]
-
-    if title_q.strip() and "title" in out.columns:
-        out = out[out["title"].str.contains(title_q, case=False, na=False)]
-
-    return out
+def sidebar_text_search() -> str:
+    with st.sidebar:
+        return st.text_input(
+            "Search title / overview (optional)",
+            "",
+            help="Matches title, original title and overview; ignores case and accents.",
+        )
+
+@traced()
+def apply_common_filters(
+    df: pd.DataFrame,
+    year_range,
+    min_votes: int,
+    genre_q: str = "",
+    title_q: str = "",
+    search_q: str = "",
+    *,
+    with_search: bool = False,
+) -> pd.DataFrame:
+    """
+    Seleção por posição via FilterEngine (índices ordenados + LRU, compartilhado entre reruns).
+    Devolve df.iloc[...] (sem o df.copy() inicial); título/gênero/busca: substring, sem regex.
+    with_search: a página tem sidebar_text_search; o índice de texto é montado já no load.
+    """
+    return get_filter_engine(df, with_search=with_search).filter(year_range, min_votes, genre_q, title_q, search_q)
@@ -1,4 +1,7 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 def fmt2(x) -> str:
     if x is None or pd.isna(x):
@@ -29,3 +32,90 @@ def pct2(x) -> str:
     if x is None or pd.isna(x):
         return "-"
     return f"{float(x)*100:.2f}%"
+
+# --- versões por coluna (tabelas): mesmas strings das funções acima, sem pd.isna/float por célula ---
+
+_MONEY_UNITS = [(1e9, "B"), (1e6, "M"), (1e3, "K")]
+# money_short_col/pct2_col: os kernels do Arrow têm ~0,25 ms de custo fixo. No BENCH
+# ("ui.format.* (50 rows)", uma página de tabela), por célula: money_short 0,20 ms e pct2 0,17 ms;
+# pelo Arrow: 0,48 e 0,31 ms. Medindo os dois caminhos de 5 a 2.000 linhas, o Arrow só passa
+# à frente a partir de ~400 (pct2) / ~500 linhas (money_short).
+# fmt2_col/fmt0_col não usam o Arrow: a passada única ganha do map por célula em qualquer
+# tamanho (fmt2, 50 linhas: 0,16 ms contra 0,20 ms).
+VECTOR_MIN_ROWS = 500
+
+def _small(s, scalar):
+    if len(s) >= VECTOR_MIN_ROWS:
+        return None
+    # por célula sobre a lista de floats, sem Series.map/astype (~15% mais rápido em 20-100 linhas)
+    return _to_series([scalar(x) for x in _values(s).tolist()], s)
+
+def _values(s) -> np.ndarray:
+    return pd.to_numeric(pd.Series(s), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _to_series(arr, s) -> pd.Series:
+    index, name = (s.index, s.name) if isinstance(s, pd.Series) else (None, None)
+    return pd.Series(arr, index=index, name=name, dtype="str")
+
+def _fixed2(y: np.ndarray) -> tuple[pa.Array, np.ndarray]:
+    """
+    |y| com 2 casas ("%.2f") a partir de centavos inteiros (np.rint), montado com kernels de
+    string do Arrow. Devolve também as posições em que o arredondamento do produto |y|*100
+    pode divergir do arredondamento exato do Python (meio centavo a 1 ulp, valor grande demais
+    ou não finito): essas são refeitas pela função escalar.
+    """
+    with np.errstate(invalid="ignore"):
+        z = np.abs(y) * 100
+        fallback = ~np.isfinite(z) | (z >= 2.0 ** 52)
+        fallback |= np.abs(z - np.floor(z) - 0.5) <= np.spacing(z)
+    c = np.where(fallback, 0, np.rint(z)).astype(np.int64)
+    whole = pc.cast(pa.array(c // 100), pa.string())
+    cents = pc.utf8_lpad(pc.cast(pa.array(c % 100), pa.string()), 2, "0")
+    return pc.binary_join_element_wise(whole, cents, "."), fallback
+
+def _finish(out: pa.Array, v: np.ndarray, fallback: np.ndarray, scalar, s) -> pd.Series:
+    na = np.isnan(v)
+    out = pc.if_else(pa.array(na), "-", out)
+    redo = np.flatnonzero(fallback & ~na)
+    if len(redo):
+        strs = out.to_numpy(zero_copy_only=False)
+        strs[redo] = [scalar(x) for x in v[redo].tolist()]
+        out = pa.array(strs, type=pa.string())
+    return _to_series(out, s)
+
+def _format_col(s, spec: str) -> pd.Series:
+    # formatos com separador de milhar: uma passada de strings sobre o array NumPy (qualquer tamanho)
+    v = _values(s)
+    return _to_series(["-" if x != x else f"{x:{spec}}" for x in v.tolist()], s)
+
+def fmt2_col(s) -> pd.Series:
+    return _format_col(s, ",.2f")
+
+def fmt0_col(s) -> pd.Series:
+    return _format_col(s, ",.0f")
+
+def pct2_col(s) -> pd.Series:
+    out = _small(s, pct2)
+    if out is not None:
+        return out
+    v = _values(s)
+    y = v * 100
+    body, fallback = _fixed2(y)
+    sign = pa.array(["", "-"]).take(pa.array(np.signbit(y).astype(np.int8)))
+    return _finish(pc.binary_join_element_wise(sign, body, "%", ""), v, fallback, pct2, s)
+
+def money_short_col(s) -> pd.Series:
+    """money_short para uma coluna inteira: faixa de magnitude por np.select, depois strings por coluna."""
+    out = _small(s, money_short)
+    if out is not None:
+        return out
+    v = _values(s)
+    a = np.abs(v)
+    conds = [a >= limit for limit, _ in _MONEY_UNITS]
+    div = np.select(conds, [limit for limit, _ in _MONEY_UNITS], default=1.0)
+    unit_idx = np.select(conds, np.arange(1, len(_MONEY_UNITS) + 1, dtype=np.int8), default=0)
+    unit = pa.array(["", *(u for _, u in _MONEY_UNITS)]).take(pa.array(unit_idx))
+    with np.errstate(invalid="ignore"):
+        body, fallback = _fixed2(a / div)
+    prefix = pa.array(["$", "-$"]).take(pa.array((v < 0).astype(np.int8)))
+    return _finish(pc.binary_join_element_wise(prefix, body, unit, ""), v, fallback, money_short, s)
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+# índice multi-hot de gêneros: um bit por gênero (posição = ordem do genre_id no vocabulário)
+GENRE_BITS_COL = "genre_bits"
+GENRE_VOCAB_ATTR = "genre_vocab"
+MAX_GENRES = 64
+
+
+def _combos(df: pd.DataFrame) -> tuple[np.ndarray, list[tuple[int, ...]], list[list[str]]] | None:
+    """
+    Factoriza as combinações de gêneros (poucas, mesmo com muitos filmes).
+    Retorna (codes por linha, chaves por combinação, nomes por combinação).
+    """
+    def as_tuple(x) -> tuple:
+        return tuple(x) if isinstance(x, (list, tuple, np.ndarray)) else ()
+
+    if "genre_ids" in df.columns and "genres_names" in df.columns:
+        keys = pd.Series([as_tuple(x) for x in df["genre_ids"].to_numpy()], dtype=object)
+        codes, uniques = pd.factorize(keys)
+        first = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy() if len(codes) else []
+        names = [list(as_tuple(df["genres_names"].iat[i])) for i in first]
+        return codes, [tuple(int(g) for g in u) for u in uniques], names
+
+    if "genres_str" in df.columns:
+        codes, uniques = pd.factorize(df["genres_str"].fillna("").astype(str))
+        names = [[x.strip() for x in s.split(",") if x.strip()] for s in uniques]
+        return codes, [tuple(n) for n in names], names
+
+    return None
+
+
+def build_genre_index(df: pd.DataFrame) -> tuple[np.ndarray, tuple[str, ...]] | None:
+    """
+    (bits uint64 por linha, vocabulário de nomes na ordem dos bits).
+    None se não houver colunas de gênero ou se houver mais de MAX_GENRES gêneros.
+    """
+    combos = _combos(df)
+    if combos is None:
+        return None
+    codes, keys, names = combos
+
+    # vocabulário ordenado por genre_id (ou pelo nome, quando só há genres_str)
+    key_to_name: dict = {}
+    for ks, ns in zip(keys, names):
+        for k, n in zip(ks, ns):
+            key_to_name.setdefault(k, n)
+    ordered = sorted(key_to_name)
+    if len(ordered) > MAX_GENRES:
+        return None
+    pos = {k: np.uint64(1) << np.uint64(i) for i, k in enumerate(ordered)}
+
+    combo_bits = np.zeros(len(keys) + 1, dtype=np.uint64)  # último = sem gênero (code -1)
+    for j, ks in enumerate(keys):
+        for k in ks:
+            combo_bits[j] |= pos[k]
+
+    return combo_bits[codes], tuple(key_to_name[k] for k in ordered)
+
+
+def add_genre_index(df: pd.DataFrame) -> pd.DataFrame:
+    """Anexa a coluna genre_bits e o vocabulário (df.attrs) — chamado uma vez, no load."""
+    idx = build_genre_index(df)
+    if idx is not None:
+        bits, vocab = idx
+        df[GENRE_BITS_COL] = bits
+        df.attrs[GENRE_VOCAB_ATTR] = vocab
+    return df
+
+
+def get_genre_index(df: pd.DataFrame) -> tuple[np.ndarray, tuple[str, ...]] | None:
+    """(bits, vocabulário) do frame: o do load, ou reconstruído se o frame não tiver índice."""
+    vocab = df.attrs.get(GENRE_VOCAB_ATTR)
+    if vocab is not None and GENRE_BITS_COL in df.columns:
+        return df[GENRE_BITS_COL].to_numpy(dtype=np.uint64), tuple(vocab)
+    return build_genre_index(df)
+
+
+def genre_mask(df: pd.DataFrame, genre_q: str) -> np.ndarray | None:
+    """Filmes com algum gênero cujo nome contém genre_q (case-insensitive), via teste de bits."""
+    idx = get_genre_index(df)
+    if idx is None:
+        return None
+    bits, vocab = idx
+    return (bits & query_bits(vocab, genre_q)) != 0
+
+
+def query_bits(vocab: tuple[str, ...], genre_q: str) -> np.uint64:
+    """Máscara com os gêneros cujo nome contém genre_q (case-insensitive)."""
+    q = genre_q.strip().lower()
+    wanted = np.uint64(0)
+    for i, name in enumerate(vocab):
+        if q in name.lower():
+            wanted |= np.uint64(1) << np.uint64(i)
+    return wanted
+
+
+def genre_matrix(bits: np.ndarray, n_genres: int) -> np.ndarray:
+    """Matriz multi-hot (linhas x gêneros) a partir dos bits."""
+    shifts = np.arange(n_genres, dtype=np.uint64)
+    return ((bits[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def genre_aggregate(
+    df: pd.DataFrame,
+    means: dict[str, str],
+    *,
+    required: str | None = None,
+) -> pd.DataFrame:
+    """
+    Por gênero: `movies` (filmes com o gênero) e a média de cada coluna em `means`
+    ({nome_saida: coluna}), ignorando nulos. Equivalente a explode + groupby, mas com
+    reduções matriciais. `required`: considera só linhas com essa coluna não nula.
+    """
+    out_cols = ["genre", "movies", *means]
+    idx = get_genre_index(df)
+    if idx is None or len(df) == 0:
+        return pd.DataFrame(columns=out_cols)
+    bits, vocab = idx
+
+    if required is not None:
+        ok = df[required].notna().to_numpy()
+        df, bits = df[ok], bits[ok]
+
+    M = genre_matrix(bits, len(vocab))
+    data = {"genre": list(vocab), "movies": M.sum(axis=0, dtype=np.int64)}
+    for name, col in means.items():
+        v = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        ok = ~np.isnan(v)
+        sums = np.where(ok, v, 0.0) @ M
+        counts = ok.astype(np.float64) @ M
+        with np.errstate(invalid="ignore", divide="ignore"):
+            data[name] = np.where(counts > 0, sums / counts, np.nan)
+
+    agg = pd.DataFrame(data)
+    return agg[agg["movies"] > 0].sort_values("genre").reset_index(drop=True)
@@ -0,0 +1,107 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from components.filter_engine import frame_key
+
+HIST_MAXBINS = 24
+BIN_EPSILON = 1e-14
+
+
+def nice_bins(lo: float, hi: float, maxbins: int = HIST_MAXBINS) -> tuple[float, float, float]:
+    """
+    (start, stop, step) com passo "redondo" (1, 2 ou 5 x 10^k) e no máximo `maxbins` faixas,
+    como o bin do Vega-Lite (alt.Bin(maxbins=...)).
+    """
+    span = hi - lo
+    if not np.isfinite(span) or span <= 0:
+        step = 1.0
+        return math.floor(lo), math.floor(lo) + step, step
+    level = math.ceil(math.log10(maxbins))
+    step = 10.0 ** (round(math.log10(span)) - level)
+    while math.ceil(span / step) > maxbins:
+        step *= 10
+    for div in (5, 2):
+        if span / (step / div) <= maxbins:
+            step /= div
+    start = math.floor(lo / step) * step
+    stop = math.ceil(hi / step) * step
+    return start, stop, step
+
+
+def _values(df: pd.DataFrame, col: str) -> np.ndarray:
+    v = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return v[~np.isnan(v)]
+
+
+def _histogram(df: pd.DataFrame, col: str, maxbins: int, thresholds: tuple, labels: tuple) -> pd.DataFrame:
+    v = _values(df, col)
+    cols = ["bin_start", "bin_end", "band", "count"]
+    if len(v) == 0:
+        return pd.DataFrame(columns=cols)
+
+    start, stop, step = nice_bins(float(v.min()), float(v.max()), maxbins)
+    nbins = max(1, round((stop - start) / step))
+    # a última faixa é fechada (o máximo cai nela, como em np.histogram); o epsilon é o do bin
+    # do Vega: valor em cima de uma borda (ex.: 6.4 com passo 0.2) fica na faixa de cima
+    b = np.clip(np.floor((v - start) / step + BIN_EPSILON).astype(np.int64), 0, nbins - 1)
+
+    # faixa de cada valor com a regra do pd.cut(right=True): v <= limiar fica na faixa de baixo
+    nbands = len(labels) or 1
+    band = np.searchsorted(np.asarray(thresholds, dtype=np.float64), v, side="left") if labels else np.zeros(len(v), dtype=np.int64)
+    counts = np.bincount(b * nbands + band, minlength=nbins * nbands).reshape(nbins, nbands)
+
+    bi, ki = np.nonzero(counts)
+    edges = start + np.arange(nbins + 1) * step
+    return pd.DataFrame({
+        "bin_start": edges[bi],
+        "bin_end": edges[bi + 1],
+        "band": np.asarray(labels, dtype=object)[ki] if labels else "",
+        "count": counts[bi, ki],
+    })
+
+
+def _value_counts(df: pd.DataFrame, col: str, name: str) -> pd.DataFrame:
+    v = _values(df, col)
+    if len(v) == 0:
+        return pd.DataFrame({col: pd.Series(dtype="Int64"), name: pd.Series(dtype=np.int64)})
+    iv = v.astype(np.int64)
+    lo = int(iv.min())
+    counts = np.bincount(iv - lo)
+    nz = np.flatnonzero(counts)
+    return pd.DataFrame({col: pd.array(nz + lo, dtype="Int64"), name: counts[nz]})
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached(kind: str, key: tuple, col: str, params: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    return _histogram(_df, col, *params) if kind == "hist" else _value_counts(_df, col, *params)
+
+
+def histogram(
+    df: pd.DataFrame,
+    col: str,
+    *,
+    maxbins: int = HIST_MAXBINS,
+    thresholds: tuple = (),
+    labels: tuple = (),
+) -> pd.DataFrame:
+    """
+    Histograma já binado: uma linha por (faixa, banda) não vazia com bin_start, bin_end,
+    band e count. `thresholds`/`labels` definem as bandas (len(labels) == len(thresholds) + 1),
+    com a mesma regra de _wr_band/_roi_band. Em cache por versão do dataset e filtro.
+    """
+    params = (int(maxbins), tuple(float(t) for t in thresholds), tuple(labels))
+    key = frame_key(df)
+    if key is None:
+        return _histogram(df, col, *params)
+    return _cached("hist", key, col, params, df)
+
+
+def value_counts(df: pd.DataFrame, col: str, *, name: str = "movies") -> pd.DataFrame:
+    """Contagem por valor inteiro (ex.: release_year), ordenada pelo valor, via bincount."""
+    key = frame_key(df)
+    if key is None:
+        return _value_counts(df, col, name)
+    return _cached("counts", key, col, (name,), df)
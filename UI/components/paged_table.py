@@ -0,0 +1,128 @@
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from components.filter_engine import frame_key
+from components.topk import sort_keys
+
+PAGE_SIZE = 50
+
+
+def _sorted(df: pd.DataFrame, by: tuple[str, ...], ascending: bool, base: pd.DataFrame | None):
+    """(chaves em ordem crescente, posições em df nessa ordem, espaço das chaves)."""
+    keys, space = sort_keys(df, list(by), ascending=ascending, base=base)
+    order = np.argsort(keys, kind="stable")
+    keys_sorted = keys[order]
+    keys_sorted.setflags(write=False)
+    order.setflags(write=False)
+    return keys_sorted, order, space
+
+
+@st.cache_resource(max_entries=32)
+def _cached_order(key: tuple, by: tuple[str, ...], ascending: bool, _df: pd.DataFrame, _base: pd.DataFrame | None):
+    return _sorted(_df, by, ascending, _base)
+
+
+def slice_order(
+    df: pd.DataFrame,
+    by: list[str],
+    *,
+    ascending: bool = False,
+    base: pd.DataFrame | None = None,
+    key_from: pd.DataFrame | None = None,
+    key_extra: tuple = (),
+):
+    """
+    Ordem completa do recorte, em cache por versão do dataset + filtro (frame_key), ordenação
+    e `key_extra` (mesma convenção de chart_cache.chart_spec). Com `base`, as chaves são o
+    rank no dataset (topk.sort_keys): só o recorte é ordenado, O(k log k), uma vez por filtro.
+    """
+    fk = frame_key(key_from if key_from is not None else df)
+    if fk is None:
+        return _sorted(df, tuple(by), ascending, base)
+    return _cached_order((*fk, tuple(key_extra)), tuple(by), ascending, df, base)
+
+
+def _state(key: str) -> dict:
+    return st.session_state.setdefault(f"{key}__pages", {"space": None, "stack": []})
+
+
+def _next(key: str, cursor: int) -> None:
+    _state(key)["stack"].append(cursor)
+
+
+def _prev(key: str) -> None:
+    stack = _state(key)["stack"]
+    if stack:
+        stack.pop()
+
+
+def _first(key: str) -> None:
+    _state(key)["stack"].clear()
+
+
+def paged_table(
+    df: pd.DataFrame,
+    columns: list[str],
+    *,
+    key: str,
+    sort_cols: list[str],
+    base: pd.DataFrame | None = None,
+    formatters: dict[str, Callable[[pd.Series], pd.Series]] | None = None,
+    page_size: int = PAGE_SIZE,
+    key_from: pd.DataFrame | None = None,
+    key_extra: tuple = (),
+) -> None:
+    """
+    Tabela paginada do recorte inteiro: só a página visível é recortada, formatada e enviada.
+    Paginação por cursor (chave de ordenação da última linha da página): com `base`, a chave
+    é o rank no dataset, então a posição se mantém quando o filtro muda.
+    `formatters`: coluna -> função por coluna (ex.: formatters.money_short_col).
+    """
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        sort_by = st.selectbox("Sort by", sort_cols, key=f"{key}__sort")
+    with c2:
+        ascending = st.toggle("Ascending", value=False, key=f"{key}__asc")
+
+    keys, order, space = slice_order(
+        df, [sort_by], ascending=ascending, base=base, key_from=key_from, key_extra=key_extra
+    )
+
+    # cursores só valem no mesmo espaço de chaves (ordenação; sem base, também o mesmo recorte)
+    state = _state(key)
+    space_id = space if space is not None else (
+        "local", sort_by, ascending, frame_key(key_from if key_from is not None else df), tuple(key_extra), len(df)
+    )
+    if state["space"] != space_id:
+        state["space"], state["stack"] = space_id, []
+
+    n = len(order)
+    cursor = state["stack"][-1] if state["stack"] else None
+    start = 0 if cursor is None else int(np.searchsorted(keys, cursor, "right"))
+    if start >= n and state["stack"]:
+        # o recorte novo não tem linhas depois do cursor: volta ao início
+        state["stack"].clear()
+        start = 0
+    stop = min(start + page_size, n)
+
+    page = df.iloc[order[start:stop]][columns].copy()
+    for c, fmt in (formatters or {}).items():
+        if c in page.columns:
+            page[c] = fmt(page[c])
+    st.dataframe(page, hide_index=True, use_container_width=True)
+
+    b1, b2, b3, info = st.columns([1, 1, 1, 4])
+    with b1:
+        st.button("⏮ First", key=f"{key}__first", on_click=_first, args=(key,), disabled=start == 0)
+    with b2:
+        st.button("◀ Prev", key=f"{key}__prev", on_click=_prev, args=(key,), disabled=not state["stack"])
+    with b3:
+        st.button(
+            "Next ▶", key=f"{key}__next", on_click=_next,
+            args=(key, int(keys[stop - 1]) if stop else 0), disabled=stop >= n,
+        )
+    with info:
+        st.caption(f"Rows {start + 1 if n else 0:,}–{stop:,} of {n:,}" if n else "No rows in this slice.")
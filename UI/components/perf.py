@@ -0,0 +1,175 @@
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+PANEL_KEY = "perf_panel"
+STATE_KEY = "_perf_run"
+LOG_ENV = "TMDB_PERF_LOG"  # caminho do JSONL; sem ele, nada é gravado
+
+_log_lock = Lock()
+
+
+class Span:
+    """Uma etapa medida no rerun: tempo de parede, linhas de entrada/saída, cache e bytes da spec."""
+
+    __slots__ = ("name", "depth", "start_ms", "ms", "rows_in", "rows_out", "cache", "bytes", "children")
+
+    def __init__(self, name: str, depth: int = 0, start_ms: float = 0.0, rows_in: int | None = None):
+        self.name = name
+        self.depth = depth
+        self.start_ms = start_ms
+        self.ms = 0.0
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.cache = None
+        self.bytes = None
+        self.children = 0
+
+    def to_dict(self) -> dict:
+        out = {k: getattr(self, k) for k in self.__slots__ if k != "children"}
+        out["start_ms"], out["ms"] = round(self.start_ms, 3), round(self.ms, 3)
+        return out
+
+
+def _log_path() -> Path | None:
+    path = os.environ.get(LOG_ENV)
+    return Path(path) if path else None
+
+
+def enabled() -> bool:
+    """Medição ligada: dentro do app e com o painel aberto ou o log JSONL configurado."""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return False
+    return _log_path() is not None or bool(st.session_state.get(PANEL_KEY, False))
+
+
+def _run() -> dict:
+    run = st.session_state.get(STATE_KEY)
+    if run is None:
+        run = st.session_state[STATE_KEY] = {"seq": 0, "t0": None, "spans": [], "stack": []}
+    return run
+
+
+@contextmanager
+def span(name: str, *, rows_in: int | None = None, cached: bool = False):
+    """
+    Mede o bloco como uma etapa do rerun atual. O Span devolvido aceita rows_out/cache/bytes.
+    cached=True: bloco que passa por um cache do Streamlit; sem nenhuma etapa interna
+    (o corpo da função em cache também abre um span), conta como hit, senão como miss.
+    Fora do app ou com a medição desligada, só executa o bloco.
+    """
+    if not enabled():
+        yield Span(name)
+        return
+    run = _run()
+    now = time.perf_counter()
+    if run["t0"] is None:
+        run["t0"] = now
+    stack = run["stack"]
+    if stack:
+        stack[-1].children += 1
+    s = Span(name, len(stack), (now - run["t0"]) * 1e3, rows_in)
+    run["spans"].append(s)
+    stack.append(s)
+    try:
+        yield s
+    finally:
+        s.ms = (time.perf_counter() - now) * 1e3
+        if cached and s.cache is None:
+            s.cache = "miss" if s.children else "hit"
+        if stack and stack[-1] is s:
+            stack.pop()
+
+
+def note(**fields) -> None:
+    """Preenche campos (ex.: cache="hit") da etapa aberta mais interna, se houver."""
+    if not enabled():
+        return
+    stack = _run()["stack"]
+    if stack:
+        for k, v in fields.items():
+            setattr(stack[-1], k, v)
+
+
+def _rows(obj) -> int | None:
+    return len(obj) if isinstance(obj, (pd.DataFrame, pd.Series)) else None
+
+
+def traced(name: str | None = None, *, cached: bool = False):
+    """Decorator: span com o nome `módulo.função`, linhas do 1º argumento e do retorno."""
+    def deco(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return fn(*args, **kwargs)
+            with span(label, rows_in=_rows(args[0]) if args else None, cached=cached) as s:
+                out = fn(*args, **kwargs)
+                s.rows_out = _rows(out)
+                return out
+
+        return wrapper
+
+    return deco
+
+
+def _append_log(path: Path, page: str, run: dict, run_ms: float) -> None:
+    ctx = get_script_run_ctx(suppress_warning=True)
+    head = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "session": ctx.session_id if ctx is not None else None,
+        "page": page,
+        "run": run["seq"],
+        "run_ms": round(run_ms, 3),
+    }
+    lines = "".join(json.dumps({**head, **s.to_dict()}, default=str) + "\n" for s in run["spans"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _log_lock, path.open("a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+def _table(spans: list[Span]) -> pd.DataFrame:
+    return pd.DataFrame({
+        "stage": ["  " * s.depth + s.name for s in spans],
+        "ms": [round(s.ms, 1) for s in spans],
+        "rows in": [s.rows_in for s in spans],
+        "rows out": [s.rows_out for s in spans],
+        "cache": [s.cache or "" for s in spans],
+        "spec KB": [round(s.bytes / 1024, 1) if s.bytes is not None else None for s in spans],
+    })
+
+
+def render_perf_panel(page: str) -> None:
+    """
+    Fecha o rerun: grava as etapas no JSONL (se TMDB_PERF_LOG estiver definido) e, com o
+    toggle "Performance panel" ligado, mostra a tabela na sidebar. Chamar no fim da página.
+    """
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return
+    run = _run()
+    run_ms = (time.perf_counter() - run["t0"]) * 1e3 if run["t0"] is not None else 0.0
+
+    path = _log_path()
+    if path is not None and run["spans"]:
+        _append_log(path, page, run, run_ms)
+
+    with st.sidebar:
+        st.divider()
+        if st.toggle("Performance panel", key=PANEL_KEY, help="Time, rows, cache and chart size per stage of this rerun."):
+            if run["spans"]:
+                st.caption(f"Rerun #{run['seq']}: {run_ms:,.1f} ms from the first measured stage")
+                st.dataframe(_table(run["spans"]), hide_index=True, use_container_width=True)
+            else:
+                st.caption("Measuring from the next rerun.")
+
+    run.update(seq=run["seq"] + 1, t0=None, spans=[], stack=[])
@@ -1,5 +1,19 @@
+import numpy as np
 import pandas as pd
 
+from components.perf import traced
+from components.roi_index import get_roi_index
+
+# limiares da curva de sensibilidade (USD, escala log): 10 mil a 1 bilhão
+COVERAGE_THRESHOLDS = np.logspace(4, 9, 51)
+
+
+def _has_financials(df: pd.DataFrame | None) -> bool:
+    need = {"budget", "revenue", "profit", "roi"}
+    return df is not None and all(c in df.columns for c in need)
+
+
+@traced(cached=True)
 def roi_ready_coverage(
     df: pd.DataFrame,
     *,
@@ -14,18 +28,32 @@ def roi_ready_coverage(
     if df is None or len(df) == 0:
         return 0.0, 0, 0
 
-    need = {"budget", "revenue", "profit", "roi"}
-    if any(c not in df.columns for c in need):
+    if not _has_financials(df):
         return 0.0, 0, len(df)
 
-    base = df.copy()
-
-    ok = base[
-        (base["budget"].fillna(0) >= min_budget) &
-        (base["revenue"].fillna(0) >= min_revenue)
-    ].dropna(subset=["roi", "profit"])
-
-    n_total = len(base)
-    n_ok = len(ok)
+    n_total = len(df)
+    n_ok = get_roi_index(df).count(min_budget, min_revenue)
     cov = (n_ok / n_total) if n_total else 0.0
     return cov, n_ok, n_total
+
+
+@traced(cached=True)
+def roi_ready_rows(df: pd.DataFrame, *, min_budget: float, min_revenue: float) -> pd.DataFrame:
+    """Linhas ROI-ready acima dos limiares, na ordem original (mesmo critério de roi_ready_coverage)."""
+    if not _has_financials(df) or len(df) == 0:
+        return df.iloc[:0]
+    return df.iloc[get_roi_index(df).select(min_budget, min_revenue)]
+
+
+@traced(cached=True)
+def roi_coverage_curve(
+    df: pd.DataFrame,
+    *,
+    min_budget: float,
+    min_revenue: float,
+    thresholds: np.ndarray = COVERAGE_THRESHOLDS,
+) -> pd.DataFrame:
+    """Coverage vs limiar (axis, threshold, movies, coverage), variando budget e revenue separadamente."""
+    if not _has_financials(df) or len(df) == 0:
+        return pd.DataFrame(columns=["axis", "threshold", "movies", "coverage"])
+    return get_roi_index(df).coverage_curve(thresholds, min_budget=min_budget, min_revenue=min_revenue)
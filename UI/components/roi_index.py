@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from components.filter_engine import frame_key
+from components.perf import span
+
+LEAF = 64  # blocos menores que isso são varridos direto
+
+
+def _num(df: pd.DataFrame, col: str) -> np.ndarray:
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def roi_ready_mask(df: pd.DataFrame) -> np.ndarray:
+    """Flag do ETL (roi_ready); para curated antigos, roi e profit não nulos."""
+    if "roi_ready" in df.columns:
+        ready = df["roi_ready"].fillna(False).to_numpy(dtype=bool)
+    else:
+        ready = df["roi"].notna().to_numpy() & df["profit"].notna().to_numpy()
+    # budget/revenue nulos contam como 0 no limiar (regra da página de ROI)
+    return ready & ~np.isnan(_num(df, "budget")) & ~np.isnan(_num(df, "revenue"))
+
+
+class RoiIndex:
+    """
+    Contagem de dominância 2D sobre os filmes ROI-ready: quantos têm budget >= b e revenue >= r.
+    Os pontos ficam ordenados por budget (um limiar de budget vira um sufixo, por busca binária);
+    por cima dessa ordem, uma merge-sort tree guarda, para cada bloco alinhado de 2^k posições,
+    os ranks de revenue ordenados. Um sufixo se decompõe em O(log n) blocos, cada um respondido
+    por busca binária: count() custa O(log² n), independente do tamanho do recorte.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.n_total = len(df)
+        ready = roi_ready_mask(df)
+        budget, revenue = _num(df, "budget")[ready], _num(df, "revenue")[ready]
+
+        order = np.argsort(budget, kind="stable")
+        self.budget = budget[order]
+        self.revenue = revenue[order]                # na ordem de budget
+        self.pos = np.flatnonzero(ready)[order]      # posição da linha no frame
+        self.n = len(order)
+
+        by_rev = np.argsort(self.revenue, kind="stable")
+        self.revenue_sorted = self.revenue[by_rev]
+        rank = np.empty(self.n, dtype=np.int32)
+        rank[by_rev] = np.arange(self.n, dtype=np.int32)
+
+        # ranks com padding (-1 nunca passa no limiar) até potência de 2
+        self.size = max(LEAF, 1 << max(self.n - 1, 0).bit_length())
+        self.rank = np.full(self.size, -1, dtype=np.int32)
+        self.rank[:self.n] = rank
+        self.levels: dict[int, np.ndarray] = {}
+        s = LEAF
+        while s <= self.size:
+            self.levels[s] = np.sort(self.rank.reshape(-1, s), axis=1)
+            s *= 2
+
+    def _bounds(self, min_budget: float, min_revenue: float) -> tuple[int, int]:
+        # budget >= min_budget <=> índice >= i ; revenue >= min_revenue <=> rank >= q
+        i = int(np.searchsorted(self.budget, min_budget, "left"))
+        q = int(np.searchsorted(self.revenue_sorted, min_revenue, "left"))
+        return i, q
+
+    def count(self, min_budget: float, min_revenue: float) -> int:
+        i, q = self._bounds(min_budget, min_revenue)
+        if i >= self.n or q >= self.n:
+            return 0
+        p = min(-(-i // LEAF) * LEAF, self.size)
+        total = int((self.rank[i:p] >= q).sum())
+        while p < self.size:
+            s = p & -p if p else self.size  # maior bloco alinhado que começa em p
+            block = self.levels[s][p // s]
+            total += s - int(np.searchsorted(block, q, "left"))
+            p += s
+        return total
+
+    def select(self, min_budget: float, min_revenue: float) -> np.ndarray:
+        """Posições (crescentes) das linhas ROI-ready acima dos dois limiares."""
+        i = int(np.searchsorted(self.budget, min_budget, "left"))
+        return np.sort(self.pos[i:][self.revenue[i:] >= min_revenue])
+
+    def coverage_curve(self, thresholds: np.ndarray, *, min_budget: float, min_revenue: float) -> pd.DataFrame:
+        """
+        Coverage ao variar um limiar com o outro fixo, para cada valor de `thresholds`:
+        eixo "Budget" (min_revenue fixo) e "Revenue" (min_budget fixo). Um searchsorted por eixo.
+        """
+        t = np.asarray(thresholds, dtype=np.float64)
+        i = int(np.searchsorted(self.budget, min_budget, "left"))
+        b = self.budget[self.revenue >= min_revenue]   # já ordenado
+        r = np.sort(self.revenue[i:])
+        parts = []
+        for axis, values in (("Budget", b), ("Revenue", r)):
+            n_ok = len(values) - np.searchsorted(values, t, "left")
+            parts.append(pd.DataFrame({
+                "axis": axis,
+                "threshold": t,
+                "movies": n_ok,
+                "coverage": n_ok / self.n_total if self.n_total else 0.0,
+            }))
+        return pd.concat(parts, ignore_index=True)
+
+
+def _build(df: pd.DataFrame) -> RoiIndex:
+    with span("roi_index.build", rows_in=len(df)) as s:
+        idx = RoiIndex(df)
+        s.rows_out = idx.n
+        return idx
+
+
+@st.cache_resource(max_entries=16)
+def _cached_index(key: tuple, _df: pd.DataFrame) -> RoiIndex:
+    return _build(_df)
+
+
+def get_roi_index(df: pd.DataFrame) -> RoiIndex:
+    """Índice compartilhado por versão do dataset e filtro (frame_key); senão, um índice avulso."""
+    key = frame_key(df)
+    return _build(df) if key is None else _cached_index(key, df)
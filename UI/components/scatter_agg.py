@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# acima de SCATTER_MAX_POINTS pontos os scatters passam a ser agregados em grade no servidor
+SCATTER_MAX_POINTS = 5_000
+SCATTER_MAX_MARKS = 2_000   # teto de marcas enviadas ao navegador (células + pontos)
+GRID_BINS = 64              # células por eixo (a grade engrossa se passar do teto)
+SPARSE_MAX = 2              # células com até isso de pontos viram pontos individuais (outliers)
+
+
+def _axis(s: pd.Series, log: bool) -> np.ndarray:
+    v = pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    if log:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            v = np.where(v > 0, np.log10(v), np.nan)
+    return v
+
+
+def _bin(v: np.ndarray, bins: int) -> np.ndarray:
+    lo, hi = v.min(), v.max()
+    if hi <= lo:
+        return np.zeros(len(v), dtype=np.int64)
+    return np.clip(((v - lo) / (hi - lo) * bins).astype(np.int64), 0, bins - 1)
+
+
+def grid_downsample(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    *,
+    log_x: bool = False,
+    log_y: bool = False,
+    mean_cols: list[str] | tuple[str, ...] = (),
+    max_marks: int = SCATTER_MAX_MARKS,
+    bins: int = GRID_BINS,
+    sparse_max: int = SPARSE_MAX,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Agrega um scatter numa grade 2D (em espaço log nos eixos log).
+    Retorna (cells, outliers):
+    - cells: uma linha por célula não vazia com x/y = centro de massa (na escala original),
+      `count` e a média de cada coluna de `mean_cols`;
+    - outliers: linhas originais das células esparsas (<= sparse_max pontos), até max_marks // 4,
+      mantidas como pontos individuais (fora das células).
+    Se as células + outliers passarem de max_marks, a grade é engrossada pela metade.
+    Pontos sem coordenada válida (nulos; <= 0 em eixo log) ficam de fora, como no gráfico.
+    """
+    tx, ty = _axis(df[x], log_x), _axis(df[y], log_y)
+    ok = np.isfinite(tx) & np.isfinite(ty)
+    d, tx, ty = df[ok], tx[ok], ty[ok]
+    if len(d) == 0:
+        return pd.DataFrame(columns=[x, y, "count", *mean_cols]), d
+
+    max_outliers = max_marks // 4
+    while True:
+        cell = _bin(tx, bins) * bins + _bin(ty, bins)
+        counts = np.bincount(cell, minlength=bins * bins)
+        density = counts[cell]
+
+        sparse = np.flatnonzero(density <= sparse_max)
+        out_pos = sparse[np.argsort(density[sparse], kind="stable")[:max_outliers]]
+        keep = np.ones(len(d), dtype=bool)
+        keep[out_pos] = False
+
+        agg_counts = np.bincount(cell[keep], minlength=bins * bins)
+        n_cells = int((agg_counts > 0).sum())
+        if n_cells + len(out_pos) <= max_marks or bins <= 4:
+            break
+        bins //= 2
+
+    c = cell[keep]
+    nonempty = np.flatnonzero(agg_counts)
+    cnt = agg_counts[nonempty].astype(np.float64)
+
+    def cell_mean(v: np.ndarray) -> np.ndarray:
+        return np.bincount(c, weights=v, minlength=bins * bins)[nonempty] / cnt
+
+    mx, my = cell_mean(tx[keep]), cell_mean(ty[keep])
+    cells = pd.DataFrame({
+        x: 10 ** mx if log_x else mx,
+        y: 10 ** my if log_y else my,
+        "count": agg_counts[nonempty],
+    })
+    for col in mean_cols:
+        v = pd.to_numeric(d[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)[keep]
+        # média ignorando nulos dentro de cada célula
+        nn = ~np.isnan(v)
+        s = np.bincount(c[nn], weights=v[nn], minlength=bins * bins)[nonempty]
+        n = np.bincount(c[nn], minlength=bins * bins)[nonempty]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cells[col] = np.where(n > 0, s / n, np.nan)
+
+    return cells, d.iloc[np.sort(out_pos)]
@@ -0,0 +1,172 @@
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+SEARCH_COLS = ["title", "original_title", "overview"]
+FIELD_COLS = ["title", "original_title"]  # também pesquisáveis isoladamente (ex.: "Title contains")
+BUILD_CHUNK = 25_000
+VERIFY_ONLY_BELOW = 2_000  # seleções menores que isso são só verificadas, sem consultar o índice
+
+# marcas combinantes (acentos) que sobram depois do NFKD
+_COMBINING = "[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]"
+_COMBINING_RE = re.compile(_COMBINING)
+
+
+def normalize_text(s: str) -> str:
+    """Minúsculas (casefold) e sem acentos: "Ação" -> "acao"."""
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFKD", s or "")).casefold()
+
+
+def normalize_series(s: pd.Series) -> pd.Series:
+    return (
+        s.fillna("").astype(str)
+         .str.normalize("NFKD")
+         .str.replace(_COMBINING, "", regex=True)
+         .str.casefold()
+    )
+
+
+def _sorted_unique(a: np.ndarray) -> np.ndarray:
+    # sort + vizinhos: bem mais rápido que np.unique para arrays inteiros grandes
+    a = np.sort(a)
+    if len(a) == 0:
+        return a
+    keep = np.empty(len(a), dtype=bool)
+    keep[0] = True
+    np.not_equal(a[1:], a[:-1], out=keep[1:])
+    return a[keep]
+
+
+def _intersect_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Elementos de `a` presentes em `b` (ambos crescentes, sem repetição); barato com `a` pequeno."""
+    if len(a) == 0 or len(b) == 0:
+        return a[:0]
+    i = np.searchsorted(b, a)
+    i[i == len(b)] = 0
+    return a[b[i] == a]
+
+
+def _trigrams(buf: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """Códigos (b0<<16 | b1<<8 | b2) de cada janela de 3 bytes e máscara das que não têm separador (0)."""
+    b = np.frombuffer(buf, dtype=np.uint8).astype(np.uint32)
+    if len(b) < 3:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=bool)
+    codes = (b[:-2] << 16) | (b[1:-1] << 8) | b[2:]
+    ok = (b[:-2] != 0) & (b[1:-1] != 0) & (b[2:] != 0)
+    return codes, ok
+
+
+class SearchIndex:
+    """
+    Índice invertido de trigramas (bytes UTF-8 do texto normalizado) em formato CSR:
+    `grams` (trigramas distintos, ordenados), `offsets` e `postings` (posições de linha,
+    crescentes dentro de cada trigrama). Uma busca intersecta as listas dos trigramas da
+    consulta, começando pela menor, e confirma os candidatos com substring no texto.
+    """
+
+    def __init__(self, df: pd.DataFrame, cols: list[str] = SEARCH_COLS):
+        cols = [c for c in cols if c in df.columns]
+        self.n = len(df)
+        norm = {c: normalize_series(df[c]).to_numpy(dtype=object) for c in cols}
+        self.fields = {c: norm[c] for c in FIELD_COLS if c in norm}
+        # texto do documento = colunas unidas por "\n" (a consulta nunca cruza a fronteira)
+        self.docs = np.array(["\n".join(xs) for xs in zip(*norm.values())] if cols else [""] * self.n, dtype=object)
+        self.grams, self.offsets, self.postings = self._build()
+
+    def _build(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # 1) por chunk de linhas: pares (trigrama, linha) distintos, ordenados por trigrama e linha
+        parts = []
+        for start in range(0, self.n, BUILD_CHUNK):
+            stop = min(start + BUILD_CHUNK, self.n)
+            enc = [d.encode("utf-8") for d in self.docs[start:stop]]
+            buf = b"\x00".join(enc) + b"\x00"
+            doc_of_byte = np.repeat(np.arange(start, stop, dtype=np.uint64), [len(e) + 1 for e in enc])
+
+            codes, ok = _trigrams(buf)
+            keys = _sorted_unique((codes[ok].astype(np.uint64) << np.uint64(32)) | doc_of_byte[:-2][ok])
+            grams = (keys >> np.uint64(32)).astype(np.uint32)
+            run = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]]) if len(grams) else np.zeros(0, dtype=np.intp)
+            parts.append((grams[run], np.diff(np.append(run, len(grams))), (keys & np.uint64(0xFFFFFFFF)).astype(np.uint32)))
+
+        # 2) só os trigramas que ocorrem: cada chunk vira índices nesse vocabulário
+        grams = np.unique(np.concatenate([p[0] for p in parts])) if parts else np.zeros(0, dtype=np.uint32)
+        counts = np.zeros(len(grams), dtype=np.int64)
+        for i, (ug, cnt, docs) in enumerate(parts):
+            slot = np.searchsorted(grams, ug)
+            counts[slot] += cnt
+            parts[i] = (slot, cnt, docs)
+
+        # 3) counting sort: cada chunk escreve na sua fatia de cada trigrama; como os chunks
+        #    vêm em ordem de linha, as postings ficam crescentes sem sort global
+        offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        cursor = offsets[:-1].copy()
+        postings = np.empty(int(offsets[-1]), dtype=np.uint32)
+        while parts:
+            slot, cnt, docs = parts.pop(0)
+            run_start = np.cumsum(cnt) - cnt
+            dest = np.repeat(cursor[slot] - run_start, cnt) + np.arange(len(docs))
+            postings[dest] = docs
+            cursor[slot] += cnt
+        return grams, offsets, postings
+
+    @property
+    def nbytes(self) -> int:
+        return self.grams.nbytes + self.offsets.nbytes + self.postings.nbytes
+
+    def _postings(self, code: int) -> np.ndarray:
+        i = np.searchsorted(self.grams, code)
+        if i == len(self.grams) or self.grams[i] != code:
+            return self.postings[:0]
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    def candidates(self, q_norm: str) -> np.ndarray | None:
+        """Linhas que têm todos os trigramas da consulta; None se a consulta for curta demais."""
+        codes, ok = _trigrams(q_norm.encode("utf-8"))
+        codes = _sorted_unique(codes[ok])
+        if len(codes) == 0:
+            return None
+        lists = sorted((self._postings(int(c)) for c in codes), key=len)
+        out = lists[0]
+        for p in lists[1:]:
+            if len(out) == 0:
+                break
+            out = _intersect_sorted(out, p)
+        return out.astype(np.intp)
+
+    def verify(self, pos: np.ndarray, q_norm: str, cols: list[str] | None = None) -> np.ndarray:
+        """
+        Mantém as linhas em que q_norm aparece (substring): no documento inteiro ou, com
+        `cols`, em alguma dessas colunas (de FIELD_COLS).
+        """
+        texts_by_col = [self.docs] if cols is None else [self.fields[c] for c in cols if c in self.fields]
+        hit = np.zeros(len(pos), dtype=bool)
+        for texts in texts_by_col:
+            sub = texts[pos]
+            hit |= np.fromiter((q_norm in t for t in sub), dtype=bool, count=len(sub))
+        return pos[hit]
+
+    def search(
+        self,
+        q: str,
+        cols: list[str] | None = None,
+        within: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """
+        Posições (crescentes) cujo texto normalizado contém q (em `cols`, ou no documento inteiro).
+        `within`: restringe a uma seleção já feita; se ela for pequena, só verifica.
+        """
+        q_norm = normalize_text(q).strip()
+        if not q_norm:
+            return np.arange(self.n) if within is None else within
+
+        # consulta de um trigrama só no documento inteiro: o índice já é exato
+        exact = cols is None and len(q_norm.encode("utf-8")) == 3
+        cand = self.candidates(q_norm) if within is None or len(within) > VERIFY_ONLY_BELOW else None
+        if cand is None:
+            cand, exact = (np.arange(self.n) if within is None else within), False
+        elif within is not None:
+            cand = _intersect_sorted(cand, within) if len(cand) <= len(within) else _intersect_sorted(within, cand)
+        return cand if exact else self.verify(cand, q_norm, cols)
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from components.data import DATASET_VERSION_ATTR
+
+
+def _key(df: pd.DataFrame, col: str, ascending: bool) -> np.ndarray:
+    # float com NaN; descendente vira ascendente trocando o sinal (NaN continua por último)
+    v = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return v if ascending else -v
+
+
+def _order(df: pd.DataFrame, by: list[str], ascending: bool, pos: np.ndarray) -> np.ndarray:
+    """Ordena as posições `pos` por `by` (nulos por último); empate final pela posição."""
+    keys = [_key(df, c, ascending)[pos] for c in reversed(by)]
+    return pos[np.lexsort([pos, *keys])]
+
+
+def _top_positions(df: pd.DataFrame, by: list[str], n: int, ascending: bool) -> np.ndarray:
+    """Seleção parcial: limiar do n-ésimo no critério principal (argpartition), ordena só os candidatos."""
+    primary = _key(df, by[0], ascending)
+    valid = np.flatnonzero(~np.isnan(primary))
+    if len(valid) <= n:
+        # poucos não nulos: todos entram; completa com os nulos (que vêm por último)
+        rest = np.flatnonzero(np.isnan(primary))
+        return np.concatenate([_order(df, by, ascending, valid), _order(df, by, ascending, rest)])[:n]
+
+    v = primary[valid]
+    thr = np.partition(v, n - 1)[n - 1]
+    # todos os empatados no limiar entram como candidatos: o critério secundário decide
+    cand = valid[v <= thr]
+    return _order(df, by, ascending, cand)[:n]
+
+
+def _ids(df: pd.DataFrame) -> np.ndarray:
+    return pd.to_numeric(df["id"], errors="coerce").to_numpy(dtype=np.int64, na_value=-1)
+
+
+@st.cache_resource(max_entries=32)
+def _rank(version: str, by: tuple[str, ...], ascending: bool, _base: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Ordem completa do frame base (uma vez por versão do dataset): rank[posição] e ids."""
+    order = _order(_base, list(by), ascending, np.arange(len(_base)))
+    rank = np.empty(len(_base), dtype=np.int64)
+    rank[order] = np.arange(len(_base))
+    ids = _ids(_base) if "id" in _base.columns else None
+    return rank, ids
+
+
+def _base_ranks(df: pd.DataFrame, base: pd.DataFrame, by: list[str], ascending: bool) -> np.ndarray | None:
+    """
+    Rank de cada linha de `df` na ordem pré-calculada do base, quando `df` é um recorte dele
+    (rótulos do índice = posições no base, conferidos pelo id). O(len(df)). None se não der.
+    """
+    version = base.attrs.get(DATASET_VERSION_ATTR)
+    idx = base.index
+    if version is None or not (isinstance(idx, pd.RangeIndex) and idx.start == 0 and idx.step == 1):
+        return None
+    labels = df.index.to_numpy()
+    if labels.dtype.kind not in "iu" or (len(labels) and (labels.min() < 0 or labels.max() >= len(base))):
+        return None
+
+    rank, ids = _rank(version, tuple(by), ascending, base)
+    if ids is not None and "id" in df.columns and not np.array_equal(ids[labels], _ids(df)):
+        return None
+    return rank[labels]
+
+
+def _ranked_positions(df: pd.DataFrame, base: pd.DataFrame, by: list[str], n: int, ascending: bool) -> np.ndarray | None:
+    r = _base_ranks(df, base, by, ascending)
+    if r is None:
+        return None
+    if len(r) > n:
+        sel = np.argpartition(r, n - 1)[:n]
+    else:
+        sel = np.arange(len(r))
+    return sel[np.argsort(r[sel])]
+
+
+def sort_keys(
+    df: pd.DataFrame,
+    by: str | list[str],
+    *,
+    ascending: bool = False,
+    base: pd.DataFrame | None = None,
+) -> tuple[np.ndarray, tuple | None]:
+    """
+    Chave de ordenação de cada linha de `df`: inteiros distintos, crescentes na ordem de
+    sort_values(by, ascending, kind="stable") (nulos por último). Com `base` (como em top_k)
+    a chave é o rank no frame base, igual para a mesma linha em qualquer recorte; o segundo
+    valor identifica esse espaço de chaves (None quando a chave só vale para este `df`).
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if base is not None:
+        r = _base_ranks(df, base, by, ascending)
+        if r is not None:
+            return r, (base.attrs[DATASET_VERSION_ATTR], tuple(by), ascending)
+    order = _order(df, by, ascending, np.arange(len(df)))
+    keys = np.empty(len(df), dtype=np.int64)
+    keys[order] = np.arange(len(df))
+    return keys, None
+
+
+def top_k(
+    df: pd.DataFrame,
+    by: str | list[str],
+    n: int,
+    *,
+    ascending: bool = False,
+    dropna: bool = False,
+    base: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Equivale a df.sort_values(by, ascending=ascending, kind="stable").head(n), sem ordenar tudo.
+    dropna=True: ignora linhas com o critério principal nulo (como dropna(subset=[by[0]])).
+    base: frame carregado de onde `df` saiu (ex.: df antes de apply_common_filters); a ordem
+    completa dele fica em cache por versão do dataset e cada consulta custa O(len(df)).
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if dropna:
+        df = df[df[by[0]].notna()]
+    if n <= 0 or len(df) == 0:
+        return df.iloc[:0]
+
+    pos = _ranked_positions(df, base, by, n, ascending) if base is not None else None
+    if pos is None:
+        pos = _top_positions(df, by, n, ascending)
+    return df.iloc[pos]
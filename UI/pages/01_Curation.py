@@ -1,10 +1,15 @@
 import streamlit as st
 from components.data import load_curated
-from components.filters import sidebar_common_filters, apply_common_filters
+from components.filters import sidebar_common_filters, sidebar_text_search, apply_common_filters
 from components.kpi import kpi, status_by_threshold
 from components.formatters import fmt2, fmt0
 from components.charts import hist_weighted_rating, titles_per_year
+from components.chart_cache import render_chart
+from components.cube import get_cube, cube_totals, cube_titles_per_year
+from components.topk import top_k
+from components.paged_table import paged_table
 from components.footer import render_footer
+from components.perf import render_perf_panel
 from components.viz_theme import enable_altair_theme
 
 enable_altair_theme()
@@ -26,19 +31,30 @@ st.markdown(
 
 df = load_curated()
 (year_range, mv, genre_q, title_q) = sidebar_common_filters(df, show_genre=True, show_title=True)
+search_q = sidebar_text_search()
 
 with st.sidebar:
     topn = st.slider("Top N", 10, 100, 20, step=10)
 
-df_f = apply_common_filters(df, year_range, mv, genre_q, title_q)
-rank = df_f.sort_values(["weighted_rating", "vote_count"], ascending=False).head(topn)
+df_f = apply_common_filters(df, year_range, mv, genre_q, title_q, search_q, with_search=True)
+rank = top_k(df_f, ["weighted_rating", "vote_count"], topn, base=df)
 
-avg_wr = float(df_f["weighted_rating"].mean()) if len(df_f) else 0.0
-avg_votes = float(df_f["vote_count"].mean()) if len(df_f) else 0.0
+# KPIs e titles/year pelo cubo; sem cubo (ou com busca por texto) calcula sobre as linhas
+cube = get_cube(df)
+filters = (year_range, mv, genre_q, title_q, search_q)
+tot = cube_totals(cube, *filters)
+if tot is not None:
+    n_movies = int(tot["n"])
+    avg_wr = float(tot["avg_weighted_rating"]) if n_movies else 0.0
+    avg_votes = float(tot["avg_vote_count"]) if n_movies else 0.0
+else:
+    n_movies = len(df_f)
+    avg_wr = float(df_f["weighted_rating"].mean()) if len(df_f) else 0.0
+    avg_votes = float(df_f["vote_count"].mean()) if len(df_f) else 0.0
 
 c1, c2, c3 = st.columns(3)
 with c1:
-    kpi("Movies in filter", fmt0(len(df_f)), "neutral")
+    kpi("Movies in filter", fmt0(n_movies), "neutral")
 with c2:
     kpi("Avg weighted_rating", fmt2(avg_wr), status_by_threshold(avg_wr, bad_lt=7.0, warn_lt=7.5))
 with c3:
@@ -52,10 +68,19 @@ for c in ["weighted_rating", "popularity"]:
         tbl[c] = tbl[c].round(2)
 st.dataframe(tbl, hide_index=True, use_container_width=True)
 
+st.subheader("Browse the full slice")
+paged_table(
+    df_f, show_cols, key="curation_browse",
+    sort_cols=["weighted_rating", "vote_count", "popularity", "release_year"],
+    base=df,
+    formatters={"weighted_rating": lambda s: s.round(2), "popularity": lambda s: s.round(2)},
+)
+
 st.subheader("Titles per year (supply in this slice)")
-st.altair_chart(titles_per_year(df_f), use_container_width=True)
+render_chart(titles_per_year, df_f, by_year=cube_titles_per_year(cube, *filters))
 
 st.subheader("Distribution of weighted_rating")
-st.altair_chart(hist_weighted_rating(df_f), use_container_width=True)
+render_chart(hist_weighted_rating, df_f)
 
+render_perf_panel("Curation")
 render_footer()
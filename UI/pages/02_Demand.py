@@ -2,7 +2,11 @@ import streamlit as st
 from components.data import load_curated
 from components.filters import sidebar_common_filters, apply_common_filters
 from components.charts import demand_scatter
+from components.chart_cache import render_chart
+from components.topk import top_k
+from components.paged_table import paged_table
 from components.footer import render_footer
+from components.perf import render_perf_panel
 from components.viz_theme import enable_altair_theme
 
 enable_altair_theme()
@@ -32,13 +36,23 @@ with st.sidebar:
 df_f = apply_common_filters(df, year_range, mv, genre_q, "")
 
 st.subheader("Top by popularity (proxy for demand)")
-top = df_f.sort_values("popularity", ascending=False).head(topn)
+top = top_k(df_f, "popularity", topn, base=df)
 tbl = top[["title", "release_year", "genres_str", "popularity", "weighted_rating", "vote_count"]].copy()
 tbl["popularity"] = tbl["popularity"].round(2)
 tbl["weighted_rating"] = tbl["weighted_rating"].round(2)
 st.dataframe(tbl, hide_index=True, use_container_width=True)
 
+st.subheader("Browse the full slice")
+paged_table(
+    df_f, ["title", "release_year", "genres_str", "popularity", "weighted_rating", "vote_count"],
+    key="demand_browse",
+    sort_cols=["popularity", "vote_count", "weighted_rating", "release_year"],
+    base=df,
+    formatters={"popularity": lambda s: s.round(2), "weighted_rating": lambda s: s.round(2)},
+)
+
 st.subheader("Popularity vs weighted_rating (outliers)")
-st.altair_chart(demand_scatter(df_f, rating_alarm=rating_alarm), use_container_width=True)
+render_chart(demand_scatter, df_f, rating_alarm=rating_alarm)
 
+render_perf_panel("Demand")
 render_footer()
@@ -1,8 +1,12 @@
 import streamlit as st
 from components.data import load_curated
 from components.filters import sidebar_common_filters, apply_common_filters
+from components.genre_index import GENRE_BITS_COL, genre_aggregate
+from components.cube import get_cube, cube_genre_mix
 from components.charts import genre_tradeoff_scatter
+from components.chart_cache import render_chart
 from components.footer import render_footer
+from components.perf import render_perf_panel
 from components.viz_theme import enable_altair_theme
 
 enable_altair_theme()
@@ -17,39 +21,31 @@ st.markdown(
 - Which genres balance quality and scale?
 
 **Analyses**
-- Genre explode + aggregation by genre.
+- Aggregation by genre (multi-hot genre index, no explode).
 - Scatter 'volume vs quality' with color by quality range.
 """
 )
 
 df = load_curated()
 
-if "genres_names" not in df.columns:
-    if "genres_str" not in df.columns:
-        st.error("Missing genre columns (genres_str/genres_names). Run ETL with transform_enrich.")
-        st.stop()
-    df["genres_names"] = df["genres_str"].fillna("").apply(lambda s: [x.strip() for x in s.split(",") if x.strip()])
+if GENRE_BITS_COL not in df.columns and "genres_str" not in df.columns:
+    st.error("Missing genre columns (genre_ids/genres_names/genres_str). Run ETL with transform_enrich.")
+    st.stop()
 
 (year_range, mv, _, _) = sidebar_common_filters(df, show_genre=False, show_title=False)
 
 with st.sidebar:
     min_movies = st.slider("Min movies per genre", 1, 200, 20, step=5)
 
-df_f = apply_common_filters(df, year_range, mv, "", "")
-
-df_g = df_f.explode("genres_names").rename(columns={"genres_names": "genre"})
-df_g = df_g.dropna(subset=["genre", "weighted_rating"])
-
-agg = (
-    df_g.groupby("genre")
-        .agg(
-            movies=("id", "count"),
-            avg_wr=("weighted_rating", "mean"),
-            avg_votes=("vote_count", "mean"),
-            avg_popularity=("popularity", "mean"),
-        )
-        .reset_index()
-)
+# agregado pelo cubo; sem cubo (ou mínimo de votos fora das faixas dele) usa o índice de gêneros
+agg = cube_genre_mix(get_cube(df), year_range, mv)
+if agg is None:
+    df_f = apply_common_filters(df, year_range, mv, "", "")
+    agg = genre_aggregate(
+        df_f,
+        {"avg_wr": "weighted_rating", "avg_votes": "vote_count", "avg_popularity": "popularity"},
+        required="weighted_rating",
+    )
 
 agg = agg[agg["movies"] >= min_movies].sort_values("avg_wr", ascending=False)
 agg_show = agg.copy()
@@ -63,6 +59,7 @@ st.subheader("Top 15 genres by avg weighted_rating")
 st.bar_chart(agg.head(15).set_index("genre")[["avg_wr"]])
 
 st.subheader("Trade-off: volume vs quality")
-st.altair_chart(genre_tradeoff_scatter(agg), use_container_width=True)
+render_chart(genre_tradeoff_scatter, agg)
 
+render_perf_panel("Genre Mix")
 render_footer()
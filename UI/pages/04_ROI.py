@@ -3,11 +3,15 @@ import streamlit as st
 from components.data import load_financial_curated
 from components.filters import sidebar_common_filters, apply_common_filters
 from components.kpi import kpi, status_by_threshold
-from components.formatters import money_short, pct2, fmt2, fmt0
-from components.charts import roi_budget_vs_revenue, quality_vs_roi
+from components.formatters import money_short, pct2, fmt0, money_short_col, pct2_col, fmt2_col
+from components.charts import roi_budget_vs_revenue, quality_vs_roi, roi_coverage_curve_chart
+from components.chart_cache import render_chart
 from components.footer import render_footer
+from components.perf import render_perf_panel
 from components.viz_theme import enable_altair_theme
-from components.quality import roi_ready_coverage
+from components.quality import roi_ready_coverage, roi_ready_rows, roi_coverage_curve
+from components.topk import top_k
+from components.paged_table import paged_table
 
 enable_altair_theme()
 
@@ -24,6 +28,7 @@ st.markdown(
 - ROI and profit calculated from budget/revenue.
 - Minimum filters (budget/revenue) to avoid distorted ranking.
 - Budget vs revenue chart on log scale.
+- Coverage sensitivity: how much of the slice stays ROI-ready as each minimum goes up.
 """
 )
 
@@ -44,13 +49,9 @@ with st.sidebar:
 
 df_f = apply_common_filters(df, year_range, mv, genre_q, "")
 
+# índice ROI-ready do recorte (components/roi_index.py): mudar os mínimos não reprocessa as linhas
 coverage, n_ok, n_total = roi_ready_coverage(df_f, min_budget=min_budget, min_revenue=min_revenue)
-
-
-df_ok = df_f[
-    (df_f["budget"].fillna(0) >= min_budget) &
-    (df_f["revenue"].fillna(0) >= min_revenue)
-].dropna(subset=["roi", "profit"]).copy()
+df_ok = roi_ready_rows(df_f, min_budget=min_budget, min_revenue=min_revenue)
 
 avg_roi = float(df_ok["roi"].mean()) if len(df_ok) else 0.0
 avg_profit = float(df_ok["profit"].mean()) if len(df_ok) else 0.0
@@ -72,22 +73,43 @@ with c4:
 with c5:
     kpi("Avg profit", money_short(avg_profit), "neutral")
 
+st.subheader("Coverage vs minimum budget / revenue")
+render_chart(
+    roi_coverage_curve_chart,
+    roi_coverage_curve(df_f, min_budget=min_budget, min_revenue=min_revenue),
+    min_budget=min_budget,
+    min_revenue=min_revenue,
+)
+
 st.subheader("Top by ROI")
-top_roi = df_ok.sort_values("roi", ascending=False).head(topn).copy()
+top_roi = top_k(df_ok, "roi", topn, base=df).copy()
 
 top_roi_show = top_roi[["title", "release_year", "genres_str", "budget", "revenue", "profit", "roi", "weighted_rating", "vote_count"]].copy()
-top_roi_show["budget"] = top_roi_show["budget"].apply(money_short)
-top_roi_show["revenue"] = top_roi_show["revenue"].apply(money_short)
-top_roi_show["profit"] = top_roi_show["profit"].apply(money_short)
-top_roi_show["roi"] = top_roi_show["roi"].apply(pct2)
-top_roi_show["weighted_rating"] = top_roi_show["weighted_rating"].apply(fmt2)
+for c in ["budget", "revenue", "profit"]:
+    top_roi_show[c] = money_short_col(top_roi_show[c])
+top_roi_show["roi"] = pct2_col(top_roi_show["roi"])
+top_roi_show["weighted_rating"] = fmt2_col(top_roi_show["weighted_rating"])
 
 st.dataframe(top_roi_show, hide_index=True, use_container_width=True)
 
+st.subheader("Browse all ROI-ready titles")
+paged_table(
+    df_ok, ["title", "release_year", "genres_str", "budget", "revenue", "profit", "roi", "weighted_rating", "vote_count"],
+    key="roi_browse",
+    sort_cols=["roi", "profit", "revenue", "budget", "weighted_rating"],
+    base=df,
+    formatters={
+        "budget": money_short_col, "revenue": money_short_col, "profit": money_short_col,
+        "roi": pct2_col, "weighted_rating": fmt2_col,
+    },
+    key_from=df_f, key_extra=(min_budget, min_revenue),
+)
+
 st.subheader("Budget vs revenue (log scale)")
-st.altair_chart(roi_budget_vs_revenue(df_ok), use_container_width=True)
+render_chart(roi_budget_vs_revenue, df_ok, key_from=df_f, key_extra=(min_budget, min_revenue))
 
 st.subheader("Quality vs ROI")
-st.altair_chart(quality_vs_roi(df_ok), use_container_width=True)
+render_chart(quality_vs_roi, df_ok, key_from=df_f, key_extra=(min_budget, min_revenue))
 
+render_perf_panel("ROI")
 render_footer()
@@ -1,43 +1,340 @@
+from __future__ import annotations
+
+import argparse
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import pandas as pd
 from ETL import extract as ext
+from ETL import load as ld
+from ETL import metrics
+from ETL import state as stt
 from ETL import transform as tf
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 CURATED_DIR = PROJECT_ROOT / "DATA" / "CURATED"
 CURATED_DIR.mkdir(parents=True, exist_ok=True)
 
+# curated normalizado: filmes + financeiro (id, budget, revenue, runtime, ROI...), ligados por id
 CURATED_FILE = CURATED_DIR / "top10k_tmdb_clean_enriched.jsonl"
-CURATED_FIN_FILE = CURATED_DIR / "top10k_tmdb_financial_enriched.jsonl"
+CURATED_FINANCIALS_FILE = CURATED_DIR / "top10k_tmdb_financials.jsonl"
+
+# cubo pré-agregado (ano x gênero x faixa de votos) para KPIs e gráficos da UI
+CURATED_CUBE_FILE = CURATED_DIR / "top10k_tmdb_cube.jsonl"
+
+# store colunar (lido pela UI); os JSONL acima ficam como export
+CURATED_PARQUET = CURATED_DIR / "top10k_tmdb_clean_enriched.parquet"
+CURATED_FINANCIALS_PARQUET = CURATED_DIR / "top10k_tmdb_financials.parquet"
+CURATED_CUBE_PARQUET = CURATED_DIR / "top10k_tmdb_cube.parquet"
+
+# formato antigo (filme + financeiro repetindo todas as colunas); removido no próximo refresh
+LEGACY_FIN_FILE = CURATED_DIR / "top10k_tmdb_financial_enriched.jsonl"
 
 RAW_FILE = PROJECT_ROOT / "DATA" / "ORIGINAL" / "RAW" / "top10k_tmdb.jsonl"
 
 
-def main(limit: int = 10000, sleep_s: float = 0.15) -> None:
-    df_raw = ext.extract_tmdb_top_movies(limit=limit, out_path=RAW_FILE)
+def _save_curated(df: pd.DataFrame, jsonl_path: Path, parquet_path: Path) -> None:
+    ld.write_curated_jsonl(df, jsonl_path)
+    ld.write_curated_parquet(df, parquet_path)
+
+
+def _read_curated(path: Path) -> pd.DataFrame:
+    df = pd.read_json(path, lines=True)
+    if "release_date" in df.columns:
+        df["release_date"] = pd.to_datetime(df["release_date"], errors="coerce")
+    for c in ["id", "vote_count", "release_year"]:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+    return df
+
+
+def _print_clean_report(report: dict) -> None:
+    dropped = ", ".join(f"{k}={v}" for k, v in report["dropped"].items() if v)
+    print(
+        f"Clean: {report['rows_in']} -> {report['rows_out']} rows ({dropped or 'nothing dropped'}) | "
+        f"{report['elapsed_s']}s | frame {report['mem_in_mb']} -> {report['mem_out_mb']} MB | "
+        f"peak RSS {report['peak_rss_mb']} MB"
+    )
+
+
+def _print_run_report(report: dict) -> None:
+    http, cache = report["http"], report["cache"]
+    lat = http["latency_ms"]
+    ratio = cache["financials_hit_ratio"]
+    stages = " | ".join(f"{k} {v['elapsed_s']}s" for k, v in report["stages"].items())
+    print(
+        f"HTTP: {http['attempts']} calls ({http['retries']} retries, {http['errors']} errors) | "
+        f"{http['bytes'] / 1e6:.1f} MB | p50 {lat.get('p50', '-')} ms, p99 {lat.get('p99', '-')} ms | "
+        f"cache hit ratio {'-' if ratio is None else f'{ratio:.1%}'} | "
+        f"sleep {sum(report['sleep_s'].values()):.1f}s"
+    )
+    print(f"Stages: {stages}")
 
-    cfg = ext.fetch_tmdb_config(ext.API_KEY)
-    genre_map = ext.fetch_genre_map(ext.API_KEY, language="pt-BR")
 
-    df = tf.transform_enrich(df_raw, genre_map, cfg)
-    df = tf.transform_clean(df, drop_cols=True)
+def _stage(name: str, *, rows_in: int | None = None):
+    return metrics.current().stage(name, rows_in=rows_in)
 
-    # salva curated "base" (sem financeiro)
-    with CURATED_FILE.open("w", encoding="utf-8") as f:
-        df.to_json(f, orient="records", lines=True, force_ascii=False, date_format="iso")
+
+def _fetch_financials(movie_ids: list[int], **kwargs) -> pd.DataFrame:
+    fin_stats: dict = {}
+    with _stage("financials", rows_in=len(movie_ids)) as rec:
+        df_fin = ext.extract_movie_financials_df(
+            movie_ids,
+            api_key=ext.API_KEY,
+            language="pt-BR",
+            use_cache=True,
+            stats=fin_stats,
+            **kwargs,
+        )
+        rec["rows_out"] = len(df_fin)
+    print(
+        f"Financials: {fin_stats['ids']} ids | cache hits {fin_stats['cache_hits']} | "
+        f"fetched {fin_stats['fetched']} in {fin_stats['elapsed_s']}s ({fin_stats['fetch_rps']} req/s)"
+    )
+    return df_fin
+
+
+def _can_run_incremental(state: dict | None, now: datetime) -> bool:
+    if state is None or not CURATED_FILE.exists() or not CURATED_FINANCIALS_FILE.exists():
+        return False
+    last_run = datetime.fromisoformat(state["last_run"])
+    return now - last_run <= timedelta(days=ext.CHANGES_MAX_DAYS)
+
+
+def _refresh_full(df_raw: pd.DataFrame, cfg: dict, genre_map: dict[int, str], fin_kwargs: dict) -> None:
+    # enrich devolve um frame novo; clean pode trabalhar nele sem copiar de novo
+    clean_report: dict = {}
+    with _stage("enrich", rows_in=len(df_raw)):
+        df = tf.transform_enrich(df_raw, genre_map, cfg)
+    with _stage("clean", rows_in=len(df)) as rec:
+        df = tf.transform_clean(df, drop_cols=True, copy=False, report=clean_report)
+        rec["rows_out"] = len(df)
+    _print_clean_report(clean_report)
+
+    # salva curated "base" (sem financeiro) e o cubo agregado
+    with _stage("cube", rows_in=len(df)):
+        cube = tf.transform_cube(df)
+    with _stage("save"):
+        _save_curated(df, CURATED_FILE, CURATED_PARQUET)
+        _save_curated(cube, CURATED_CUBE_FILE, CURATED_CUBE_PARQUET)
 
     # financeiro via extract (API) + ROI via transform (manipulação)
     movie_ids = df["id"].dropna().astype(int).tolist()
-    df_fin = ext.extract_movie_financials_df(movie_ids, api_key=ext.API_KEY, language="pt-BR", sleep_s=0.15, use_cache=True)
+    df_fin = _fetch_financials(movie_ids, **fin_kwargs)
+
+    with _stage("roi", rows_in=len(df_fin)):
+        df_fin = tf.transform_financials(df_fin)
+    with _stage("save"):
+        _save_curated(df_fin, CURATED_FINANCIALS_FILE, CURATED_FINANCIALS_PARQUET)
+
+
+def _refresh_streaming(
+    limit: int,
+    cfg: dict,
+    genre_map: dict[int, str],
+    fin_kwargs: dict,
+    extract_kwargs: dict,
+    chunk_size: int,
+    marks: stt.StateWriter,
+) -> None:
+    """
+    Duas passadas com memória limitada por `chunk_size`:
+    1) páginas do discover vão direto para o JSONL bruto (e os watermarks para `marks`),
+       acumulando a média de vote_average (C);
+    2) o bruto é relido em chunks -> enrich(C) -> clean -> financeiro/ROI, anexando aos curated
+       (o cubo é aditivo: cada chunk é somado ao cubo corrente).
+    """
+    C_acc = tf.RunningMean()
+    with _stage("extract") as rec:
+        for page in ext.iter_tmdb_top_movies(limit=limit, out_path=RAW_FILE, **extract_kwargs):
+            C_acc.update(m.get("vote_average") for m in page)
+            # direto dos lotes do extract: reler o JSONL sem precise_float muda o float de popularity
+            marks.add((m.get("id"), m.get("vote_count"), m.get("popularity")) for m in page)
+            rec["rows_out"] = rec.get("rows_out", 0) + len(page)
+
+    cube = tf.RunningCube()
+    # ExitStack em vez do `with (...)` com parênteses, que só existe a partir do Python 3.10
+    with ExitStack() as stack:
+        f_cur = stack.enter_context(CURATED_FILE.open("w", encoding="utf-8"))
+        f_fin = stack.enter_context(CURATED_FINANCIALS_FILE.open("w", encoding="utf-8"))
+        pq_cur = stack.enter_context(ld.CuratedParquetWriter(CURATED_PARQUET))
+        pq_fin = stack.enter_context(ld.CuratedParquetWriter(CURATED_FINANCIALS_PARQUET))
+        for chunk in pd.read_json(RAW_FILE, lines=True, chunksize=chunk_size, dtype=False, precise_float=True):
+            with _stage("enrich", rows_in=len(chunk)):
+                df = tf.transform_enrich(chunk, genre_map, cfg, C=C_acc.mean)
+            with _stage("clean", rows_in=len(df)) as rec:
+                df = tf.transform_clean(df, drop_cols=True, copy=False)
+                rec["rows_out"] = len(df)
+            with _stage("save"):
+                df.to_json(f_cur, orient="records", lines=True, force_ascii=False, date_format="iso")
+                pq_cur.write(df)
+            with _stage("cube", rows_in=len(df)):
+                cube.update(df)
 
-    df_fin_curated = tf.transform_add_roi(df, df_fin)
+            df_fin = _fetch_financials(df["id"].dropna().astype(int).tolist(), **fin_kwargs)
+            with _stage("roi", rows_in=len(df_fin)):
+                df_fin = tf.transform_financials(df_fin)
+            with _stage("save"):
+                df_fin.to_json(f_fin, orient="records", lines=True, force_ascii=False, date_format="iso")
+                pq_fin.write(df_fin)
 
-    with CURATED_FIN_FILE.open("w", encoding="utf-8") as f:
-        df_fin_curated.to_json(f, orient="records", lines=True, force_ascii=False, date_format="iso")
+    if cube.cube is not None:
+        with _stage("save"):
+            _save_curated(cube.cube, CURATED_CUBE_FILE, CURATED_CUBE_PARQUET)
+
+
+def _refresh_incremental(
+    df_raw: pd.DataFrame,
+    cfg: dict,
+    genre_map: dict[int, str],
+    fin_kwargs: dict,
+    state: dict,
+) -> None:
+    # novos / vote_count ou popularity diferentes do watermark / editados no TMDB desde o último run
+    since = datetime.fromisoformat(state["last_run"]).date().isoformat()
+    current_ids = set(df_raw["id"].astype(int))
+    new_ids, changed_ids = stt.diff_watermarks(df_raw, state)
+    with _stage("changes"):
+        edited_ids = ext.fetch_changed_movie_ids(ext.API_KEY, start_date=since) & current_ids
+    affected = new_ids | changed_ids | edited_ids
+    print(
+        f"Incremental since {since}: {len(new_ids)} new | {len(changed_ids)} changed | "
+        f"{len(edited_ids)} edited | {len(affected)}/{len(current_ids)} rows to upsert"
+    )
+
+    keep_ids = df_raw["id"].astype(int).tolist()
+    C = pd.to_numeric(df_raw["vote_average"], errors="coerce").mean()
+
+    df_upd = df_raw[df_raw["id"].isin(affected)]
+    with _stage("enrich", rows_in=len(df_upd)):
+        df_upd = tf.transform_enrich(df_upd, genre_map, cfg, C=C)
+    with _stage("clean", rows_in=len(df_upd)) as rec:
+        df_upd = tf.transform_clean(df_upd, drop_cols=True, copy=False)
+        rec["rows_out"] = len(df_upd)
+
+    with _stage("upsert", rows_in=len(df_upd)) as rec:
+        df = tf.transform_upsert(_read_curated(CURATED_FILE), df_upd, keep_ids=keep_ids)
+        df = tf.recompute_weighted_rating(df, C)
+        rec["rows_out"] = len(df)
+    with _stage("cube", rows_in=len(df)):
+        cube = tf.transform_cube(df)
+    with _stage("save"):
+        _save_curated(df, CURATED_FILE, CURATED_PARQUET)
+        _save_curated(cube, CURATED_CUBE_FILE, CURATED_CUBE_PARQUET)
+
+    # budget/revenue só mudam quando o filme é editado: rebusca esses, o resto sai do cache
+    if edited_ids - new_ids:
+        _fetch_financials(sorted(edited_ids - new_ids), **{**fin_kwargs, "cache_max_age_s": 0})
+    df_fin = _fetch_financials(df_upd["id"].astype(int).tolist(), **fin_kwargs)
+
+    with _stage("roi", rows_in=len(df_fin)):
+        df_fin = tf.transform_financials(df_fin)
+    with _stage("upsert", rows_in=len(df_fin)):
+        df_fin_curated = tf.transform_upsert(
+            _read_curated(CURATED_FINANCIALS_FILE),
+            df_fin,
+            keep_ids=df["id"].astype(int).tolist(),
+        )
+        # arquivos antigos ainda sem a flag: recalcula para todas as linhas
+        df_fin_curated = tf.add_roi_ready(df_fin_curated)
+    with _stage("save"):
+        _save_curated(df_fin_curated, CURATED_FINANCIALS_FILE, CURATED_FINANCIALS_PARQUET)
+
+
+def main(
+    limit: int = 10000,
+    sleep_s: float = 0.15,
+    workers: int = 8,
+    rate_per_s: float = 20.0,
+    cache_max_age_days: float | None = None,
+    incremental: bool = False,
+    streaming: bool = False,
+    chunk_size: int = 5000,
+    report_path: Path | str | None = None,
+) -> dict:
+    """
+    incremental=True reaproveita os curated existentes: só transforma/atualiza as linhas
+    novas ou alteradas desde o último run (watermarks em DATA/STATE) e só rebusca detalhes
+    financeiros dos filmes novos ou editados (/movie/changes). Sem estado válido (primeiro
+    run, curated ausente, último run há mais de 14 dias) cai no refresh completo.
+
+    streaming=True processa o catálogo em chunks de `chunk_size` linhas (memória constante,
+    independente de `limit`); não combina com incremental.
+
+    Ao final grava o relatório do run (JSON, ETL/metrics.py) em `report_path`
+    (default: DATA/REPORTS/refresh_<UTC>.json) e o devolve: chamadas HTTP por rota,
+    latência p50/p90/p99, bytes, retries, hit ratio do cache, sleeps e duração por etapa.
+    """
+    if streaming and incremental:
+        raise ValueError("streaming e incremental são modos exclusivos")
+
+    ext.configure_client(pool_size=max(10, workers))
+    run_at = datetime.now(timezone.utc)
+    run_metrics = metrics.start_run()
+    fin_kwargs = {
+        "sleep_s": sleep_s,
+        "max_workers": workers,
+        "rate_per_s": rate_per_s,
+        "cache_max_age_s": cache_max_age_days * 86400 if cache_max_age_days is not None else None,
+    }
+    extract_kwargs = {"max_workers": workers, "rate_per_s": rate_per_s}
+
+    with _stage("config"):
+        cfg = ext.fetch_tmdb_config(ext.API_KEY)
+        genre_map = ext.fetch_genre_map(ext.API_KEY, language="pt-BR")
+
+    mode = "streaming" if streaming else "full"
+    if streaming:
+        with stt.StateWriter(run_at=run_at) as marks:
+            _refresh_streaming(limit, cfg, genre_map, fin_kwargs, extract_kwargs, chunk_size, marks)
+            with _stage("state"):
+                marks.commit()
+    else:
+        with _stage("extract") as rec:
+            df_raw = ext.extract_tmdb_top_movies(limit=limit, out_path=RAW_FILE, **extract_kwargs)
+            rec["rows_out"] = len(df_raw)
+
+        state = stt.load_state() if incremental else None
+        if incremental and _can_run_incremental(state, run_at):
+            mode = "incremental"
+            _refresh_incremental(df_raw, cfg, genre_map, fin_kwargs, state)
+        else:
+            _refresh_full(df_raw, cfg, genre_map, fin_kwargs)
+
+        with _stage("state"):
+            stt.save_state(df_raw, run_at=run_at)
+
+    LEGACY_FIN_FILE.unlink(missing_ok=True)
 
     print(f"Saved: {CURATED_FILE}")
-    print(f"Saved: {CURATED_FIN_FILE}")
+    print(f"Saved: {CURATED_FINANCIALS_FILE}")
+    print(f"Saved: {CURATED_CUBE_FILE}")
+
+    run_metrics.info.update(
+        mode=mode, limit=limit, workers=workers, rate_per_s=rate_per_s, sleep_s=sleep_s, chunk_size=chunk_size,
+    )
+    report_path = Path(report_path) if report_path else metrics.report_path(run_at)
+    report = run_metrics.write(report_path)
+    _print_run_report(report)
+    print(f"Saved: {report_path}")
+    return report
+
+
+def cli(argv: list[str] | None = None) -> dict:
+    ap = argparse.ArgumentParser(description="Refresh do catálogo TMDB: extract -> transform -> curated.")
+    ap.add_argument("--mode", choices=["full", "incremental", "streaming"], default="full",
+                    help="incremental: só linhas novas/alteradas desde o último run (sem estado válido, faz o full); "
+                         "streaming: em chunks, com memória constante")
+    ap.add_argument("--limit", type=int, default=1000, help="quantos filmes do topo do discover")
+    ap.add_argument("--chunk-size", type=int, default=5000, help="linhas por chunk no modo streaming")
+    args = ap.parse_args(argv)
+    return main(
+        limit=args.limit,
+        incremental=args.mode == "incremental",
+        streaming=args.mode == "streaming",
+        chunk_size=args.chunk_size,
+    )
 
 
 if __name__ == "__main__":
-    main(limit=1000)
+    cli()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# o extract exige API_KEY já no import
+os.environ.setdefault("API_KEY", "test-key")
+
+from ETL import client, extract as ext, metrics  # noqa: E402
+
+
+GENRES = {18: "Drama", 28: "Ação", 35: "Comédia", 878: "Ficção científica"}
+
+
+def make_movies(n: int, first_year: int = 1950) -> list[dict]:
+    """Filmes com vote_average distinto e decrescente, um ano por filme (ciclando a cada 75)."""
+    genre_ids = list(GENRES)
+    return [
+        {
+            "id": 1000 + i,
+            "title": f"Movie {i}",
+            "original_title": f"Filme {i}",
+            "original_language": "en" if i % 3 else "pt",
+            "overview": f"Sinopse do filme {i}",
+            "genre_ids": genre_ids[i % 4: i % 4 + 1 + i % 2],
+            "poster_path": f"/p{i}.jpg",
+            "backdrop_path": f"/b{i}.jpg" if i % 5 else None,
+            "vote_average": round(9.9 - i * 0.01, 2),
+            "vote_count": 5000 + i,
+            "popularity": 10.0 + i / 7,
+            "release_date": f"{first_year + i % 75}-06-01",
+        }
+        for i in range(n)
+    ]
+
+
+class StubTMDB:
+    """
+    Servidor TMDB local (http.server numa thread) com as rotas usadas pelo extract:
+    /discover/movie paginado de 20 em 20 (com filtro de primary_release_date e ordem por
+    vote_average), /movie/<id>, /movie/changes, /configuration e /genre/movie/list. Registra cada requisição em `calls`.
+    `script(path, ...)` enfileira respostas (status, headers, atraso) servidas antes das normais.
+    """
+
+    def __init__(self, movies: list[dict], page_delay_s: float = 0.0):
+        self.movies = movies
+        self.page_delay_s = page_delay_s
+        self.calls: list[tuple[float, str, dict]] = []
+        self._scripted: dict[str, list[tuple[int, dict, float]]] = {}
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub._handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/3"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def script(self, path: str, *responses: tuple) -> None:
+        """Próximas respostas de `path`: (status,), (status, headers) ou (status, headers, atraso_s)."""
+        with self._lock:
+            self._scripted.setdefault(path, []).extend(
+                (r[0], r[1] if len(r) > 1 else {}, r[2] if len(r) > 2 else 0.0) for r in responses
+            )
+
+    def count(self, path_re: str) -> int:
+        with self._lock:
+            return sum(1 for _, path, _ in self.calls if re.fullmatch(path_re, path))
+
+    def _discover(self, q: dict) -> dict:
+        ms = self.movies
+        if "primary_release_date.gte" in q:
+            lo, hi = q["primary_release_date.gte"], q["primary_release_date.lte"]
+            ms = [m for m in ms if lo <= m["release_date"] <= hi]
+        ms = sorted(ms, key=lambda m: -m["vote_average"])
+        page = int(q.get("page", 1))
+        if self.page_delay_s:
+            # páginas baixas demoram mais: as respostas chegam fora de ordem
+            time.sleep(self.page_delay_s / page)
+        return {
+            "page": page,
+            "results": ms[(page - 1) * 20: page * 20],
+            "total_pages": -(-len(ms) // 20),
+            "total_results": len(ms),
+        }
+
+    def _respond(self, h: BaseHTTPRequestHandler, status: int, body: dict | None = None, headers: dict | None = None) -> None:
+        data = json.dumps(body or {}).encode()
+        h.send_response(status)
+        h.send_header("Content-Type", "application/json")
+        h.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            h.send_header(k, v)
+        h.end_headers()
+        h.wfile.write(data)
+
+    def _handle(self, h: BaseHTTPRequestHandler) -> None:
+        u = urlparse(h.path)
+        q = {k: v[0] for k, v in parse_qs(u.query).items()}
+        path = u.path[len("/3"):]
+        with self._lock:
+            self.calls.append((time.monotonic(), path, q))
+            queue = self._scripted.get(path)
+            scripted = queue.pop(0) if queue else None
+
+        if scripted is not None:
+            status, headers, delay_s = scripted
+            time.sleep(delay_s)
+            if status != 200:
+                return self._respond(h, status, {"status_message": "scripted"}, headers)
+
+        if path == "/discover/movie":
+            return self._respond(h, 200, self._discover(q))
+        if path == "/movie/changes":
+            return self._respond(h, 200, {"results": [], "page": 1, "total_pages": 1})
+        if path == "/configuration":
+            images = {"secure_base_url": "https://image.tmdb.org/t/p/", "poster_sizes": ["w92", "w342"], "backdrop_sizes": ["w780"]}
+            return self._respond(h, 200, {"images": images})
+        if path == "/genre/movie/list":
+            return self._respond(h, 200, {"genres": [{"id": k, "name": v} for k, v in GENRES.items()]})
+        found = re.fullmatch(r"/movie/(\d+)", path)
+        if found and int(found.group(1)) < 10**6:
+            mid = int(found.group(1))
+            return self._respond(h, 200, {"id": mid, "budget": mid * 1000, "revenue": mid * 3000, "runtime": 90 + mid % 60})
+        self._respond(h, 404, {"status_message": "not found"})
+
+
+@pytest.fixture
+def fresh_client():
+    """Client compartilhado novo, com backoff curto, e coletor de métricas zerado."""
+    metrics.start_run()
+    c = client.configure_client(pool_size=8, timeout=5, backoff_base_s=0.001, backoff_max_s=0.01)
+    yield c
+    client.configure_client()
+
+
+@pytest.fixture
+def stub():
+    """Só o servidor, para testar o client direto."""
+    s = StubTMDB(make_movies(20))
+    yield s
+    s.close()
+
+
+@pytest.fixture
+def tmdb_stub(monkeypatch, tmp_path, fresh_client):
+    """Stub com 95 filmes; o extract aponta para ele e o cache antigo (diretório) fica em tmp_path."""
+    stub = StubTMDB(make_movies(95))
+    monkeypatch.setattr(ext, "DISCOVER_URL", f"{stub.base_url}/discover/movie")
+    monkeypatch.setattr(ext, "MOVIE_DETAIL_URL", stub.base_url + "/movie/{}")
+    monkeypatch.setattr(ext, "CHANGES_URL", f"{stub.base_url}/movie/changes")
+    monkeypatch.setattr(ext, "CONFIG_URL", f"{stub.base_url}/configuration")
+    monkeypatch.setattr(ext, "GENRE_URL", f"{stub.base_url}/genre/movie/list")
+    monkeypatch.setattr(ext, "CACHE_DIR", tmp_path / "legacy_cache")
+    yield stub
+    stub.close()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import pytest
+import requests
+
+from ETL import extract as ext
+from ETL.cache import FinancialsCache
+
+
+def _row(mid: int, budget: int = 1) -> dict:
+    return {"id": mid, "budget": budget, "revenue": 2 * budget, "runtime": 100}
+
+
+def _legacy_dir(tmp_path, rows: list[dict], mtime: float | None = None):
+    d = tmp_path / "tmdb_movie_financials"
+    d.mkdir()
+    for r in rows:
+        p = d / f"{r['id']}.json"
+        p.write_text(json.dumps(r), encoding="utf-8")
+        if mtime is not None:
+            os.utime(p, (mtime, mtime))
+    return d
+
+
+def test_get_many_skips_entries_older_than_max_age(tmp_path):
+    now = time.time()
+    with FinancialsCache(tmp_path / "c.sqlite") as cache:
+        cache.put_many([_row(1), _row(2)], "pt-BR", fetched_at=now - 3600)
+        cache.put_many([_row(3)], "pt-BR", fetched_at=now)
+
+        assert set(cache.get_many([1, 2, 3], "pt-BR")) == {1, 2, 3}
+        assert set(cache.get_many([1, 2, 3], "pt-BR", max_age_s=7200)) == {1, 2, 3}
+        assert set(cache.get_many([1, 2, 3], "pt-BR", max_age_s=60)) == {3}
+        assert cache.get_many([1, 2, 3], "en-US") == {}
+        assert cache.get_many([], "pt-BR") == {}
+
+        # regravar renova o fetched_at
+        cache.put_many([_row(1, budget=5)], "pt-BR")
+        assert cache.get_many([1], "pt-BR", max_age_s=60) == {1: _row(1, budget=5)}
+
+
+def test_migrate_from_dir_imports_once_with_file_mtime(tmp_path):
+    old = time.time() - 10 * 86400
+    legacy = _legacy_dir(tmp_path, [_row(1), _row(2), _row(3)], mtime=old)
+    (legacy / "broken.json").write_text("{not json", encoding="utf-8")
+
+    with FinancialsCache(tmp_path / "c.sqlite") as cache:
+        assert cache.migrate_from_dir(legacy, language="pt-BR") == 3
+        assert cache.get_many([1, 2, 3], "pt-BR") == {i: _row(i) for i in (1, 2, 3)}
+        # fetched_at = mtime do arquivo antigo: expira como qualquer entrada de 10 dias
+        assert cache.get_many([1, 2, 3], "pt-BR", max_age_s=86400) == {}
+        assert set(cache.get_many([1, 2, 3], "pt-BR", max_age_s=30 * 86400)) == {1, 2, 3}
+
+        # só uma vez: arquivos novos no diretório antigo não são mais lidos
+        (legacy / "4.json").write_text(json.dumps(_row(4)), encoding="utf-8")
+        assert cache.migrate_from_dir(legacy, language="pt-BR") == 0
+        assert cache.get_many([4], "pt-BR") == {}
+
+    # o marcador fica no próprio SQLite
+    with FinancialsCache(tmp_path / "c.sqlite") as cache:
+        assert cache.migrate_from_dir(legacy, language="pt-BR") == 0
+
+
+def test_migrate_from_dir_keeps_newer_sqlite_entries(tmp_path):
+    legacy = _legacy_dir(tmp_path, [_row(1, budget=10), _row(2, budget=20)])
+    with FinancialsCache(tmp_path / "c.sqlite") as cache:
+        cache.put_many([_row(1, budget=99)], "pt-BR")
+        cache.migrate_from_dir(legacy, language="pt-BR")
+        assert cache.get_many([1, 2], "pt-BR") == {1: _row(1, budget=99), 2: _row(2, budget=20)}
+
+
+def test_migrate_from_missing_dir_is_a_noop(tmp_path):
+    with FinancialsCache(tmp_path / "c.sqlite") as cache:
+        assert cache.migrate_from_dir(tmp_path / "nope") == 0
+
+
+def test_extract_refetches_expired_entries(tmdb_stub, tmp_path):
+    path = tmp_path / "c.sqlite"
+    with FinancialsCache(path) as cache:
+        cache.put_many([_row(1001)], "pt-BR", fetched_at=time.time() - 3600)
+        cache.put_many([_row(1002)], "pt-BR")
+
+    stats: dict = {}
+    df = ext.extract_movie_financials_df(
+        [1001, 1002], "k", sleep_s=0, cache_path=path, cache_max_age_s=60, stats=stats,
+    )
+    assert stats["cache_hits"] == 1 and stats["fetched"] == 1
+    assert tmdb_stub.count(r"/movie/1001") == 1 and tmdb_stub.count(r"/movie/1002") == 0
+    assert df.set_index("id")["budget"].to_dict() == {1001: 1001 * 1000, 1002: 1}
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_extract_flushes_fetched_rows_when_a_call_fails(tmdb_stub, tmp_path, workers):
+    path = tmp_path / "c.sqlite"
+    # 9999999 dá 404 no stub: o extract falha, mas o que já veio fica no cache
+    ids = [1001, 1002, 1003, 9999999]
+    with pytest.raises(requests.HTTPError):
+        ext.extract_movie_financials_df(ids, "k", sleep_s=0, max_workers=workers, rate_per_s=1000, cache_path=path)
+
+    with FinancialsCache(path) as cache:
+        assert set(cache.get_many(ids, "pt-BR")) == {1001, 1002, 1003}
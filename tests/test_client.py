@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+
+import pytest
+import requests
+
+from ETL import metrics
+from ETL.client import CircuitOpenError, TMDBClient, _retry_after_s
+
+PATH = "/movie/1001"
+
+
+def _client(**kwargs) -> TMDBClient:
+    opts = dict(pool_size=4, timeout=5, max_retries=3, backoff_base_s=0.001, backoff_max_s=1.0,
+                breaker_threshold=2, breaker_cooldown_s=0.2)
+    return TMDBClient(**{**opts, **kwargs})
+
+
+@pytest.fixture
+def run():
+    return metrics.start_run()
+
+
+def test_retries_5xx_and_429_then_succeeds(stub, run):
+    stub.script(PATH, (503,), (429,), (500,))
+    c = _client()
+
+    assert c.get_json(stub.base_url + PATH)["id"] == 1001
+    assert stub.count(PATH) == 4
+    http = run.report()["http"]["by_endpoint"]["movie/{id}"]
+    assert http["attempts"] == 4 and http["retries"] == 3
+    assert http["status"] == {"200": 1, "429": 1, "500": 1, "503": 1}
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.script(PATH, *[(502,)] * 3)
+    c = _client(max_retries=2, breaker_threshold=5)
+
+    with pytest.raises(requests.HTTPError):
+        c.get(stub.base_url + PATH)
+    assert stub.count(PATH) == 3
+    assert c._failures == 1
+
+
+def test_retry_after_seconds_is_honoured(stub, run):
+    stub.script(PATH, (429, {"Retry-After": "0.3"}))
+    c = _client()
+
+    t0 = time.monotonic()
+    c.get(stub.base_url + PATH)
+    assert time.monotonic() - t0 >= 0.3
+    assert run.report()["sleep_s"]["retry_backoff"] == pytest.approx(0.3, abs=0.01)
+
+
+def test_retry_after_is_capped_by_backoff_max(stub):
+    stub.script(PATH, (503, {"Retry-After": "120"}))
+    c = _client(backoff_max_s=0.05)
+
+    t0 = time.monotonic()
+    c.get(stub.base_url + PATH)
+    assert time.monotonic() - t0 < 1.0
+
+
+def test_retry_after_http_date():
+    resp = requests.Response()
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    resp.headers["Retry-After"] = format_datetime(when, usegmt=True)
+    assert 28 <= _retry_after_s(resp) <= 30
+
+    resp.headers["Retry-After"] = "not a date"
+    assert _retry_after_s(resp) is None
+
+
+def test_client_errors_are_not_retried_nor_counted(stub):
+    c = _client()
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            c.get(stub.base_url + "/movie/9999999")
+    assert stub.count(r"/movie/9999999") == 3
+    assert c._failures == 0 and c._opened_at is None
+
+
+def test_breaker_opens_then_probe_closes_it(stub):
+    stub.script(PATH, (500,), (500,))
+    c = _client(max_retries=0)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            c.get(stub.base_url + PATH)
+    # aberto: falha na hora, sem ir ao servidor
+    with pytest.raises(CircuitOpenError):
+        c.get(stub.base_url + PATH)
+    assert stub.count(PATH) == 2
+
+    time.sleep(0.25)
+    assert c.get_json(stub.base_url + PATH)["id"] == 1001
+    assert c._opened_at is None and c._failures == 0
+    c.get(stub.base_url + PATH)
+    assert stub.count(PATH) == 4
+
+
+def test_failed_probe_reopens_the_breaker(stub):
+    stub.script(PATH, (500,), (500,), (503,))
+    c = _client(max_retries=0)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            c.get(stub.base_url + PATH)
+    time.sleep(0.25)
+
+    with pytest.raises(requests.HTTPError):
+        c.get(stub.base_url + PATH)
+    # uma falha da chamada de teste basta para reabrir, com novo cooldown
+    with pytest.raises(CircuitOpenError):
+        c.get(stub.base_url + PATH)
+    assert stub.count(PATH) == 3
+
+
+def test_half_open_lets_a_single_probe_through(stub):
+    stub.script(PATH, (500,), (500,), (200, {}, 0.3))
+    c = _client(max_retries=0)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            c.get(stub.base_url + PATH)
+    time.sleep(0.25)
+
+    results: list = []
+    probe = threading.Thread(target=lambda: results.append(c.get_json(stub.base_url + PATH)))
+    probe.start()
+    time.sleep(0.1)
+
+    # com a chamada de teste em voo, as demais continuam recebendo CircuitOpenError
+    errors = []
+    for _ in range(5):
+        try:
+            c.get(stub.base_url + PATH)
+        except CircuitOpenError as e:
+            errors.append(e)
+    assert len(errors) == 5
+    assert stub.count(PATH) == 3
+
+    probe.join()
+    assert results[0]["id"] == 1001
+    c.get(stub.base_url + PATH)
+    assert stub.count(PATH) == 4
+
+
+def test_probe_ending_in_unexpected_error_reopens(stub, monkeypatch):
+    stub.script(PATH, (500,), (500,))
+    c = _client(max_retries=0)
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            c.get(stub.base_url + PATH)
+    time.sleep(0.25)
+
+    def boom(*args, **kwargs):
+        raise requests.exceptions.InvalidURL("boom")
+
+    monkeypatch.setattr(c.session, "get", boom)
+    with pytest.raises(requests.exceptions.InvalidURL):
+        c.get(stub.base_url + PATH)
+    assert not c._probe_in_flight
+    with pytest.raises(CircuitOpenError):
+        c.get(stub.base_url + PATH)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from BENCH.synthetic import synthetic_curated
+from ETL import transform as tf
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "UI"))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+from components import cube as cb  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def curated() -> pd.DataFrame:
+    """Curated sintético com filmes sem ano, sem gênero e com nulos nas medidas."""
+    df = synthetic_curated(4000, seed=21).reset_index(drop=True)
+    df.loc[0:30, "release_year"] = pd.NA
+    df.at[31, "genres_names"] = []
+    df.loc[40:80, "popularity"] = np.nan
+    df.loc[100:104, "vote_count"] = [499, 500, 0, 2000, 2001]
+    return df
+
+
+def _rows(df, year_range=None, min_votes=0, genre_q=""):
+    """Recorte por máscaras do pandas (a regra de apply_common_filters)."""
+    ok = df["vote_count"].fillna(0) >= min_votes
+    if year_range is not None:
+        ok &= df["release_year"].between(*year_range).fillna(False)
+    if genre_q.strip():
+        ok &= df["genres_str"].str.contains(genre_q.strip(), case=False, na=False, regex=False)
+    return df[ok.to_numpy(dtype=bool)]
+
+
+FILTERS = [
+    (None, 0, ""),
+    ((1900, 2030), 0, ""),
+    ((1990, 2010), 2000, ""),
+    ((1990, 2010), 2000, "drama"),
+    ((1950, 2024), 5000, "Terror"),
+    ((2030, 2040), 0, ""),
+]
+
+
+@pytest.mark.parametrize("args", FILTERS)
+def test_totals_match_row_aggregates(curated, args):
+    tot = cb.cube_totals(tf.transform_cube(curated), *args)
+    rows = _rows(curated, *args)
+    assert tot["n"] == len(rows)
+    for c in tf.CUBE_MEASURES:
+        v = pd.to_numeric(rows[c], errors="coerce").astype(float)
+        assert tot[f"{c}_n"] == v.notna().sum()
+        if v.notna().any():
+            assert tot[f"avg_{c}"] == pytest.approx(v.mean(), rel=1e-9)
+            assert tot[f"std_{c}"] == pytest.approx(v.std(ddof=0), rel=1e-6, abs=1e-9)
+        else:
+            assert np.isnan(tot[f"avg_{c}"])
+
+
+@pytest.mark.parametrize("args", FILTERS)
+def test_titles_per_year_matches_groupby(curated, args):
+    out = cb.cube_titles_per_year(tf.transform_cube(curated), *args)
+    ref = (
+        _rows(curated, *args).dropna(subset=["release_year"])
+            .groupby("release_year").size()
+            .reset_index(name="movies")
+            .sort_values("release_year")
+    )
+    assert out["release_year"].tolist() == ref["release_year"].tolist()
+    assert out["movies"].tolist() == ref["movies"].tolist()
+
+
+def test_genre_mix_matches_explode_groupby(curated):
+    cube = tf.transform_cube(curated)
+    for args in [((1900, 2030), 0), ((1990, 2010), 2000)]:
+        rows = _rows(curated, *args)
+        ref = (
+            rows.explode("genres_names").dropna(subset=["genres_names", "weighted_rating"])
+                .groupby("genres_names")
+                .agg(movies=("id", "count"), avg_wr=("weighted_rating", "mean"),
+                     avg_votes=("vote_count", "mean"), avg_popularity=("popularity", "mean"))
+                .reset_index()
+        )
+        out = cb.cube_genre_mix(cube, *args)
+        assert out["genre"].tolist() == ref["genres_names"].tolist()
+        assert out["movies"].tolist() == ref["movies"].tolist()
+        # popularity com nulos: a média do cubo ignora os nulos, como o groupby
+        for c in ["avg_wr", "avg_votes", "avg_popularity"]:
+            np.testing.assert_allclose(out[c].to_numpy(), ref[c].to_numpy(dtype=float), rtol=1e-9)
+
+
+def test_filters_the_cube_cannot_express(curated):
+    cube = tf.transform_cube(curated)
+    assert cb.cube_totals(cube, (1990, 2010), 2001) is None  # fora do limite de faixa
+    assert cb.cube_totals(cube, (1990, 2010), 0, "", "amor") is None
+    assert cb.cube_totals(cube, (1990, 2010), 0, "", "", "amor") is None
+    assert cb.cube_totals(cube, (1990, 2010), 0, "ção") is None  # casa com mais de um gênero
+    assert cb.cube_totals(None) is None
+
+    # sem weighted_rating em algum filme do recorte, a Genre Mix volta para as linhas
+    with_null = curated.copy()
+    with_null.loc[5, "weighted_rating"] = np.nan
+    assert cb.cube_genre_mix(tf.transform_cube(with_null), None, 0) is None
+
+
+def test_chunked_and_empty_cubes(curated, monkeypatch):
+    cube = tf.transform_cube(curated)
+    chunks = [tf.transform_cube(curated.iloc[i:i + 700]) for i in range(0, len(curated), 700)]
+    pd.testing.assert_frame_equal(tf.combine_cubes(chunks), cube)
+
+    empty = tf.transform_cube(curated.iloc[:0])
+    assert empty.empty and cb.cube_totals(empty)["n"] == 0
+
+    # cubo de outro curated (nº de filmes diferente) é ignorado
+    monkeypatch.setattr(cb, "load_cube", lambda: cube)
+    assert cb.get_cube(curated) is cube
+    assert cb.get_cube(curated.iloc[1:]) is None
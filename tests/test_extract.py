@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from ETL import extract as ext
+from conftest import make_movies
+
+
+def _ids(movies) -> list[int]:
+    return [m["id"] for m in movies]
+
+
+def _expected_top(movies: list[dict], limit: int) -> list[int]:
+    out, seen = [], set()
+    for m in sorted(movies, key=lambda m: -m["vote_average"]):
+        if m["id"] not in seen:
+            seen.add(m["id"])
+            out.append(m["id"])
+    return out[:limit]
+
+
+def test_discover_keeps_page_order_with_parallel_workers(tmdb_stub, tmp_path):
+    tmdb_stub.page_delay_s = 0.05
+    df = ext.extract_tmdb_top_movies(limit=90, out_path=tmp_path / "raw.jsonl", max_workers=4)
+
+    assert df["id"].tolist() == _expected_top(tmdb_stub.movies, 90)
+    assert tmdb_stub.count("/discover/movie") == 5
+    assert pd.read_json(tmp_path / "raw.jsonl", lines=True)["id"].tolist() == df["id"].tolist()
+
+
+def test_discover_dedups_ids_repeated_across_pages(tmdb_stub, tmp_path):
+    # o TMDB pode repetir um filme na virada de página quando a ordem muda entre as chamadas
+    movies = make_movies(95)
+    movies.insert(20, dict(movies[19]))
+    tmdb_stub.movies = movies
+
+    df = ext.extract_tmdb_top_movies(limit=60, out_path=tmp_path / "raw.jsonl", max_workers=4)
+
+    # as páginas buscadas são as mesmas (3); a repetida só aparece uma vez
+    assert df["id"].is_unique
+    assert df["id"].tolist() == _expected_top(movies[:60], 60)
+    assert len(df) == 59
+
+
+def test_discover_limit_is_respected(tmdb_stub, tmp_path):
+    df = ext.extract_tmdb_top_movies(limit=33, out_path=tmp_path / "raw.jsonl", max_workers=2)
+    assert df["id"].tolist() == _expected_top(tmdb_stub.movies, 33)
+    assert tmdb_stub.count("/discover/movie") == 2
+
+
+def test_sharded_discover_returns_global_top(tmdb_stub, tmp_path, monkeypatch):
+    # com no máximo 2 páginas por consulta, 90 filmes exigem divisão por ano
+    monkeypatch.setattr(ext, "DISCOVER_PAGE_CAP", 2)
+    expected = _expected_top(tmdb_stub.movies, 70)
+
+    df = ext.extract_tmdb_top_movies(limit=70, out_path=tmp_path / "raw.jsonl", max_workers=4)
+    assert df["id"].tolist() == expected
+    assert any("primary_release_date.gte" in q for _, _, q in tmdb_stub.calls)
+
+    batches = list(ext.iter_tmdb_top_movies(limit=70, out_path=tmp_path / "stream.jsonl", max_workers=4))
+    assert [m["id"] for b in batches for m in b] == expected
+
+
+def test_sharded_streaming_merges_spilled_shards_like_batch(tmdb_stub, tmp_path, monkeypatch):
+    # notas com empate entre anos: no lote e no merge, empates saem na ordem das faixas
+    movies = make_movies(95)
+    for m in movies:
+        m["vote_average"] = round(m["vote_average"], 1)
+    tmdb_stub.movies = movies
+    monkeypatch.setattr(ext, "DISCOVER_PAGE_CAP", 2)
+
+    batch = ext.extract_tmdb_top_movies(limit=70, out_path=tmp_path / "raw.jsonl", max_workers=4)
+    pages = list(ext.iter_tmdb_top_movies(limit=70, out_path=tmp_path / "stream.jsonl", max_workers=4))
+
+    assert [len(p) for p in pages] == [20, 20, 20, 10]
+    assert [m["id"] for p in pages for m in p] == batch["id"].tolist()
+    assert (tmp_path / "stream.jsonl").read_text(encoding="utf-8") == (tmp_path / "raw.jsonl").read_text(encoding="utf-8")
+    # os arquivos temporários das faixas somem no fim
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name != "legacy_cache") == ["raw.jsonl", "stream.jsonl"]
+
+
+def test_spill_shards_dedups_and_sorts_an_unsorted_shard(tmp_path):
+    def m(mid: int, vote: float) -> dict:
+        return {"id": mid, "vote_average": vote}
+
+    pages = iter([
+        ((0, 1), [m(1, 9.0), m(2, 8.0)]),
+        ((0, 2), [m(2, 8.0), m(3, 7.0)]),
+        ((1, 1), [m(4, 6.0), m(5, 8.5), m(1, 9.0)]),
+        ((1, 2), [m(6, 8.5)]),
+    ])
+    seen: set[int] = set()
+    paths = ext._spill_shards(pages, tmp_path, seen, ext._sort_key("vote_average.desc"))
+
+    assert [[x["id"] for x in ext._read_jsonl(p)] for p in paths] == [[1, 2, 3], [5, 6, 4]]
+    assert seen == {1, 2, 3, 4, 5, 6}
+
+
+def test_discover_with_every_year_shard_empty_returns_empty_frame(tmdb_stub, tmp_path, monkeypatch):
+    # a consulta sem faixa passa do limite de páginas, mas nenhuma faixa de ano tem filmes
+    tmdb_stub.movies = make_movies(95, first_year=2200)
+    monkeypatch.setattr(ext, "DISCOVER_PAGE_CAP", 2)
+
+    df = ext.extract_tmdb_top_movies(limit=70, out_path=tmp_path / "raw.jsonl", max_workers=2)
+    assert df.empty
+    assert (tmp_path / "raw.jsonl").read_text(encoding="utf-8") == ""
+    assert list(ext.iter_tmdb_top_movies(limit=70, out_path=tmp_path / "stream.jsonl", max_workers=2)) == []
+
+
+def test_streaming_discover_matches_batch(tmdb_stub, tmp_path):
+    batch = ext.extract_tmdb_top_movies(limit=75, out_path=tmp_path / "raw.jsonl", max_workers=3)
+    pages = list(ext.iter_tmdb_top_movies(limit=75, out_path=tmp_path / "stream.jsonl", max_workers=3))
+
+    assert [m["id"] for p in pages for m in p] == batch["id"].tolist()
+    assert (tmp_path / "stream.jsonl").read_text(encoding="utf-8") == (tmp_path / "raw.jsonl").read_text(encoding="utf-8")
+
+
+def test_financials_cache_miss_then_hit(tmdb_stub, tmp_path):
+    ids = _ids(tmdb_stub.movies[:30])
+    kwargs = dict(api_key="k", sleep_s=0, max_workers=4, rate_per_s=1000, cache_path=tmp_path / "cache.sqlite")
+
+    first: dict = {}
+    df1 = ext.extract_movie_financials_df(ids, stats=first, **kwargs)
+    assert first["cache_hits"] == 0 and first["fetched"] == 30
+    assert tmdb_stub.count(r"/movie/\d+") == 30
+    assert df1["id"].tolist() == ids
+    assert df1["budget"].tolist() == [i * 1000 for i in ids]
+
+    second: dict = {}
+    df2 = ext.extract_movie_financials_df(ids, stats=second, **kwargs)
+    assert second["cache_hits"] == 30 and second["fetched"] == 0
+    assert tmdb_stub.count(r"/movie/\d+") == 30
+    pd.testing.assert_frame_equal(df1, df2)
+
+    # só os ids novos vão à API; a ordem de entrada é preservada
+    more = [ids[0], 5001, ids[1], 5002]
+    third: dict = {}
+    df3 = ext.extract_movie_financials_df(more, stats=third, **kwargs)
+    assert third["cache_hits"] == 2 and third["fetched"] == 2
+    assert tmdb_stub.count(r"/movie/\d+") == 32
+    assert df3["id"].tolist() == more
+
+
+def test_financials_without_cache_always_fetch(tmdb_stub, tmp_path):
+    ids = _ids(tmdb_stub.movies[:5])
+    for _ in range(2):
+        ext.extract_movie_financials_df(ids, "k", sleep_s=0, use_cache=False, cache_path=tmp_path / "c.sqlite")
+    assert tmdb_stub.count(r"/movie/\d+") == 10
+    assert not (tmp_path / "c.sqlite").exists()
+
+
+def test_token_bucket_respects_rate():
+    rate, n, threads = 50.0, 31, 4
+    bucket = ext.TokenBucket(rate, burst=1)
+    stamps: list[float] = []
+    lock = threading.Lock()
+
+    def worker(k: int) -> None:
+        for _ in range(k):
+            bucket.acquire()
+            with lock:
+                stamps.append(time.monotonic())
+
+    t0 = time.monotonic()
+    pool = [threading.Thread(target=worker, args=(n // threads + (i < n % threads),)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    assert len(stamps) == n
+    # burst=1: a 1ª sai na hora, as outras n-1 precisam de 1/rate s cada
+    assert stamps[-1] - t0 >= (n - 1) / rate * 0.95
+
+
+def test_token_bucket_allows_initial_burst():
+    bucket = ext.TokenBucket(1.0, burst=5)
+    t0 = time.monotonic()
+    assert sum(bucket.acquire() for _ in range(5)) == 0.0
+    assert time.monotonic() - t0 < 0.5
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        ext.TokenBucket(0)
+
+
+def test_financials_fetch_rate_is_limited(tmdb_stub, tmp_path):
+    rate, workers, n = 40.0, 4, 24
+    ids = _ids(tmdb_stub.movies[:n])
+    ext.extract_movie_financials_df(
+        ids, "k", max_workers=workers, rate_per_s=rate, cache_path=tmp_path / "cache.sqlite",
+    )
+
+    stamps = sorted(t for t, path, _ in tmdb_stub.calls if path.startswith("/movie/"))
+    assert len(stamps) == n
+    # a rajada inicial cobre `workers` chamadas; as demais saem a no máximo `rate` por segundo
+    assert stamps[-1] - stamps[0] >= (n - workers) / rate * 0.9
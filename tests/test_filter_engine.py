@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+
+# componentes da UI importados como no app (streamlit run UI/Main.py)
+sys.path.insert(0, str(ROOT / "UI"))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")  # "No runtime found" fora do app
+
+from components import filter_engine as fe, filters  # noqa: E402
+from components.data import DATASET_VERSION_ATTR  # noqa: E402
+from components.genre_index import add_genre_index  # noqa: E402
+from components.search_index import SEARCH_COLS, SearchIndex, normalize_series, normalize_text  # noqa: E402
+
+WORDS = (
+    "amor guerra cidade noite última vingança coração segredo memória sombra destino "
+    "love war city night last revenge heart secret shadow"
+).split()
+GENRES = ["Ação", "Animação", "Comédia", "Drama", "Ficção científica", "Romance", "Terror"]
+
+
+def make_curated(n: int, seed: int = 0) -> pd.DataFrame:
+    """Frame no formato do curated com nulos em ano/votos, filmes sem gênero e texto acentuado."""
+    rng = np.random.default_rng(seed)
+
+    def text(k0: int, k1: int) -> list[str]:
+        return [" ".join(rng.choice(WORDS, rng.integers(k0, k1 + 1))).capitalize() for _ in range(n)]
+
+    year = pd.array(rng.integers(1930, 2025, n), dtype="Int64")
+    year[rng.random(n) < 0.02] = pd.NA
+    votes = np.round(np.exp(rng.normal(8.7, 0.7, n)))
+    votes[rng.random(n) < 0.02] = np.nan
+    genres = [", ".join(sorted(rng.choice(GENRES, rng.integers(0, 4), replace=False))) for _ in range(n)]
+    df = pd.DataFrame({
+        "id": np.arange(n) + 1,
+        "release_year": year,
+        "vote_count": votes,
+        "genres_str": genres,
+        "title": text(1, 4),
+        "original_title": text(1, 4),
+        "overview": text(8, 30),
+    })
+    return add_genre_index(df)
+
+
+@pytest.fixture(scope="module")
+def curated():
+    df = make_curated(3000, seed=7)
+    df.attrs[DATASET_VERSION_ATTR] = "test:synthetic-3000"
+    return df
+
+
+def test_search_index_is_built_on_first_text_search(curated):
+    engine = fe.FilterEngine(curated)
+    engine.select((1900, 2030), 2500, "drama")
+    assert engine._search is None
+    engine.select((1900, 2030), 0, search_q="amor")
+    assert engine._search is not None
+
+
+def test_get_filter_engine_builds_search_index_only_when_asked(curated):
+    df = curated.copy()
+    df.attrs[DATASET_VERSION_ATTR] = "test:with-search"
+    assert fe.get_filter_engine(df)._search is None
+    engine = fe.get_filter_engine(df, with_search=True)
+    assert engine is fe.get_filter_engine(df) and engine._search is not None
+
+
+def test_search_index_is_sized_to_the_trigrams_that_occur():
+    df = pd.DataFrame({"title": ["Ação", "abc", None], "original_title": ["", "abcd", "x"], "overview": ["", "", ""]})
+    ix = SearchIndex(df)
+    docs = [d.encode("utf-8") for d in ix.docs]
+    pairs = {(d[i:i + 3], r) for r, d in enumerate(docs) for i in range(len(d) - 2)}
+    grams = sorted({g for g, _ in pairs})
+    assert [int(g).to_bytes(3, "big") for g in ix.grams] == grams
+    assert len(ix.offsets) == len(grams) + 1 and len(ix.postings) == len(pairs)
+    for i, g in enumerate(grams):
+        assert ix.postings[ix.offsets[i]:ix.offsets[i + 1]].tolist() == sorted(r for gg, r in pairs if gg == g)
+    assert ix.search("acao").tolist() == [0] and ix.search("bcd").tolist() == [1] and len(ix.search("zzz")) == 0
+
+    empty = SearchIndex(df.iloc[:0])
+    assert len(empty.grams) == 0 and empty.offsets.tolist() == [0] and len(empty.search("abc")) == 0
+
+
+def _reference(df, year_range, min_votes, genre_q="", title_q="", search_q=""):
+    """Filtro direto com máscaras do pandas (a regra do apply_common_filters antigo, com busca sem acento)."""
+    y0, y1 = year_range
+    ok = df["release_year"].between(y0, y1).fillna(False) & (df["vote_count"].fillna(0) >= min_votes)
+    if genre_q.strip():
+        ok &= df["genres_str"].str.contains(genre_q.strip(), case=False, na=False, regex=False)
+    if normalize_text(title_q).strip():
+        ok &= normalize_series(df["title"]).str.contains(normalize_text(title_q).strip(), regex=False)
+    q = normalize_text(search_q).strip()
+    if q:
+        any_col = False
+        for c in SEARCH_COLS:
+            any_col |= normalize_series(df[c]).str.contains(q, regex=False)
+        ok &= any_col
+    return np.flatnonzero(ok.to_numpy(dtype=bool))
+
+
+CASES = [
+    ((1900, 2030), 0),
+    ((1990, 2020), 2500),
+    ((2000, 2010), 5000),
+    ((1990, 2020), 2500, "drama"),
+    ((1990, 2020), 2500, "ção"),
+    ((1990, 2020), 0, "", "amor"),
+    ((1990, 2020), 0, "", "  Noite "),
+    ((1990, 2020), 0, "", "MEMORIA"),
+    ((1900, 2030), 0, "", "", "ultima"),
+    ((1900, 2030), 0, "", "", "Última noite"),
+    ((1900, 2030), 0, "", "", "coracao"),
+    ((1980, 2025), 3000, "", "", "  Coração  "),
+    ((1990, 2020), 2500, "drama", "vinga", "sombra"),
+    ((1990, 2020), 2500, "", "", "não existe em lugar nenhum"),
+]
+
+
+@pytest.mark.parametrize("args", CASES)
+def test_select_matches_reference_filter(curated, args):
+    expected = _reference(curated, *args)
+    assert fe.FilterEngine(curated).select(*args).tolist() == expected.tolist()
+    # e pelo caminho da UI (engine em cache por versão do dataset)
+    assert filters.apply_common_filters(curated, *args).index.tolist() == curated.index[expected].tolist()
+
+
+def test_select_refined_from_lru_matches_reference(curated):
+    # um engine só, com filtros cada vez mais estreitos: a maioria sai do LRU (hit/refined)
+    engine = fe.FilterEngine(curated)
+    chain = [
+        ((1900, 2030), 0, "", "", "am"),
+        ((1900, 2030), 0, "", "", "amo"),
+        ((1900, 2030), 2500, "", "", "amor"),
+        ((1990, 2020), 2500, "", "", "amor"),
+        ((1990, 2020), 2500, "dra", "", "amor"),
+        ((1990, 2020), 2500, "drama", "", "amor"),
+        ((1995, 2015), 4000, "drama", "co", "amor"),
+        ((1990, 2020), 2500, "", "", "amor"),
+        *CASES,
+    ]
+    for args in chain:
+        assert engine.select(*args).tolist() == _reference(curated, *args).tolist(), args
+    assert engine.refined > 0 and engine.hits > 0
+    assert engine.hits + engine.refined + engine.misses == len(chain)
+
+
+def test_filter_returns_rows_in_original_order(curated):
+    args = ((1990, 2020), 2500, "drama", "", "última")
+    pd.testing.assert_frame_equal(fe.FilterEngine(curated).filter(*args), curated.iloc[_reference(curated, *args)])
+
+
+def test_counters_are_consistent_across_threads(curated):
+    engine = fe.FilterEngine(curated, lru_size=4)
+    calls_per_thread = 40
+
+    def worker(t: int) -> None:
+        for i in range(calls_per_thread):
+            engine.select((1950 + (i + t) % 10, 2020), 2000 + 500 * (i % 3))
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert engine.hits + engine.refined + engine.misses == 8 * calls_per_thread
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "UI"))
+
+from components import formatters as fm  # noqa: E402
+
+SCALAR = {
+    fm.fmt2_col: fm.fmt2,
+    fm.fmt0_col: fm.fmt0,
+    fm.pct2_col: fm.pct2,
+    fm.money_short_col: fm.money_short,
+}
+
+
+def _values(n: int, seed: int = 0) -> pd.Series:
+    """Valores de orçamento/ROI com nulos, negativos, zeros, meio centavo e as fronteiras K/M/B."""
+    rng = np.random.default_rng(seed)
+    v = rng.lognormal(12, 4, n) * rng.choice([-1, 1], n)
+    edge = [0.0, -0.0, 0.005, 0.015, 2.675, 999.995, 1e3, 999_999.995, 1e6, 1e9, -1e9, 1.5e15, np.inf, np.nan]
+    v[: min(n, len(edge))] = edge[: min(n, len(edge))]
+    s = pd.Series(v, index=np.arange(n) * 3, name="budget")
+    s[s.index[::7]] = np.nan
+    return s
+
+
+@pytest.mark.parametrize("col_fn", list(SCALAR), ids=lambda f: f.__name__)
+@pytest.mark.parametrize("n", [0, 1, 50, fm.VECTOR_MIN_ROWS - 1, fm.VECTOR_MIN_ROWS, 3000])
+def test_column_formatters_match_scalar(col_fn, n):
+    s = _values(n)
+    out = col_fn(s)
+    assert out.tolist() == [SCALAR[col_fn](x) for x in s]
+    assert out.index.equals(s.index) and out.name == "budget"
+
+
+@pytest.mark.parametrize("n", [50, 3000])
+def test_column_formatters_accept_lists_and_nullable_ints(n):
+    ints = pd.array(np.arange(n) * 1_234_567, dtype="Int64")
+    ints[::5] = pd.NA
+    for col_fn, scalar in SCALAR.items():
+        assert col_fn(ints).tolist() == [scalar(x) for x in ints]
+        assert col_fn(list(ints)).tolist() == [scalar(x) for x in ints]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from BENCH.synthetic import GENRE_MAP, TMDB_CONFIG, synthetic_raw_movies
+from ETL import transform as tf
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "UI"))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+from components.genre_index import GENRE_BITS_COL, add_genre_index, genre_aggregate, genre_mask  # noqa: E402
+
+MEANS = {"avg_wr": "weighted_rating", "avg_votes": "vote_count", "avg_popularity": "popularity"}
+
+
+@pytest.fixture(scope="module")
+def curated() -> pd.DataFrame:
+    """Curated sintético com filmes sem gênero, gênero desconhecido e nulos nas colunas médias."""
+    raw = synthetic_raw_movies(3000, seed=11)
+    raw.at[0, "genre_ids"] = None
+    raw.at[1, "genre_ids"] = []
+    raw.at[2, "genre_ids"] = [18, 424242, 35]
+    df = tf.transform_clean(tf.transform_enrich(raw, GENRE_MAP, TMDB_CONFIG)).reset_index(drop=True)
+    df.loc[3:40, "weighted_rating"] = np.nan
+    df.loc[41:60, "popularity"] = np.nan
+    return add_genre_index(df)
+
+
+def _aggregate_reference(df: pd.DataFrame) -> pd.DataFrame:
+    """Genre Mix antes do índice: explode de genres_names + groupby."""
+    df_g = df.explode("genres_names").rename(columns={"genres_names": "genre"})
+    df_g = df_g.dropna(subset=["genre", "weighted_rating"])
+    return (
+        df_g.groupby("genre")
+            .agg(
+                movies=("id", "count"),
+                avg_wr=("weighted_rating", "mean"),
+                avg_votes=("vote_count", "mean"),
+                avg_popularity=("popularity", "mean"),
+            )
+            .reset_index()
+    )
+
+
+def _check_aggregate(df: pd.DataFrame) -> None:
+    out = genre_aggregate(df, MEANS, required="weighted_rating")
+    ref = _aggregate_reference(df)
+    assert out["genre"].tolist() == ref["genre"].tolist()
+    assert out["movies"].tolist() == ref["movies"].tolist()
+    for c in MEANS:
+        np.testing.assert_allclose(out[c].to_numpy(), ref[c].to_numpy(dtype=np.float64), rtol=1e-12)
+
+
+def test_aggregate_matches_explode_groupby(curated):
+    assert "UNKNOWN_424242" in curated.attrs["genre_vocab"]
+    _check_aggregate(curated)
+    # recortes como os da página (linhas fora de ordem, sem reindexar)
+    _check_aggregate(curated[curated["vote_count"] >= 5000])
+    _check_aggregate(curated.sample(frac=0.3, random_state=1))
+
+
+def test_aggregate_from_genres_str_only(curated):
+    # JSONL antigo, sem genre_ids/genres_names: o índice sai do genres_str
+    df = add_genre_index(curated.drop(columns=["genre_ids", "genres_names", GENRE_BITS_COL]))
+    ref = curated.assign(genres_names=curated["genres_str"].fillna("").str.split(", "))
+    ref["genres_names"] = [[g for g in names if g] for names in ref["genres_names"]]
+    out = genre_aggregate(df, MEANS, required="weighted_rating")
+    pd.testing.assert_frame_equal(out, _aggregate_reference(ref), check_dtype=False)
+
+
+def test_aggregate_of_empty_frame(curated):
+    out = genre_aggregate(curated.iloc[:0], MEANS, required="weighted_rating")
+    assert out.empty and list(out.columns) == ["genre", "movies", *MEANS]
+    out = genre_aggregate(curated[curated["weighted_rating"].isna()], MEANS, required="weighted_rating")
+    assert out.empty
+
+
+@pytest.mark.parametrize("q", ["drama", "  Ação ", "ção", "fic", "UNKNOWN", "a", "não existe"])
+def test_genre_mask_matches_str_contains(curated, q):
+    expected = curated["genres_str"].str.contains(q.strip(), case=False, na=False, regex=False).to_numpy()
+    assert genre_mask(curated, q).tolist() == expected.tolist()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from BENCH.synthetic import synthetic_curated
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "UI"))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+from components import histogram as hg  # noqa: E402
+from components.charts import WR_SCALE, _wr_band  # noqa: E402
+from components.data import DATASET_VERSION_ATTR  # noqa: E402
+from components.filter_engine import FilterEngine  # noqa: E402
+
+LABELS = tuple(WR_SCALE.domain)
+
+
+@pytest.fixture(scope="module")
+def curated() -> pd.DataFrame:
+    """Curated sintético com nulos, valores em cima dos limiares das bandas e anos faltando."""
+    df = synthetic_curated(5000, seed=18).reset_index(drop=True)
+    df.loc[0:9, "weighted_rating"] = [7.0, 7.5, 7.0, 7.5, np.nan, np.nan, 6.0, 8.4, 7.2, 7.2]
+    df.loc[10:40, "release_year"] = pd.NA
+    df.attrs[DATASET_VERSION_ATTR] = "test:hist-5000"
+    return df
+
+
+def _hist_reference(df: pd.DataFrame, col: str = "weighted_rating", maxbins: int = 24) -> pd.DataFrame:
+    """pd.cut nas bordas do bin (última faixa fechada) + banda de _wr_band, contados com groupby."""
+    v = pd.to_numeric(df[col], errors="coerce").dropna()
+    start, stop, step = hg.nice_bins(v.min(), v.max(), maxbins)
+    edges = np.round(start + np.arange(round((stop - start) / step) + 1) * step, 10)
+    b = pd.cut(v, edges, right=False, labels=False).fillna(len(edges) - 2).astype(int)
+    band = _wr_band(v).cat.codes
+    g = pd.DataFrame({"b": b, "band": band}).groupby(["b", "band"]).size().reset_index(name="count")
+    return pd.DataFrame({
+        "bin_start": edges[g["b"]],
+        "bin_end": edges[g["b"] + 1],
+        "band": np.asarray(LABELS, dtype=object)[g["band"]],
+        "count": g["count"].to_numpy(),
+    })
+
+
+@pytest.mark.parametrize("lo, hi, maxbins, expected", [
+    (6.0, 9.0, 24, (6.0, 9.0, 0.2)),      # como o alt.Bin(maxbins=24) do gráfico antigo
+    (5.93, 8.71, 24, (5.8, 8.8, 0.2)),
+    (0.0, 100.0, 10, (0.0, 100.0, 10.0)),
+    (1930, 2024, 24, (1930, 2025, 5.0)),
+    (7.3, 7.3, 24, (7.0, 8.0, 1.0)),      # um valor só
+])
+def test_nice_bins(lo, hi, maxbins, expected):
+    assert hg.nice_bins(lo, hi, maxbins) == pytest.approx(expected)
+
+
+def test_histogram_matches_cut_and_bands(curated):
+    out = hg.histogram(curated, "weighted_rating", thresholds=(7.0, 7.5), labels=LABELS)
+    ref = _hist_reference(curated)
+    pd.testing.assert_frame_equal(out, ref, check_dtype=False, atol=1e-9)
+    assert out["count"].sum() == curated["weighted_rating"].notna().sum()
+
+    # limiares: 7.0 fica em Baixo e 7.5 em Médio (pd.cut com right=True)
+    ties = curated.iloc[:4]
+    bands = hg.histogram(ties, "weighted_rating", thresholds=(7.0, 7.5), labels=LABELS).groupby("band")["count"].sum()
+    assert bands.to_dict() == {"Baixo": 2, "Médio": 2}
+
+
+def test_histogram_cache_is_keyed_by_rows(curated):
+    df_f = FilterEngine(curated).filter((1990, 2015), 3000)
+    assert hg.frame_key(df_f) is not None
+    out = hg.histogram(df_f, "weighted_rating", thresholds=(7.0, 7.5), labels=LABELS)
+    pd.testing.assert_frame_equal(out, _hist_reference(df_f), check_dtype=False, atol=1e-9)
+    pd.testing.assert_frame_equal(hg.histogram(df_f, "weighted_rating", thresholds=(7.0, 7.5), labels=LABELS), out)
+    # head do frame carregado não reaproveita o histograma do frame inteiro
+    head = curated.iloc[:100]
+    pd.testing.assert_frame_equal(
+        hg.histogram(head, "weighted_rating", thresholds=(7.0, 7.5), labels=LABELS),
+        _hist_reference(head), check_dtype=False, atol=1e-9,
+    )
+
+
+def test_value_counts_matches_groupby(curated):
+    for df in [curated, FilterEngine(curated).filter((1990, 2015), 3000), curated.iloc[::7]]:
+        ref = (
+            df.dropna(subset=["release_year"])
+              .groupby("release_year")
+              .size()
+              .reset_index(name="movies")
+              .sort_values("release_year")
+        )
+        pd.testing.assert_frame_equal(hg.value_counts(df, "release_year"), ref, check_dtype=False)
+
+
+def test_empty_and_all_null_frames(curated):
+    all_null = curated.iloc[:50].assign(weighted_rating=np.nan, release_year=pd.NA)
+    all_null.attrs = {}
+    for df in [curated.iloc[:0], all_null]:
+        hist = hg.histogram(df, "weighted_rating", thresholds=(7.0, 7.5), labels=LABELS)
+        assert hist.empty and list(hist.columns) == ["bin_start", "bin_end", "band", "count"]
+        counts = hg.value_counts(df, "release_year")
+        assert counts.empty and list(counts.columns) == ["release_year", "movies"]
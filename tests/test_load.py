@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from ETL import load as ld
+from conftest import ROOT
+
+
+def _frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """Linhas na ordem do discover (nota decrescente) com anos misturados e alguns nulos."""
+    rng = np.random.default_rng(seed)
+    year = pd.array(rng.integers(1950, 2025, n), dtype="Int64")
+    year[::17] = pd.NA
+    return pd.DataFrame({
+        "id": np.arange(n, dtype=np.int64) + 1,
+        "title": [f"Movie {i}" for i in range(n)],
+        "release_year": year,
+        "vote_average": np.round(np.linspace(9.5, 6.0, n), 3),
+        "vote_count": pd.array(rng.integers(2000, 30000, n), dtype="Int64"),
+    })
+
+
+@pytest.fixture
+def written(tmp_path, monkeypatch):
+    monkeypatch.setattr(ld, "ROW_GROUP_ROWS", 64)
+    df = _frame(1000)
+    path = tmp_path / "movies.parquet"
+    with ld.CuratedParquetWriter(path) as w:
+        for start in range(0, len(df), 90):
+            w.write(df.iloc[start:start + 90])
+    return df, path
+
+
+def test_writer_keeps_one_file_per_decade_with_full_row_groups(written):
+    df, path = written
+    files = sorted(path.rglob("*.parquet"))
+    decades = (df["release_year"] // 10 * 10).dropna().unique()
+    # uma partição por década + a de ano nulo; um arquivo em cada, não um por chunk
+    assert len(files) == len(decades) + 1
+    assert {f.parent.name for f in files} >= {f"{ld.PARTITION_COL}={ld.HIVE_NULL_PARTITION}"}
+    for f in files:
+        meta = pq.ParquetFile(f).metadata
+        sizes = [meta.row_group(i).num_rows for i in range(meta.num_row_groups)]
+        assert all(s == 64 for s in sizes[:-1]) and 0 < sizes[-1] <= 64
+    assert not path.with_name(path.name + ".tmp").exists()
+
+
+def test_read_returns_rows_in_written_order(written):
+    df, path = written
+    out = ld.read_curated_parquet(path)
+    assert list(out.columns) == list(df.columns)
+    pd.testing.assert_frame_equal(out, df, check_dtype=False)
+
+    cols = ["id", "vote_average"]
+    pd.testing.assert_frame_equal(ld.read_curated_parquet(path, columns=cols), df[cols], check_dtype=False)
+
+    with_decade = ld.read_curated_parquet(path, columns=["id", ld.PARTITION_COL])
+    assert with_decade["id"].tolist() == df["id"].tolist()
+    assert with_decade[ld.PARTITION_COL].tolist() == (df["release_year"] // 10 * 10).tolist()
+
+
+def test_ui_reader_returns_rows_in_written_order(written):
+    df, path = written
+    sys.path.insert(0, str(ROOT / "UI"))
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")
+    from components import data
+
+    full = data._parquet_frame(path, None, "test")
+    assert full["id"].tolist() == df["id"].tolist()
+    assert data.RANK_COL not in full.columns and ld.PARTITION_COL not in full.columns
+    assert data._parquet_frame(path, ("id", "title"), "test")["id"].tolist() == df["id"].tolist()
+
+
+def test_unpartitioned_table_and_failed_write(tmp_path):
+    fin = pd.DataFrame({"id": [3, 1, 2], "budget": [1.0, np.nan, 3.0]})
+    path = ld.write_curated_parquet(fin, tmp_path / "fin.parquet")
+    assert [f.name for f in path.iterdir()] == ["part-0.parquet"]
+    pd.testing.assert_frame_equal(ld.read_curated_parquet(path), fin, check_dtype=False)
+
+    # erro no meio: o dataset anterior fica intacto
+    with pytest.raises(RuntimeError):
+        with ld.CuratedParquetWriter(path) as w:
+            w.write(fin.iloc[:1])
+            raise RuntimeError("refresh falhou")
+    assert ld.read_curated_parquet(path)["id"].tolist() == [3, 1, 2]
+    assert not (tmp_path / "fin.parquet.tmp").exists()
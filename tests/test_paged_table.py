@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from BENCH.synthetic import synthetic_curated
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "UI"))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from components.data import DATASET_VERSION_ATTR  # noqa: E402
+from components.filter_engine import FilterEngine  # noqa: E402
+from components.paged_table import slice_order  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def base() -> pd.DataFrame:
+    """Curated sintético com empates (notas arredondadas, votos em faixas) e nulos no critério."""
+    df = synthetic_curated(2000, seed=22).reset_index(drop=True)
+    df["weighted_rating"] = df["weighted_rating"].round(1)
+    df["vote_count"] = (df["vote_count"] // 500 * 500).astype("Int64")
+    df.loc[::29, "weighted_rating"] = np.nan
+    df.attrs[DATASET_VERSION_ATTR] = "test:paged-2000"
+    return df
+
+
+def _pages(df, by, ascending, base, page_size=50):
+    """Percorre as páginas como o paged_table: cursor = chave da última linha, searchsorted 'right'."""
+    keys, order, _ = slice_order(df, [by], ascending=ascending, base=base)
+    pages, start = [], 0
+    while start < len(order):
+        stop = min(start + page_size, len(order))
+        pages.append(df.iloc[order[start:stop]])
+        start = int(np.searchsorted(keys, keys[stop - 1], "right"))
+    return pages
+
+
+@pytest.mark.parametrize("by", ["weighted_rating", "vote_count", "popularity"])
+@pytest.mark.parametrize("ascending", [False, True])
+@pytest.mark.parametrize("with_base", [False, True])
+def test_pages_match_full_sort_slices(base, by, ascending, with_base):
+    df_f = FilterEngine(base).filter((1980, 2020), 1000)
+    ref = df_f.sort_values(by, ascending=ascending, kind="stable")
+    pages = _pages(df_f, by, ascending, base if with_base else None)
+    assert len(pages) == -(-len(ref) // 50)
+    for i, page in enumerate(pages):
+        pd.testing.assert_frame_equal(page, ref.iloc[i * 50:(i + 1) * 50])
+
+
+def test_cursor_survives_filter_change(base):
+    by = "weighted_rating"
+    wide = FilterEngine(base).filter((1950, 2024), 0)
+    keys, order, _ = slice_order(wide, [by], base=base)
+    cursor = keys[149]  # última linha da 3ª página
+
+    narrow = FilterEngine(base).filter((1990, 2010), 2000)
+    nkeys, norder, _ = slice_order(narrow, [by], base=base)
+    start = int(np.searchsorted(nkeys, cursor, "right"))
+    # no recorte novo, a página começa na primeira linha que vem depois do cursor na ordem do dataset
+    after = base.sort_values(by, ascending=False, kind="stable").index
+    after = after[after.get_loc(wide.index[order[149]]) + 1:]
+    expected = [i for i in after if i in set(narrow.index)]
+    assert narrow.index[norder[start:start + 50]].tolist() == expected[:50]
+
+
+def test_empty_slice(base):
+    keys, order, _ = slice_order(base.iloc[:0], ["weighted_rating"], base=base)
+    assert len(keys) == len(order) == 0
+
+
+def _app():
+    import numpy as np
+    import pandas as pd
+
+    from components.paged_table import paged_table
+
+    n = 120
+    df = pd.DataFrame({
+        "id": np.arange(n) + 1,
+        "title": [f"Movie {i}" for i in range(n)],
+        "score": np.r_[np.repeat([9.0, 8.0, 7.0], 30), np.full(25, np.nan), np.linspace(1, 2, 5)],
+    })
+    paged_table(df, ["title", "score"], key="t", sort_cols=["score"], page_size=50)
+
+
+def test_buttons_page_through_the_slice():
+    at = AppTest.from_function(_app).run()
+    shown = lambda: at.dataframe[0].value["title"].tolist()  # noqa: E731
+    n = 120
+    score = np.r_[np.repeat([9.0, 8.0, 7.0], 30), np.full(25, np.nan), np.linspace(1, 2, 5)]
+    ref = pd.DataFrame({"title": [f"Movie {i}" for i in range(n)], "score": score})
+    ref = ref.sort_values("score", ascending=False, kind="stable")["title"].tolist()
+
+    assert shown() == ref[:50]
+    at.button(key="t__next").click().run()
+    assert shown() == ref[50:100]
+    at.button(key="t__next").click().run()
+    assert shown() == ref[100:] and at.button(key="t__next").disabled
+    at.button(key="t__prev").click().run()
+    assert shown() == ref[50:100]
+    at.button(key="t__first").click().run()
+    assert shown() == ref[:50] and at.button(key="t__prev").disabled
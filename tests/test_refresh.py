@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from ETL import extract as ext, load as ld, state as stt
+
+import refresh
+
+RUN_OPTS = {"sleep_s": 0, "workers": 4, "rate_per_s": 1000}
+
+OUTPUTS = {
+    "RAW_FILE": "raw/top.jsonl",
+    "CURATED_FILE": "curated/movies.jsonl",
+    "CURATED_FINANCIALS_FILE": "curated/financials.jsonl",
+    "CURATED_CUBE_FILE": "curated/cube.jsonl",
+    "CURATED_PARQUET": "curated/movies.parquet",
+    "CURATED_FINANCIALS_PARQUET": "curated/financials.parquet",
+    "CURATED_CUBE_PARQUET": "curated/cube.parquet",
+    "LEGACY_FIN_FILE": "curated/legacy.jsonl",
+}
+
+
+@pytest.fixture
+def run_refresh(tmdb_stub, tmp_path, monkeypatch):
+    """refresh.main contra o stub, com bruto, curated, estado e cache em tmp_path."""
+    (tmp_path / "curated").mkdir()
+    for name, rel in OUTPUTS.items():
+        monkeypatch.setattr(refresh, name, tmp_path / rel)
+    monkeypatch.setattr(stt, "STATE_FILE", tmp_path / "state" / "watermarks.json")
+    monkeypatch.setattr(ext, "CACHE_DB", tmp_path / "cache.sqlite")
+
+    def run(**kwargs) -> dict:
+        refresh.main(**{**RUN_OPTS, "limit": 90, "report_path": tmp_path / "report.json", **kwargs})
+        out = {
+            "raw": (tmp_path / OUTPUTS["RAW_FILE"]).read_text(encoding="utf-8"),
+            "state": stt.load_state()["movies"],
+        }
+        for table in ["movies", "financials", "cube"]:
+            out[f"{table}.jsonl"] = pd.read_json(tmp_path / "curated" / f"{table}.jsonl", lines=True)
+            out[f"{table}.parquet"] = ld.read_curated_parquet(tmp_path / "curated" / f"{table}.parquet")
+        return out
+
+    return run
+
+
+@pytest.mark.parametrize("page_cap", [500, 2], ids=["single-query", "year-shards"])
+def test_streaming_refresh_matches_full(run_refresh, monkeypatch, page_cap):
+    monkeypatch.setattr(ext, "DISCOVER_PAGE_CAP", page_cap)
+    full = run_refresh()
+    streaming = run_refresh(streaming=True, chunk_size=25)
+
+    assert streaming["raw"] == full["raw"]
+    assert streaming["state"] == full["state"] and len(full["state"]) == 90
+    for name in ["movies.jsonl", "financials.jsonl", "movies.parquet", "financials.parquet"]:
+        pd.testing.assert_frame_equal(streaming[name], full[name], obj=name)
+    # cubo somado chunk a chunk: só a ordem das somas de float muda
+    for name in ["cube.jsonl", "cube.parquet"]:
+        pd.testing.assert_frame_equal(streaming[name], full[name], check_exact=False, obj=name)
+
+    assert len(full["movies.parquet"]) == 90
+    assert full["movies.parquet"]["id"].tolist() == [int(i) for i in full["movies.jsonl"]["id"]]
+
+
+def test_streaming_and_incremental_are_exclusive(run_refresh):
+    with pytest.raises(ValueError):
+        run_refresh(streaming=True, incremental=True)
+
+
+@pytest.mark.parametrize("mode", ["full", "incremental", "streaming"])
+def test_cli_mode_limit_and_chunk_size(run_refresh, monkeypatch, tmp_path, mode):
+    seen: dict = {}
+    main = refresh.main
+    opts = {**RUN_OPTS, "report_path": tmp_path / "report.json"}
+    monkeypatch.setattr(refresh, "main", lambda **kw: seen.update(kw) or main(**kw, **opts))
+
+    report = refresh.cli(["--mode", mode, "--limit", "40", "--chunk-size", "15"])
+    assert seen == {"limit": 40, "incremental": mode == "incremental", "streaming": mode == "streaming", "chunk_size": 15}
+    # incremental sem estado anterior cai no full
+    assert report["run"]["mode"] == ("full" if mode == "incremental" else mode)
+    assert report["stages"]["extract"]["rows_out"] == 40
+
+
+def test_cli_rejects_unknown_mode(capsys):
+    with pytest.raises(SystemExit):
+        refresh.cli(["--mode", "turbo"])
+    assert "invalid choice" in capsys.readouterr().err
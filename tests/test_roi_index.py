@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from BENCH.synthetic import synthetic_curated, synthetic_raw_financials
+from ETL import transform as tf
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "UI"))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+from components import quality  # noqa: E402
+from components.roi_index import RoiIndex  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def fin() -> pd.DataFrame:
+    """Visão filme ⨝ financeiro: budget/revenue zerados, nulos, sem linha financeira e muitos empates."""
+    movies = synthetic_curated(6000, seed=20)
+    ids = movies["id"].to_numpy()
+    raw = synthetic_raw_financials(ids[np.arange(len(ids)) % 25 != 0], seed=20).astype({"budget": float, "revenue": float})
+    raw["revenue"] = raw["revenue"].round(-6)
+    raw.loc[::61, "budget"] = np.nan
+    raw.loc[::67, "revenue"] = np.nan
+    return tf.transform_add_roi(movies, raw)
+
+
+def _ok_reference(df: pd.DataFrame, min_budget: float, min_revenue: float) -> pd.DataFrame:
+    """Filtro da página de ROI antes do índice."""
+    return df[
+        (df["budget"].fillna(0) >= min_budget) &
+        (df["revenue"].fillna(0) >= min_revenue)
+    ].dropna(subset=["roi", "profit"])
+
+
+def _thresholds(df: pd.DataFrame) -> list[tuple[float, float]]:
+    # inclui valores que existem nos dados (empates no limiar), zero, negativos e acima do máximo
+    b = df["budget"].dropna().sort_values().to_numpy()
+    r = df["revenue"].dropna().sort_values().to_numpy()
+    picks = [0, len(b) // 4, len(b) // 2, len(b) - 1]
+    out = [(-1.0, -1.0), (0.0, 0.0), (1e6, 1e6), (b.max() + 1, 0.0), (0.0, r.max() + 1)]
+    out += [(b[i], r[j]) for i in picks for j in picks]
+    return out
+
+
+def test_roi_ready_flag_matches_roi_and_profit(fin):
+    # filmes sem linha financeira: nulo no left join, lido como False (roi_ready_mask)
+    ready = fin["roi_ready"].astype("boolean").fillna(False)
+    assert ready.tolist() == (fin["roi"].notna() & fin["profit"].notna()).tolist()
+
+
+@pytest.mark.parametrize("drop_flag", [False, True])
+def test_count_and_select_match_masks(fin, drop_flag):
+    # curated antigo, sem a coluna roi_ready: o índice usa roi/profit
+    df = fin.drop(columns=["roi_ready"]) if drop_flag else fin
+    idx = RoiIndex(df)
+    for mb, mr in _thresholds(df):
+        ref = _ok_reference(df, mb, mr)
+        assert idx.count(mb, mr) == len(ref), (mb, mr)
+        assert df.index[idx.select(mb, mr)].tolist() == ref.index.tolist()
+
+
+def test_coverage_helpers_on_a_slice(fin):
+    df_f = fin[fin["release_year"].between(1990, 2010).fillna(False)]
+    for mb, mr in [(0.0, 0.0), (1e6, 1e6), (5e7, 1e8)]:
+        ref = _ok_reference(df_f, mb, mr)
+        assert quality.roi_ready_coverage(df_f, min_budget=mb, min_revenue=mr) == (
+            len(ref) / len(df_f), len(ref), len(df_f)
+        )
+        pd.testing.assert_frame_equal(quality.roi_ready_rows(df_f, min_budget=mb, min_revenue=mr), ref)
+
+
+def test_coverage_curve_matches_masks(fin):
+    t = np.array([0.0, 1e5, 1e6, 1e7, 3e7, 1e8, 1e9, 1e12])
+    curve = quality.roi_coverage_curve(fin, min_budget=1e6, min_revenue=5e6, thresholds=t)
+    budget = curve[curve["axis"] == "Budget"]["movies"].tolist()
+    revenue = curve[curve["axis"] == "Revenue"]["movies"].tolist()
+    assert budget == [len(_ok_reference(fin, x, 5e6)) for x in t]
+    assert revenue == [len(_ok_reference(fin, 1e6, x)) for x in t]
+    assert np.allclose(curve["coverage"], curve["movies"] / len(fin))
+
+
+def test_empty_and_no_ready_rows(fin):
+    assert quality.roi_ready_coverage(fin.iloc[:0], min_budget=0, min_revenue=0) == (0.0, 0, 0)
+    assert quality.roi_ready_rows(fin.iloc[:0], min_budget=0, min_revenue=0).empty
+    assert quality.roi_coverage_curve(fin.iloc[:0], min_budget=0, min_revenue=0).empty
+
+    none_ready = fin.assign(roi=np.nan, roi_ready=False)
+    idx = RoiIndex(none_ready)
+    assert idx.n == 0 and idx.count(0, 0) == 0 and len(idx.select(0, 0)) == 0
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from BENCH.synthetic import synthetic_curated, synthetic_raw_financials
+from ETL import transform as tf
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "UI"))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+from components.scatter_agg import grid_downsample  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def fin() -> pd.DataFrame:
+    """Visão filme ⨝ financeiro sintética: zeros de budget/revenue (fora do eixo log) e nulos."""
+    movies = synthetic_curated(20000, seed=17)
+    df = tf.transform_add_roi(movies, synthetic_raw_financials(movies["id"].to_numpy(), seed=17)).reset_index(drop=True)
+    df.loc[::97, "revenue"] = np.nan
+    df.loc[::89, "weighted_rating"] = np.nan
+    return df
+
+
+def _grid_reference(df, x, y, *, log_x=False, log_y=False, mean_cols=(), bins=64, drop=None):
+    """
+    Mesma grade com pandas: eixo (log10 dos positivos), piso do bin e groupby por célula.
+    drop: rótulos tirados das células depois de montar a grade (os outliers).
+    """
+    def axis(col, log):
+        v = pd.to_numeric(df[col], errors="coerce").astype(float)
+        return np.log10(v.where(v > 0)) if log else v
+
+    d = df.assign(_tx=axis(x, log_x), _ty=axis(y, log_y)).dropna(subset=["_tx", "_ty"])
+
+    def binned(v):
+        lo, hi = v.min(), v.max()
+        return ((v - lo) / (hi - lo) * bins).astype(np.int64).clip(0, bins - 1) if hi > lo else v * 0
+
+    bx, by = binned(d["_tx"]), binned(d["_ty"])
+    if drop is not None:
+        d, bx, by = (v.drop(drop) for v in (d, bx, by))
+    g = d.groupby([bx, by], sort=True)
+    cells = pd.DataFrame({
+        x: g["_tx"].mean(),
+        y: g["_ty"].mean(),
+        "count": g.size(),
+        **{c: g[c].mean() for c in mean_cols},
+    }).reset_index(drop=True)
+    if log_x:
+        cells[x] = 10 ** cells[x]
+    if log_y:
+        cells[y] = 10 ** cells[y]
+    return cells, d
+
+
+CHARTS = [
+    dict(x="popularity", y="vote_count", log_x=True, log_y=True, mean_cols=["weighted_rating"]),
+    dict(x="budget", y="revenue", log_x=True, log_y=True, mean_cols=["roi"]),
+    dict(x="weighted_rating", y="roi", mean_cols=["budget", "popularity"]),
+]
+
+
+@pytest.mark.parametrize("kw", CHARTS)
+def test_cells_match_groupby_over_bins(fin, kw):
+    # sparse_max=0: nenhum outlier, toda linha válida cai numa célula
+    cells, outliers = grid_downsample(fin, max_marks=10**6, sparse_max=0, **kw)
+    ref, _ = _grid_reference(fin, **kw)
+    assert outliers.empty
+    pd.testing.assert_frame_equal(cells, ref, check_dtype=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize("kw", CHARTS)
+def test_outliers_are_points_of_sparse_cells(fin, kw):
+    cells, outliers = grid_downsample(fin, **kw)
+    ref, valid = _grid_reference(fin, **kw)
+    assert len(cells) + len(outliers) <= 2000
+    assert cells["count"].sum() + len(outliers) == len(valid)
+    assert outliers.index.isin(valid.index).all() and outliers.index.is_monotonic_increasing
+    # pontos das células com até SPARSE_MAX pontos, até o teto de max_marks // 4
+    assert len(outliers) == min(500, ref.loc[ref["count"] <= 2, "count"].sum())
+    # as células são o groupby sem os pontos que viraram outliers
+    rest, _ = _grid_reference(fin, drop=outliers.index, **kw)
+    pd.testing.assert_frame_equal(cells, rest, check_dtype=False, rtol=1e-9)
+
+
+def test_grid_coarsens_until_marks_fit(fin):
+    kw = CHARTS[0]
+    cells, outliers = grid_downsample(fin, max_marks=300, sparse_max=0, **kw)
+    fits = [b for b in (64, 32, 16, 8, 4) if len(_grid_reference(fin, bins=b, **kw)[0]) <= 300]
+    assert len(cells) <= 300 and outliers.empty
+    pd.testing.assert_frame_equal(cells, _grid_reference(fin, bins=fits[0], **kw)[0], check_dtype=False, rtol=1e-9)
+
+
+def test_degenerate_inputs(fin):
+    kw = CHARTS[0]
+    cells, outliers = grid_downsample(fin.iloc[:0], **kw)
+    assert cells.empty and list(cells.columns) == ["popularity", "vote_count", "count", "weighted_rating"]
+    assert outliers.empty
+    cells, _ = grid_downsample(fin.assign(popularity=0.0), **kw)  # nada positivo no eixo log
+    assert cells.empty
+    # eixo constante: uma coluna de células só
+    const = fin.assign(vote_count=1000)
+    cells, _ = grid_downsample(const, sparse_max=0, **kw)
+    pd.testing.assert_frame_equal(cells, _grid_reference(const, **kw)[0], check_dtype=False, rtol=1e-9)
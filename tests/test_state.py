@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from ETL import state as stt
+
+RUN_AT = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def _raw() -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "vote_count": [10, None, 30],
+        "popularity": [1.5, 7.6286000000000005, None],
+    })
+
+
+def test_state_writer_in_batches_matches_save_state(tmp_path):
+    df = _raw()
+    saved = stt.save_state(df, tmp_path / "a.json", run_at=RUN_AT)
+
+    with stt.StateWriter(tmp_path / "b.json", run_at=RUN_AT) as w:
+        for _, part in df.groupby(df.index // 2):
+            w.add(zip(part["id"], part["vote_count"], part["popularity"]))
+        w.commit()
+
+    assert (tmp_path / "b.json").read_text(encoding="utf-8") == (tmp_path / "a.json").read_text(encoding="utf-8")
+    assert stt.load_state(tmp_path / "b.json") == saved
+    assert saved["movies"]["2"] == {"vote_count": None, "popularity": 7.6286000000000005}
+    assert stt.diff_watermarks(df, saved) == (set(), set())
+
+
+def test_state_writer_without_commit_keeps_previous_state(tmp_path):
+    path = tmp_path / "state.json"
+    before = stt.save_state(_raw(), path, run_at=RUN_AT)
+
+    with pytest.raises(RuntimeError):
+        with stt.StateWriter(path) as w:
+            w.add([(9, 1, 1.0)])
+            raise RuntimeError("refresh falhou no meio")
+
+    assert stt.load_state(path) == before
+    assert not path.with_suffix(".tmp").exists()
+
+
+def test_state_writer_with_no_rows(tmp_path):
+    with stt.StateWriter(tmp_path / "s.json", run_at=RUN_AT) as w:
+        w.commit()
+    assert stt.load_state(tmp_path / "s.json") == {"last_run": RUN_AT.isoformat(), "movies": {}}
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from BENCH.synthetic import synthetic_curated
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "UI"))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+from components.data import DATASET_VERSION_ATTR  # noqa: E402
+from components.topk import sort_keys, top_k  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def base() -> pd.DataFrame:
+    """Curated sintético com muitos empates (notas arredondadas) e nulos nos dois critérios."""
+    df = synthetic_curated(3000, seed=15).reset_index(drop=True)
+    df["weighted_rating"] = df["weighted_rating"].round(1)
+    df["vote_count"] = (df["vote_count"] // 1000 * 1000).astype("Int64")
+    df.loc[::37, "weighted_rating"] = np.nan
+    df.loc[::53, "vote_count"] = pd.NA
+    df.loc[::41, "popularity"] = np.nan
+    df.attrs[DATASET_VERSION_ATTR] = "test:topk-3000"
+    return df
+
+
+def _reference(df, by, n, ascending=False, dropna=False):
+    by = [by] if isinstance(by, str) else list(by)
+    if dropna:
+        df = df.dropna(subset=[by[0]])
+    return df.sort_values(by, ascending=ascending, kind="stable").head(n)
+
+
+CASES = [
+    (["weighted_rating", "vote_count"], 10, False),
+    (["weighted_rating", "vote_count"], 250, False),
+    ("popularity", 25, False),
+    ("popularity", 25, True),
+    (["vote_count", "weighted_rating"], 40, True),
+    ("weighted_rating", 5000, False),  # n maior que o frame: inclui os nulos no fim
+]
+
+
+@pytest.mark.parametrize("by, n, ascending", CASES)
+def test_top_k_matches_stable_sort_head(base, by, n, ascending):
+    ref = _reference(base, by, n, ascending)
+    pd.testing.assert_frame_equal(top_k(base, by, n, ascending=ascending), ref)
+    pd.testing.assert_frame_equal(
+        top_k(base, by, n, ascending=ascending, dropna=True), _reference(base, by, n, ascending, dropna=True)
+    )
+
+
+@pytest.mark.parametrize("by, n, ascending", CASES)
+def test_top_k_on_slices_with_base_ranks(base, by, n, ascending):
+    for sl in [base[base["release_year"].between(1990, 2010).fillna(False)], base.iloc[::3], base.iloc[:0]]:
+        ref = _reference(sl, by, n, ascending)
+        pd.testing.assert_frame_equal(top_k(sl, by, n, ascending=ascending, base=base), ref)
+        # chaves no espaço do base: mesma ordem do sort estável
+        keys, space = sort_keys(sl, by, ascending=ascending, base=base)
+        assert space is not None
+        assert sl.index[np.argsort(keys)].tolist() == sl.sort_values(by, ascending=ascending, kind="stable").index.tolist()
+
+
+def test_base_ranks_not_used_for_foreign_index(base):
+    # índice que não aponta para posições do base (ex.: reset_index depois do filtro)
+    sl = base[base["vote_count"].fillna(0) >= 3000].reset_index(drop=True)
+    by = ["weighted_rating", "vote_count"]
+    assert sort_keys(sl, by, base=base)[1] is None
+    pd.testing.assert_frame_equal(top_k(sl, by, 30, base=base), _reference(sl, by, 30))
+
+
+def test_top_k_edge_cases(base):
+    by = ["weighted_rating", "vote_count"]
+    assert top_k(base, by, 0).empty and top_k(base.iloc[:0], by, 10).empty
+    all_nan = base.assign(weighted_rating=np.nan)
+    pd.testing.assert_frame_equal(top_k(all_nan, by, 15), _reference(all_nan, by, 15))
+    assert top_k(all_nan, by, 15, dropna=True).empty
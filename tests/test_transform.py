@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from BENCH.synthetic import GENRE_MAP, TMDB_CONFIG, synthetic_raw_financials, synthetic_raw_movies
+from ETL import transform as tf
+
+
+def _raw(n: int = 2000, seed: int = 3) -> pd.DataFrame:
+    """Bruto sintético com os casos de borda do /discover: sem gênero, gênero desconhecido, datas/imagens vazias."""
+    df = synthetic_raw_movies(n, seed)
+    df.at[0, "genre_ids"] = None
+    df.at[1, "genre_ids"] = []
+    df.at[2, "genre_ids"] = [18, 424242]
+    df.loc[3:5, "release_date"] = ["", None, "1999-12-31"]
+    df.loc[6:8, "poster_path"] = ["", None, "/x.jpg"]
+    df.loc[9:10, "vote_average"] = [np.nan, 10.0]
+    df.loc[11, "vote_count"] = 0
+    return df
+
+
+# --- user-008: transform_enrich vetorizado ---
+
+def _enrich_reference(df: pd.DataFrame, genre_map: dict[int, str], tmdb_config: dict) -> pd.DataFrame:
+    """transform_enrich antes da vetorização: apply por linha."""
+    df = df.copy()
+    df["release_date"] = pd.to_datetime(df["release_date"], errors="coerce")
+    df["release_year"] = df["release_date"].dt.year
+    df["genres_names"] = df["genre_ids"].apply(lambda ids: [genre_map.get(i, f"UNKNOWN_{i}") for i in (ids or [])])
+    df["genres_str"] = df["genres_names"].apply(lambda xs: ", ".join(xs))
+    m = 2000
+    C = pd.to_numeric(df["vote_average"], errors="coerce").mean()
+    v = pd.to_numeric(df["vote_count"], errors="coerce")
+    R = pd.to_numeric(df["vote_average"], errors="coerce")
+    df["weighted_rating"] = ((v / (v + m)) * R + (m / (v + m)) * C).round(2)
+    df["poster_url"] = df["poster_path"].apply(lambda p: tf.build_image_url(tmdb_config, p, "poster"))
+    df["backdrop_url"] = df["backdrop_path"].apply(lambda p: tf.build_image_url(tmdb_config, p, "backdrop"))
+    return df
+
+
+def test_enrich_matches_row_wise_reference():
+    raw = _raw()
+    out = tf.transform_enrich(raw, GENRE_MAP, TMDB_CONFIG)
+    ref = _enrich_reference(raw, GENRE_MAP, TMDB_CONFIG)
+
+    # genres_str sai como object (o apply do pandas 3 infere str); o clean converte para string
+    pd.testing.assert_frame_equal(out.drop(columns="genres_str"), ref.drop(columns="genres_str"))
+    assert out["genres_str"].tolist() == ref["genres_str"].tolist()
+    assert out.loc[:2, "genres_names"].tolist() == [[], [], ["Drama", "UNKNOWN_424242"]]
+    assert out.loc[3:4, "release_year"].isna().all() and out.loc[6:7, "poster_url"].isna().all()
+    # a entrada não é alterada
+    pd.testing.assert_frame_equal(raw, _raw())
+
+
+def test_enrich_with_explicit_C_matches_reference_on_the_whole_catalog():
+    # por chunk (streaming) com o C global: mesmo weighted_rating do catálogo inteiro
+    raw = _raw()
+    C = pd.to_numeric(raw["vote_average"], errors="coerce").mean()
+    parts = [tf.transform_enrich(raw.iloc[i:i + 300], GENRE_MAP, TMDB_CONFIG, C=C) for i in range(0, len(raw), 300)]
+    pd.testing.assert_series_equal(
+        pd.concat(parts)["weighted_rating"], _enrich_reference(raw, GENRE_MAP, TMDB_CONFIG)["weighted_rating"]
+    )
+
+
+def test_enrich_empty_frame():
+    raw = _raw().iloc[:0]
+    out = tf.transform_enrich(raw, GENRE_MAP, TMDB_CONFIG)
+    assert out.empty
+    assert list(out.columns) == list(_enrich_reference(raw, GENRE_MAP, TMDB_CONFIG).columns)
+
+
+# --- user-009: transform_clean sem cópias ---
+
+def _clean_reference(df: pd.DataFrame, drop_cols: bool = True) -> pd.DataFrame:
+    """transform_clean antes do copy=False: cópia inicial, .loc por regra e dropna."""
+    df = df.copy()
+    if "id" in df.columns:
+        df = df.drop_duplicates(subset=["id"])
+    str_cols = ["title", "original_title", "overview", "poster_path", "backdrop_path", "original_language", "genres_str"]
+    for c in [c for c in str_cols if c in df.columns]:
+        df[c] = df[c].astype("string").str.strip()
+        df.loc[df[c].isin(["", "None", "null", "NaN"]), c] = pd.NA
+    for c in [x for x in ["popularity", "vote_average", "vote_count", "weighted_rating"] if x in df.columns]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    if "vote_average" in df.columns:
+        df.loc[(df["vote_average"] < 0) | (df["vote_average"] > 10), "vote_average"] = pd.NA
+    if "weighted_rating" in df.columns:
+        df.loc[(df["weighted_rating"] < 0) | (df["weighted_rating"] > 10), "weighted_rating"] = pd.NA
+        df["weighted_rating"] = df["weighted_rating"].round(2)
+    df = df.dropna(subset=[c for c in ["id", "title", "vote_average", "vote_count"] if c in df.columns])
+    if "id" in df.columns:
+        df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64")
+    for c in ["vote_count", "release_year"]:
+        if c in df.columns:
+            df[c] = df[c].astype("Int64")
+    if drop_cols:
+        df = df.drop(columns=["adult", "video"], errors="ignore")
+    if "overview" in df.columns:
+        df["overview"] = df["overview"].fillna("")
+    return df
+
+
+def _dirty_enriched() -> pd.DataFrame:
+    df = tf.transform_enrich(_raw(), GENRE_MAP, TMDB_CONFIG)
+    df.loc[20:22, "id"] = df.loc[19, "id"]  # ids repetidos
+    df.loc[23:27, "title"] = ["  ", "None", "null", "NaN", None]
+    df.loc[28:29, "title"] = ["  Espaços  ", "\tTab"]
+    df.loc[30:32, "vote_average"] = [-1.0, 11.0, np.nan]
+    df.loc[33, "vote_count"] = np.nan
+    df.loc[34:35, "overview"] = [None, " "]
+    df.loc[36, "original_language"] = ""
+    df.loc[37, "weighted_rating"] = 12.0
+    return df
+
+
+@pytest.mark.parametrize("copy", [True, False])
+def test_clean_matches_reference(copy):
+    ref = _clean_reference(_dirty_enriched())
+    df = _dirty_enriched()
+    report: dict = {}
+    out = tf.transform_clean(df, drop_cols=True, copy=copy, report=report)
+
+    pd.testing.assert_frame_equal(out, ref, check_index_type=False)
+    assert report["rows_in"] == len(df) and report["rows_out"] == len(ref)
+    assert report["dropped"]["duplicate_id"] == 3
+    assert report["dropped"]["missing_title"] == 5
+    assert report["dropped"]["missing_vote_average"] == 4  # -1, 11 e os 2 NaN
+    assert sum(report["dropped"].values()) == len(df) - len(ref)
+    if copy:
+        pd.testing.assert_frame_equal(df, _dirty_enriched())
+
+
+def test_clean_without_drops_and_empty_frame():
+    df = tf.transform_enrich(synthetic_raw_movies(500, seed=5), GENRE_MAP, TMDB_CONFIG)
+    pd.testing.assert_frame_equal(tf.transform_clean(df.copy(), copy=False), _clean_reference(df))
+
+    empty = df.iloc[:0]
+    out = tf.transform_clean(empty)
+    assert out.empty and list(out.columns) == list(_clean_reference(empty).columns)
+
+
+# --- user-010: curated normalizado (filmes + financeiro, join na leitura) ---
+
+def _add_roi_reference(df_movies: pd.DataFrame, df_fin: pd.DataFrame) -> pd.DataFrame:
+    """transform_add_roi antes da normalização: merge do bruto financeiro e métricas no frame largo."""
+    df = df_movies.merge(df_fin, on="id", how="left")
+    for c in ["budget", "revenue", "runtime"]:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+    df["profit"] = df["revenue"] - df["budget"]
+    df["roi"] = (df["profit"] / df["budget"]).where(df["budget"] > 0)
+    df["revenue_to_budget"] = (df["revenue"] / df["budget"]).where(df["budget"] > 0)
+    df["revenue_per_min"] = (df["revenue"] / df["runtime"]).where(df["runtime"] > 0)
+    return df
+
+
+def _movies_and_fin() -> tuple[pd.DataFrame, pd.DataFrame]:
+    movies = tf.transform_clean(tf.transform_enrich(_raw(), GENRE_MAP, TMDB_CONFIG))
+    # ~10% dos filmes sem detalhe financeiro (left join deixa NaN)
+    ids = movies["id"].to_numpy(dtype=np.int64)
+    fin = synthetic_raw_financials(ids[np.arange(len(ids)) % 10 != 0], seed=3).astype({"budget": float, "revenue": float})
+    fin.loc[0:2, "budget"] = [0.0, np.nan, 1e6]
+    fin.loc[0:2, "revenue"] = [5e6, 2e6, np.nan]
+    fin.loc[3, "runtime"] = 0
+    return movies, fin
+
+
+def test_financials_join_matches_wide_reference():
+    movies, fin = _movies_and_fin()
+    ref = _add_roi_reference(movies, fin)
+
+    table = tf.transform_financials(fin)
+    assert list(table.columns) == ["id", *tf.FINANCIAL_COLS] and table["id"].is_unique
+    out = tf.join_financials(movies, table)
+    cols = list(ref.columns)
+    pd.testing.assert_frame_equal(out[cols], ref, check_dtype=False)
+    pd.testing.assert_frame_equal(tf.transform_add_roi(movies, fin), out)
+    # filmes sem linha financeira: métricas nulas e fora do recorte de ROI
+    missing = ~movies["id"].isin(fin["id"]).to_numpy()
+    assert out.loc[missing, ["budget", "roi"]].isna().all().all() and not out.loc[missing, "roi_ready"].any()
+
+
+def test_financials_of_empty_frame():
+    movies, fin = _movies_and_fin()
+    table = tf.transform_financials(fin.iloc[:0])
+    assert table.empty and list(table.columns) == ["id", *tf.FINANCIAL_COLS]
+    out = tf.join_financials(movies, table)
+    assert len(out) == len(movies) and out["roi"].isna().all()
+
+
+def test_ui_join_of_financials_table_matches_wide_reference(tmp_path, monkeypatch):
+    from ETL import load as ld
+    from conftest import ROOT
+
+    sys.path.insert(0, str(ROOT / "UI"))
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")
+    from components import data
+
+    movies, fin = _movies_and_fin()
+    ref = _add_roi_reference(movies.drop(columns=["release_date"]), fin)
+    monkeypatch.setattr(data, "CURATED_PARQUET", ld.write_curated_parquet(movies, tmp_path / "movies.parquet"))
+    monkeypatch.setattr(
+        data, "CURATED_FINANCIALS_PARQUET", ld.write_curated_parquet(tf.transform_financials(fin), tmp_path / "fin.parquet")
+    )
+
+    cols = ["id", "title", "release_year", "budget", "revenue", "roi", "revenue_per_min"]
+    out = data.load_financial_curated(cols)
+    pd.testing.assert_frame_equal(out[cols], ref[cols], check_dtype=False)
+    # original_language volta como categoria (dictionary no Parquet); o resto, igual ao frame largo
+    wide = data.load_financial_curated()[list(ref.columns)]
+    wide["original_language"] = wide["original_language"].astype(ref["original_language"].dtype)
+    pd.testing.assert_frame_equal(wide, ref, check_dtype=False)